@@ -0,0 +1,176 @@
+"""
+audio_buffer.py
+Buffer circular preallocat pentru captura audio cu latență mică.
+ - callback-ul audio copiază eșantioanele direct în buffer (fără bytes() și
+   fără alocări per bloc)
+ - recognizer-ul citește în loturi de dimensiune configurabilă
+ - capacitate fixă, cu politică la depășire: drop_oldest, drop_while_busy
+   sau skip_ahead; contoare pentru adâncime, audio pierdut și depășiri
+ - măsoară latența captură -> decodare (vârsta celui mai vechi eșantion din lot)
+"""
+
+import threading
+from contextlib import contextmanager
+import time
+
+import numpy as np
+
+
+POLICIES = ("drop_oldest", "drop_while_busy", "skip_ahead")
+
+
+class AudioRingBuffer:
+    """Single-producer, single-consumer ring of int16 mono samples.
+
+    Memory is fixed at capacity_s seconds of audio. What happens when the
+    consumer falls behind depends on `policy`:
+      drop_oldest      a full buffer overwrites the oldest unread audio
+      drop_while_busy  audio captured while busy() is active is discarded
+      skip_ahead       a reader more than max_lag_s behind jumps to the newest audio
+    """
+
+    def __init__(self, sample_rate, capacity_s=10.0, policy="drop_oldest", max_lag_s=1.0,
+                 max_latency_samples=2048):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.sample_rate = sample_rate
+        self.capacity = int(sample_rate * capacity_s)
+        self.policy = policy
+        self.max_lag = min(int(sample_rate * max_lag_s), self.capacity)
+        self._buf = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0  # total samples ever written
+        self._read = 0  # total samples ever read
+        self._write_time = 0.0  # monotonic time of the newest sample
+        self.last_capture = 0.0  # capture time of the newest sample returned by read()
+        self._cond = threading.Condition()
+        self.closed = False
+        self._busy = 0
+        # counters
+        self.max_depth = 0  # most samples ever waiting to be read
+        self.dropped = 0  # samples discarded without being read
+        self.overruns = 0  # times the writer found the buffer full
+        self._latencies = np.zeros(max_latency_samples, dtype=np.float64)
+        self._n_latencies = 0
+
+    # ---------- producer (audio callback) ----------
+    def write(self, samples):
+        """Copy a block of int16 samples in; the oldest unread audio is overwritten if full.
+
+        `samples` may be the raw callback buffer: it is viewed, not copied, before
+        going into the ring.
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        n = len(samples)
+        with self._cond:
+            if self._busy and self.policy == "drop_while_busy":
+                self.dropped += n
+                return
+            if n > self.capacity:
+                self.dropped += n - self.capacity
+                samples = samples[-self.capacity:]
+                n = self.capacity
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self._buf[start:start + first] = samples[:first]
+            if first < n:
+                self._buf[:n - first] = samples[first:]
+            self._written += n
+            self._write_time = time.monotonic()
+            lost = self._written - self._read - self.capacity
+            if lost > 0:
+                self.overruns += 1
+                self.dropped += lost
+                self._read += lost
+            self.max_depth = max(self.max_depth, self._written - self._read)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    @contextmanager
+    def busy(self):
+        """Mark a stretch during which the reader has stopped reading, e.g. work done on its thread.
+
+        Commands run on the executor don't need it: the reader keeps going while they run.
+        """
+        with self._cond:
+            self._busy += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._busy -= 1
+
+    def is_busy(self):
+        return self._busy > 0
+
+    # ---------- consumer (recognition thread) ----------
+    def available(self):
+        return self._written - self._read
+
+    @property
+    def position(self):
+        """Total samples handed to (or skipped for) the reader so far."""
+        return self._read
+
+    def read(self, n, timeout=None):
+        """Block until n samples are available and return them as bytes.
+
+        Returns whatever is left (possibly b"") once the buffer is closed, and
+        None after that has been drained.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.closed or self._written - self._read >= n, timeout):
+                return b""
+            avail = self._written - self._read
+            if avail == 0 and self.closed:
+                return None
+            if self.policy == "skip_ahead" and avail > self.max_lag + n:
+                # stale backlog: keep only the most recent max_lag samples
+                skip = avail - self.max_lag
+                self.dropped += skip
+                self._read += skip
+                avail -= skip
+            n = min(n, avail)
+            start = self._read % self.capacity
+            first = min(n, self.capacity - start)
+            if first == n:
+                data = self._buf[start:start + n].tobytes()
+            else:
+                data = self._buf[start:].tobytes() + self._buf[:n - first].tobytes()
+            # capture time of the oldest sample in this batch
+            oldest = self._write_time - avail / self.sample_rate
+            self.last_capture = oldest + n / self.sample_rate
+            self._read += n
+        self._record_latency(time.monotonic() - oldest)
+        return data
+
+    # ---------- latency ----------
+    def _record_latency(self, seconds):
+        self._latencies[self._n_latencies % len(self._latencies)] = seconds
+        self._n_latencies += 1
+
+    def latency_stats(self):
+        """Capture-to-decode latency of recent batches, in milliseconds."""
+        values = self._latencies[:min(self._n_latencies, len(self._latencies))]
+        if len(values) == 0:
+            return {}
+        return {
+            "batches": self._n_latencies,
+            "mean_ms": round(float(values.mean()) * 1000, 1),
+            "p95_ms": round(float(np.percentile(values, 95)) * 1000, 1),
+            "max_ms": round(float(values.max()) * 1000, 1),
+        }
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "depth_s": round(self.available() / self.sample_rate, 2),
+            "max_depth_s": round(self.max_depth / self.sample_rate, 2),
+            "dropped_s": round(self.dropped / self.sample_rate, 2),
+            "overruns": self.overruns,
+            "latency": self.latency_stats(),
+        }
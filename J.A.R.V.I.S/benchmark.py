@@ -0,0 +1,430 @@
+"""
+benchmark.py
+Benchmark reproductibil pentru căutare, citire și dispecerizarea comenzilor.
+ - generează directoare "home" sintetice (10k / 100k / 1M fișiere) cu adâncime
+   realistă și un amestec de .pdf/.txt/.csv; arborii sunt păstrați și refolosiți
+ - măsoară search_files, read_file și handle_command pentru jarvis.py,
+   jarvis_vosk.py și jarvis_vosk_openai.py, cu TTS și deschiderea fișierelor înlocuite
+ - plus indexarea și căutarea "la rece" (crawler), independent de entry point
+ - --llm măsoară fallback-ul LLM (throughput, latență p50/p95/p99 până la primul token și totală)
+   față de llm_stub_server.py pornit local, deci fără rețea; --llm-url pentru un server real
+ - rezultatele se scriu ca JSON; --compare arată diferențele față de o rulare veche
+Exemplu: python benchmark.py --sizes 10000 100000 --out bench.json --compare old.json
+         python benchmark.py --llm openai --llm-requests 200 --llm-concurrency 8
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from file_index import FileIndex
+from content_index import ContentIndex, files_from_index
+from text_cache import TextCache
+from doc_reader import DocumentReader
+from extractors import extract_pages
+from tracing import percentile
+
+ENTRY_POINTS = ["jarvis", "jarvis_vosk", "jarvis_vosk_openai"]
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+TOP_DIRS = ["Documents", "Downloads", "Desktop", "Pictures", "Music", "Projects", "Work", "School"]
+WORDS = ["budget", "report", "notes", "invoice", "draft", "final", "project", "meeting", "summary",
+         "plan", "data", "export", "backup", "letter", "resume", "contract", "photos", "travel",
+         "client", "sales", "quarter", "review", "archive", "old", "new", "scan", "todo", "ideas"]
+SUFFIX_MIX = [(".txt", 0.45), (".csv", 0.30), (".pdf", 0.25)]
+SENTENCES = ["The quarterly numbers were reviewed by the finance team.",
+             "Revenue grew faster than expected in the northern region.",
+             "We agreed to revisit the hiring plan next month.",
+             "Costs for cloud hosting went down after the migration.",
+             "Please send the signed contract before Friday."]
+
+# files every tree contains, so queries have known answers
+KNOWN_FILES = {
+    "Documents/Finance/2023/budget_2023.csv": "csv",
+    "Documents/Notes/project_notes.txt": "txt",
+    "Work/Reports/annual_report.pdf": "pdf",
+}
+SEARCH_QUERIES = {
+    "exact": "budget_2023",
+    "words": "project notes",
+    "fuzzy": "anual reprot",
+    "missing": "zebra spreadsheet",
+}
+COMMANDS = ["open budget 2023", "search for annual report", "read project notes",
+            "search for zebra spreadsheet", "what time is it"]
+LLM_QUESTIONS = ["what is the capital of france", "how do i free up disk space", "explain what a pdf file is",
+                 "give me a tip for staying focused", "how do i zip a folder", "what is a good name for a project"]
+# what the entry points say when a command failed, as opposed to a legitimate "nothing found"
+ERROR_REPLY = re.compile(r"\berror\b|^Failed to|took too long|can't read that type|couldn't extract|"
+                         r"^No text found|^File not found|^I couldn't find (?!anything |that |or open )|"
+                         r"^PDF has no pages|^File is empty", re.IGNORECASE)
+# latency shape of the bundled stub: roughly a hosted model on a good connection, with a slow tail
+LLM_STUB_SHAPE = {"ttft_ms": 300, "ttft_jitter_ms": 150, "tokens_per_s": 40, "tail_p": 0.02, "tail_ms": 2000,
+                  "error_rate": 0.01}
+
+
+# -------------------- synthetic trees --------------------
+def minimal_pdf(pages):
+    """Bytes of a small valid PDF; `pages` is a list of lists of text lines."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        text = " T* ".join("(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj"
+                           for line in lines)
+        stream = f"BT /F1 11 Tf 72 720 Td 14 TL {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out, offsets = "%PDF-1.4\n", []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def _document(kind, rng, paragraphs=40):
+    lines = [" ".join(rng.choice(SENTENCES) for _ in range(4)) for _ in range(paragraphs)]
+    if kind == "pdf":
+        return minimal_pdf([lines[i:i + 8] for i in range(0, len(lines), 8)])
+    if kind == "csv":
+        rows = ["month,region,amount"] + [f"{m},{rng.choice(WORDS)},{rng.randint(100, 9999)}" for m in range(1, 13)]
+        return "\n".join(rows).encode()
+    return "\n\n".join(lines).encode()
+
+
+def make_tree(root, n_files, seed=1, files_per_dir=25, max_depth=8, content_every=200):
+    """Create a synthetic home directory with about n_files files under root.
+
+    Most files are empty (only their names matter for search); every
+    `content_every`-th file and the KNOWN_FILES get real contents.
+    """
+    rng = random.Random(seed)
+    dirs = list(TOP_DIRS)
+    n_dirs = max(len(TOP_DIRS), n_files // files_per_dir)
+    while len(dirs) < n_dirs:
+        parent = rng.choice(dirs)
+        if parent.count("/") + 1 >= max_depth:
+            continue
+        dirs.append(f"{parent}/{rng.choice(WORDS)}_{rng.randint(0, 999)}")
+    dirs = sorted(set(dirs))
+    for d in dirs:
+        os.makedirs(os.path.join(root, d), exist_ok=True)
+    suffixes, weights = zip(*SUFFIX_MIX)
+    for i in range(n_files - len(KNOWN_FILES)):
+        d = rng.choice(dirs)
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i}{rng.choices(suffixes, weights)[0]}"
+        with open(os.path.join(root, d, name), "wb") as fh:
+            if i % content_every == 0:
+                fh.write(_document(name.rsplit(".", 1)[1], rng, paragraphs=8))
+    for rel, kind in KNOWN_FILES.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(_document(kind, rng))
+
+
+def ensure_tree(workdir, n_files, seed=1):
+    """Path of the tree for (n_files, seed), generating it the first time."""
+    root = os.path.join(workdir, f"home_{n_files}_{seed}")
+    marker = os.path.join(root, ".complete")
+    if os.path.exists(marker):
+        return root, 0.0
+    shutil.rmtree(root, ignore_errors=True)
+    print(f"Generating {n_files} files in {root} ...")
+    t0 = time.monotonic()
+    make_tree(root, n_files, seed)
+    open(marker, "w").close()
+    return root, round(time.monotonic() - t0, 2)
+
+
+# -------------------- measurements --------------------
+def timed(fn, repeat, check=None):
+    """Call fn `repeat` times; latency summary in ms of the runs that worked.
+
+    A run fails when fn raises or check() (called after it) returns an error
+    message; failed runs are counted but kept out of the latency numbers.
+    """
+    values, errors = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            fn()
+            error = check() if check else None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = (time.perf_counter() - t0) * 1000
+        if error:
+            errors.append(error)
+        else:
+            values.append(elapsed)
+    result = {"n": len(values)}
+    if errors:
+        result.update(failed=len(errors), error=errors[0])
+    if values:
+        values.sort()
+        result.update(p50_ms=round(percentile(values, 50), 3),
+                      p95_ms=round(percentile(values, 95), 3),
+                      max_ms=round(values[-1], 3))
+    return result
+
+
+class _Stubs:
+    """Replaces the side effects of an entry point; sentences are consumed so reading does its work.
+
+    Replies that report a failure (see ERROR_REPLY) are remembered until
+    error() hands them to timed().
+    """
+
+    def __init__(self, module):
+        self.spoken = 0
+        self.errors = []
+        module.speak = self.speak
+        module.speak_sentences = self.speak_sentences
+        module.open_with_default = lambda path: None
+        if hasattr(module, "OPENAI_API_KEY"):
+            module.OPENAI_API_KEY = None
+
+    def speak(self, text, priority=None):
+        self.spoken += 1
+        if ERROR_REPLY.search(text):
+            self.errors.append(text)
+
+    def error(self):
+        """The first error reply since the last call, if any."""
+        errors, self.errors = self.errors, []
+        return errors[0] if errors else None
+
+    def speak_sentences(self, sentences):
+        for _ in sentences:
+            self.spoken += 1
+
+
+def _fresh_text_cache(module, workdir, tag):
+    db_path = os.path.join(workdir, f"text_cache_{module.__name__}_{tag}.db")
+    module.text_cache = TextCache(db_path, extract=extract_pages)
+    module.reader = DocumentReader(module.text_cache, chunk_chars=getattr(module, "READ_CHUNK_CHARS", 1500))
+
+
+def bench_entry_point(name, root, file_index, content_db, workdir, repeat):
+    result = {}
+    t0 = time.monotonic()
+    try:
+        module = importlib.import_module(name)
+    except BaseException as e:  # missing dependency, missing model (sys.exit), no audio device...
+        return {"error": f"{type(e).__name__}: {e}"}
+    result["import_s"] = round(time.monotonic() - t0, 2)
+    stubs = _Stubs(module)
+    module.file_index = file_index
+    module.content_index = ContentIndex(content_db)
+
+    # the entry points print every command; keep that out of the timings
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result["search_files"] = {kind: timed(lambda q=q: module.search_files(q), repeat, stubs.error)
+                                  for kind, q in SEARCH_QUERIES.items()}
+        reads = {}
+        for rel in KNOWN_FILES:
+            path = os.path.join(root, rel)
+            _fresh_text_cache(module, workdir, os.path.basename(rel))
+            reads[os.path.splitext(rel)[1]] = {"cold": timed(lambda: module.read_file(path), 1, stubs.error),
+                                               "warm": timed(lambda: module.read_file(path), repeat,
+                                                             stubs.error)}
+        result["read_file"] = reads
+        _fresh_text_cache(module, workdir, "commands")
+        result["handle_command"] = {cmd: timed(lambda c=cmd: module.handle_command(c), repeat,
+                                                             stubs.error)
+                                    for cmd in COMMANDS}
+    return result
+
+
+def bench_tree(n_files, args):
+    root, generate_s = ensure_tree(args.workdir, n_files, args.seed)
+    dbdir = tempfile.mkdtemp(prefix="jarvis_bench_")
+    out = {"root": root, "generate_s": generate_s}
+    try:
+        cold = FileIndex([root], os.path.join(dbdir, "cold.db"))
+        t0 = time.monotonic()
+        cold.search(SEARCH_QUERIES["exact"], fuzzy=False)
+        out["cold_crawl_s"] = round(time.monotonic() - t0, 3)
+
+        index = FileIndex([root], os.path.join(dbdir, "file_index.db"))
+        t0 = time.monotonic()
+        index.refresh()
+        out["index_build_s"] = round(time.monotonic() - t0, 2)
+        t0 = time.monotonic()
+        index.refresh()
+        out["index_refresh_s"] = round(time.monotonic() - t0, 2)
+        out["index_search"] = {kind: timed(lambda q=q: index.search(q), args.repeat)
+                               for kind, q in SEARCH_QUERIES.items()}
+
+        # only files with contents; the empty placeholders have nothing to index
+        content_db = os.path.join(dbdir, "content_index.db")
+        t0 = time.monotonic()
+        ContentIndex(content_db).build(p for p in files_from_index(index.db_path) if os.path.getsize(p) > 0)
+        out["content_index_build_s"] = round(time.monotonic() - t0, 2)
+
+        out["entry_points"] = {}
+        for name in args.entry_points:
+            print(f"  {name} ...")
+            out["entry_points"][name] = bench_entry_point(name, root, index, content_db, dbdir, args.repeat)
+    finally:
+        shutil.rmtree(dbdir, ignore_errors=True)
+    return out
+
+
+def _latency(seconds):
+    values = sorted(v * 1000 for v in seconds)
+    if not values:
+        return {"n": 0}
+    return {"n": len(values),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1)}
+
+
+def bench_llm(args):
+    """Throughput and tail latency of the LLM fallback path, by default against a local llm_stub_server."""
+    from llm_backends import LLMError, make_backend
+    from llm_stub_server import serve
+    stub = None
+    base_url = args.llm_url
+    if base_url is None and args.llm != "mock":
+        stub = serve(port=0, seed=args.seed, **LLM_STUB_SHAPE)
+        base_url = f"http://127.0.0.1:{stub.server_address[1]}" + ("/v1" if args.llm == "openai" else "")
+    mock_shape = LLM_STUB_SHAPE if args.llm == "mock" else {}
+    backend = make_backend(args.llm, args.llm_model, base_url=base_url, api_key=os.getenv("OPENAI_API_KEY"),
+                           max_concurrency=args.llm_concurrency, **mock_shape)
+    rng = random.Random(args.seed)
+    prompts = iter([rng.choice(LLM_QUESTIONS) for _ in range(args.llm_requests)])
+    lock = threading.Lock()
+    ttft, total, errors = [], [], []
+
+    def _client():
+        while True:
+            with lock:
+                prompt = next(prompts, None)
+            if prompt is None:
+                return
+            t0 = time.perf_counter()
+            first = None
+            try:
+                for _ in backend.stream([{"role": "user", "content": prompt}]):
+                    if first is None:
+                        first = time.perf_counter() - t0
+            except LLMError as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                ttft.append(first or 0.0)
+                total.append(time.perf_counter() - t0)
+
+    try:
+        t0 = time.perf_counter()
+        clients = [threading.Thread(target=_client) for _ in range(args.llm_concurrency)]
+        for th in clients:
+            th.start()
+        for th in clients:
+            th.join()
+        wall = time.perf_counter() - t0
+    finally:
+        backend.close()
+        if stub is not None:
+            stub.shutdown()
+    return {"backend": args.llm, "url": base_url, "stub": stub is not None, "requests": args.llm_requests,
+            "concurrency": args.llm_concurrency, "errors": len(errors), "retries": backend.counts["retries"],
+            "wall_s": round(wall, 2), "throughput_rps": round(len(total) / wall, 2) if wall else None,
+            "ttft": _latency(ttft), "total": _latency(total)}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _flatten(v, f"{prefix}{k}.")
+    elif isinstance(value, (int, float)) and prefix.rstrip(".").endswith(("_ms", "_s")):
+        yield prefix.rstrip("."), value
+
+
+def compare(old, new, threshold=0.2):
+    """Print timings that changed by more than `threshold` (fraction) between two result files."""
+    sections = ("trees", "llm")
+    before = dict(_flatten({s: old.get(s, {}) for s in sections}))
+    for key, value in _flatten({s: new.get(s, {}) for s in sections}):
+        if key.endswith("generate_s") or key not in before or not before[key]:
+            continue
+        change = value / before[key] - 1
+        if abs(change) >= threshold:
+            print(f"{'SLOWER' if change > 0 else 'faster'} {change:+.0%}  {key}: {before[key]} -> {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JARVIS search/read/dispatch on synthetic file trees.")
+    parser.add_argument("--sizes", type=int, nargs="+", help=f"tree sizes (default {DEFAULT_SIZES}, none with --llm)")
+    parser.add_argument("--entry-points", nargs="+", default=ENTRY_POINTS, choices=ENTRY_POINTS)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "jarvis_bench"),
+                        help="where synthetic trees are generated and kept between runs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--llm", choices=["openai", "llama", "mock"], help="benchmark the LLM fallback with this backend")
+    parser.add_argument("--llm-url", help="server to test (default: a local llm_stub_server.py)")
+    parser.add_argument("--llm-model", default="stub")
+    parser.add_argument("--llm-requests", type=int, default=100)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+    if args.sizes is None:
+        args.sizes = [] if args.llm else DEFAULT_SIZES
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    results = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "trees": {},
+    }
+    for n in args.sizes:
+        print(f"Tree with {n} files:")
+        results["trees"][str(n)] = bench_tree(n, args)
+    if args.llm:
+        print(f"LLM fallback ({args.llm}, {args.llm_requests} requests, {args.llm_concurrency} at a time):")
+        results["llm"] = bench_llm(args)
+        print(json.dumps(results["llm"], indent=2))
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    print("Results written to", args.out)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), results)
+
+
+if __name__ == "__main__":
+    main()
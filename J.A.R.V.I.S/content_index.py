@@ -0,0 +1,180 @@
+"""
+content_index.py
+Index full-text (SQLite FTS5) peste conținutul documentelor pentru "search for".
+ - tipurile suportate de read_file (vezi registrul din extractors.py)
+ - construit în fundal de un proces separat, extragerea rulează în ExtractionPool
+ - actualizat incremental după mtime/dimensiune
+ - search() întoarce căi ordonate (bm25) + offset și fragment de text
+
+Rulare manuală:  python content_index.py --files-db ~/.jarvis/file_index.db
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from extractors import SUPPORTED_SUFFIXES, ExtractionPool
+
+DEFAULT_CONTENT_INDEX_PATH = str(Path.home() / ".jarvis" / "content_index.db")
+MAX_DOC_CHARS = 200_000  # text kept per document
+SNIPPET_TOKENS = 24  # words around the match in ContentHit.snippet
+STOP_WORDS = {"a", "an", "the", "of", "for", "in", "on", "and", "or", "to", "my", "about", "with"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (path TEXT PRIMARY KEY, mtime REAL, size INTEGER);
+CREATE VIRTUAL TABLE IF NOT EXISTS body USING fts5(path UNINDEXED, text, tokenize='unicode61 remove_diacritics 2');
+"""
+
+
+class ContentHit:
+    def __init__(self, path, score, offset, snippet):
+        self.path = path
+        self.score = score
+        self.offset = offset  # character offset of the first match in the document
+        self.snippet = snippet
+
+    def __repr__(self):
+        return f"ContentHit({self.path!r}, score={self.score:.2f}, offset={self.offset})"
+
+
+class ContentIndex:
+    def __init__(self, db_path=DEFAULT_CONTENT_INDEX_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stop = threading.Event()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    # ---------- building ----------
+    def build(self, paths, workers=None, timeout=60):
+        """Bring the index in line with `paths`; only new or modified files are extracted.
+
+        Each document is extracted in an isolated worker process; one that
+        takes longer than `timeout` seconds per page is killed and counted as
+        failed. Returns (indexed, removed, failed) counts.
+        """
+        conn = self._connect()
+        known = {p: (m, s) for p, m, s in conn.execute("SELECT path, mtime, size FROM docs")}
+        wanted = {}
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            wanted[p] = (st.st_mtime, st.st_size)
+        gone = [p for p in known if p not in wanted]
+        for p in gone:
+            conn.execute("DELETE FROM body WHERE path=?", (p,))
+            conn.execute("DELETE FROM docs WHERE path=?", (p,))
+        todo = [p for p, sig in wanted.items() if known.get(p) != sig]
+        indexed = failed = 0
+        if todo:
+            workers = workers or os.cpu_count() or 1
+            extraction = ExtractionPool(max_workers=workers, timeout=timeout)
+
+            def _extract(path):
+                try:
+                    return path, extraction.extract_text(path, MAX_DOC_CHARS)[:MAX_DOC_CHARS]
+                except Exception:
+                    return path, None
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for path, text in pool.map(_extract, todo):
+                    conn.execute("DELETE FROM body WHERE path=?", (path,))
+                    if text is None:
+                        failed += 1
+                    else:
+                        conn.execute("INSERT INTO body(path, text) VALUES (?, ?)", (path, text))
+                        indexed += 1
+                    # failed files are recorded too, so they are not retried until they change
+                    mtime, size = wanted[path]
+                    conn.execute("INSERT OR REPLACE INTO docs(path, mtime, size) VALUES (?, ?, ?)",
+                                 (path, mtime, size))
+                    if (indexed + failed) % 50 == 0:
+                        conn.commit()
+            extraction.close()
+        conn.commit()
+        return indexed, len(gone), failed
+
+    def start(self, files_db, interval=900):
+        """Periodically run the builder as a separate process over the files in files_db."""
+        cmd = [sys.executable, os.path.abspath(__file__), "--db", self.db_path, "--files-db", files_db]
+
+        def _run():
+            while not self._stop.is_set():
+                try:
+                    subprocess.run(cmd, check=False)
+                except Exception as e:
+                    print("Content index error:", e)
+                self._stop.wait(interval)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- queries ----------
+    def search(self, query, limit=5):
+        """Documents containing the query words, best bm25 score first."""
+        terms = [t for t in re.findall(r"\w+", query.lower()) if t not in STOP_WORDS]
+        if not terms:
+            return []
+        quoted = ['"' + t.replace('"', "") + '"' for t in terms]
+        # offset and snippet are computed inside SQLite, so whole documents never reach Python:
+        # the offset is that of the phrase, else of the first query word found
+        positions = ", ".join(["NULLIF(instr(lower(text), ?), 0)"] * (len(terms) + 1))
+        sql = (f"SELECT path, bm25(body) AS score, COALESCE({positions}, 1) - 1, "
+               f"snippet(body, 1, '', '', '...', {SNIPPET_TOKENS}) "
+               "FROM body WHERE body MATCH ? ORDER BY score LIMIT ?")
+        with self._lock:
+            conn = self._connect()
+            rows = []
+            # all words first, then any word
+            for expr in (" ".join(quoted), " OR ".join(quoted)):
+                rows = conn.execute(sql, (" ".join(terms), *terms, expr, limit)).fetchall()
+                if rows:
+                    break
+        return [ContentHit(path, -score, offset, snippet) for path, score, offset, snippet in rows]
+
+
+def files_from_index(files_db):
+    """Paths of readable documents recorded in the filename index (file_index.py)."""
+    conn = sqlite3.connect(f"file:{files_db}?mode=ro", uri=True)
+    try:
+        return [p for (p,) in conn.execute("SELECT path FROM files")
+                if os.path.splitext(p)[1].lower() in SUPPORTED_SUFFIXES]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the JARVIS document content index.")
+    parser.add_argument("--db", default=DEFAULT_CONTENT_INDEX_PATH)
+    parser.add_argument("--files-db", required=True, help="filename index built by file_index.py")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.files_db):
+        print("Content index: filename index not built yet.")
+        return
+    t0 = time.monotonic()
+    indexed, removed, failed = ContentIndex(args.db).build(files_from_index(args.files_db), args.workers)
+    print(f"Content index: {indexed} indexed, {removed} removed, {failed} failed "
+          f"in {time.monotonic() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+conversation.py
+Memorie de conversație limitată, pentru întrebările de continuare trimise la LLM.
+ - tokenii sunt estimați o singură dată per mesaj, la adăugare (≈ 4 caractere / token)
+ - ultimele replici intră întregi; cele mai vechi sunt comprimate într-un rezumat
+   extractiv (prima propoziție din fiecare), care are și el un buget
+ - rezultatele comenzilor recente (fișiere deschise, documente citite) intră ca notițe scurte
+ - după o pauză lungă conversația începe din nou
+ - mărimea cererii rămâne aproximativ constantă pe sesiuni lungi
+"""
+
+import re
+import threading
+import time
+from collections import deque
+
+from doc_reader import split_sentences
+
+MESSAGE_OVERHEAD = 4  # role and separators, per message
+
+# questions that only make sense with what was said before ("and tomorrow?", "open it")
+_FOLLOW_UP = re.compile(r"^(?:and|but|so|also|then|what about|how about|why)\b|"
+                        r"\b(?:it|its|that|this|those|these|they|them|he|she|him|her|there|more|else|again)\b")
+
+
+def estimate_tokens(text):
+    return MESSAGE_OVERHEAD + (len(text) + 3) // 4
+
+
+def is_follow_up(text):
+    return bool(_FOLLOW_UP.search(text.lower()))
+
+
+def _gist(text, max_words=25):
+    """First sentence of text, cut to max_words."""
+    sentences = split_sentences(text)
+    words = (sentences[0] if sentences else text).split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+
+class Conversation:
+    """Recent turns within a token budget, plus a summary of older ones and notes on recent commands."""
+
+    def __init__(self, budget=1200, summary_budget=200, notes=6, idle_reset=600):
+        self.budget = budget  # tokens for history + summary + notes (system prompt and question excluded)
+        self.summary_budget = summary_budget
+        self.idle_reset = idle_reset  # seconds without activity before starting over; None = never
+        self.summarized = 0
+        self._turns = deque()  # (role, text, tokens)
+        self._turn_tokens = 0
+        self._summary = deque()  # (line, tokens)
+        self._summary_tokens = 0
+        self._notes = deque(maxlen=notes)  # (line, tokens)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        now = time.monotonic()
+        if self.idle_reset is not None and now - self._last > self.idle_reset:
+            self._clear()
+        self._last = now
+
+    def _clear(self):
+        self._turns.clear()
+        self._summary.clear()
+        self._notes.clear()
+        self._turn_tokens = self._summary_tokens = 0
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def add(self, role, text):
+        """Record a turn ("user" or "assistant") and trim the history back into the budget."""
+        text = " ".join(text.split())
+        if not text:
+            return
+        with self._lock:
+            self._expire()
+            tokens = estimate_tokens(text)
+            self._turns.append((role, text, tokens))
+            self._turn_tokens += tokens
+            self._trim()
+
+    def note(self, text):
+        """Compact context from a command, e.g. "Opened budget_2023.csv"."""
+        with self._lock:
+            self._expire()
+            self._notes.append((text, estimate_tokens(text)))
+            self._trim()
+
+    def _notes_tokens(self):
+        return sum(tokens for _, tokens in self._notes)
+
+    def _summarize_oldest(self):
+        role, text, tokens = self._turns.popleft()
+        self._turn_tokens -= tokens
+        line = f"{'User asked' if role == 'user' else 'You answered'}: {_gist(text)}"
+        self._summary.append((line, estimate_tokens(line)))
+        self._summary_tokens += self._summary[-1][1]
+        self.summarized += 1
+        while self._summary_tokens > self.summary_budget:
+            self._summary_tokens -= self._summary.popleft()[1]
+
+    def _trim(self):
+        # oldest exchanges move into the summary; the latest one is always kept whole
+        while len(self._turns) > 2 and self._turn_tokens + self._summary_tokens + self._notes_tokens() > self.budget:
+            self._summarize_oldest()
+            # the history sent to the model starts with a question, not with half an exchange
+            while len(self._turns) > 2 and self._turns[0][0] != "user":
+                self._summarize_oldest()
+
+    def messages(self, system, question):
+        """Chat messages for the backend: system prompt with context, recent turns, then the question."""
+        with self._lock:
+            self._expire()
+            context = [system]
+            if self._notes:
+                context.append("Recent actions:\n" + "\n".join(f"- {line}" for line, _ in self._notes))
+            if self._summary:
+                context.append("Earlier in this conversation:\n" + "\n".join(f"- {line}" for line, _ in self._summary))
+            messages = [{"role": "system", "content": "\n\n".join(context)}]
+            messages += [{"role": role, "content": text} for role, text, _ in self._turns]
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def has_history(self):
+        with self._lock:
+            return bool(self._turns or self._summary)
+
+    def tokens(self):
+        with self._lock:
+            return self._turn_tokens + self._summary_tokens + self._notes_tokens()
+
+    def stats(self):
+        with self._lock:
+            return {"turns": len(self._turns), "summary_lines": len(self._summary), "notes": len(self._notes),
+                    "summarized": self.summarized,
+                    "tokens": self._turn_tokens + self._summary_tokens + self._notes_tokens(),
+                    "budget": self.budget}
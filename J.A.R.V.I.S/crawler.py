@@ -0,0 +1,169 @@
+"""
+crawler.py
+Crawler paralel pe os.scandir pentru scanările la rece din search_files.
+ - subarborii sunt împărțiți pe un thread pool, toate rădăcinile în paralel
+ - reguli de ignorare compilate (.git, node_modules, cache-uri, virtualenv-uri)
+ - limită de adâncime și buget de timp per rădăcină
+ - se oprește imediat ce s-au găsit max_results rezultate
+"""
+
+import fnmatch
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Directory names that never contain anything worth opening by voice.
+DEFAULT_IGNORE = [
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".cache", ".npm", ".gradle",
+    ".venv", "venv", "*-env", "env", "site-packages", ".tox", ".nox", ".mypy_cache",
+    ".pytest_cache", ".ruff_cache", ".Trash", "$Recycle.Bin", "AppData", ".jarvis",
+]
+
+
+class IgnoreRules:
+    """Glob patterns on directory names, compiled into a single regex."""
+
+    def __init__(self, patterns=DEFAULT_IGNORE):
+        self.patterns = list(patterns)
+        if self.patterns:
+            self._rx = re.compile("|".join(fnmatch.translate(p) for p in self.patterns), re.IGNORECASE)
+        else:
+            self._rx = None
+
+    def match(self, name):
+        return self._rx is not None and self._rx.match(name) is not None
+
+
+class RootStats:
+    def __init__(self, root):
+        self.root = root
+        self.started = time.monotonic()
+        self.elapsed = None
+        self.dirs = 0
+        self.files = 0
+        self.hits = 0
+        self.pending = 0
+        self.timed_out = False
+        self.stopped = False
+
+    def __repr__(self):
+        state = "timed out" if self.timed_out else ("stopped" if self.stopped else "done")
+        elapsed = self.elapsed if self.elapsed is not None else time.monotonic() - self.started
+        return (f"{self.root}: {elapsed * 1000:.0f} ms, {self.dirs} dirs, "
+                f"{self.files} files, {self.hits} hits ({state})")
+
+
+class CrawlResult:
+    def __init__(self, paths, roots):
+        self.paths = paths
+        self.roots = roots  # root -> RootStats
+
+    def report(self):
+        return "\n".join(repr(s) for s in self.roots.values())
+
+
+def crawl(roots, match, max_results=None, ignore=None, max_depth=None, workers=None,
+          root_budgets=None, default_budget=None, stop=None):
+    """Walk every root concurrently and return the files for which match(name) is true.
+
+    root_budgets maps a root to the seconds it may spend scanning (default_budget
+    applies to the rest); a root that exceeds its budget is abandoned and marked
+    timed_out. The crawl stops as soon as max_results hits are found or the
+    optional stop event is set.
+    """
+    if not roots:
+        return CrawlResult([], {})
+    ignore = ignore if ignore is not None else IgnoreRules()
+    root_budgets = root_budgets or {}
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    stop = stop or threading.Event()
+    done = threading.Event()
+    lock = threading.Lock()
+    paths = []
+    stats = {}
+    pending = [1]  # held by the submit loop below, so done can't fire before every root is queued
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl")
+
+    def _submit(st, path, depth):
+        if stop.is_set():
+            st.stopped = True
+            return
+        with lock:
+            st.pending += 1
+            pending[0] += 1
+        pool.submit(_scan, st, path, depth)
+
+    def _finish(st):
+        with lock:
+            st.pending -= 1
+            pending[0] -= 1
+            if st.pending == 0 and st.elapsed is None:
+                st.elapsed = time.monotonic() - st.started
+            if pending[0] == 0:
+                done.set()
+
+    def _scan(st, path, depth):
+        try:
+            if stop.is_set():
+                st.stopped = True
+                return
+            if st.timed_out:
+                return
+            budget = root_budgets.get(st.root, default_budget)
+            if budget is not None and time.monotonic() - st.started > budget:
+                st.timed_out = True
+                return
+            subdirs, hits, nfiles = [], [], 0
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not ignore.match(entry.name):
+                                    subdirs.append(entry.path)
+                            else:
+                                nfiles += 1
+                                if match(entry.name):
+                                    hits.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                return
+            with lock:
+                st.dirs += 1
+                st.files += nfiles
+                st.hits += len(hits)
+                for h in hits:
+                    if max_results is not None and len(paths) >= max_results:
+                        break
+                    paths.append(h)
+                if max_results is not None and len(paths) >= max_results:
+                    st.stopped = True
+                    stop.set()
+                    done.set()
+                    return
+            if max_depth is None or depth < max_depth:
+                for d in subdirs:
+                    _submit(st, d, depth + 1)
+        finally:
+            _finish(st)
+
+    for root in roots:
+        st = stats[root] = RootStats(root)
+        _submit(st, root, 0)
+    with lock:
+        pending[0] -= 1
+        if pending[0] == 0:
+            done.set()
+    done.wait()
+    pool.shutdown(wait=False, cancel_futures=True)
+    return CrawlResult(paths, stats)
+
+
+def crawl_search(roots, query, max_results, **kwargs):
+    """Substring search over file names, like the original os.walk loop."""
+    q = query.lower()
+    return crawl(roots, lambda name: q in name.lower(), max_results=max_results, **kwargs)
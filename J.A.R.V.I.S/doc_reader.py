@@ -0,0 +1,165 @@
+"""
+doc_reader.py
+Citire în flux a documentelor, pagină cu pagină și propoziție cu propoziție.
+ - paginile sunt extrase leneș (prin TextCache), memoria rămâne constantă
+ - un cursor per document: "continue", "next page" și "skip" reiau de unde
+   s-a rămas fără să re-extragă paginile anterioare
+"""
+
+import os
+import re
+from collections import OrderedDict
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def split_sentences(text):
+    parts = (" ".join(p.split()) for p in _SENTENCE_END.split(text))
+    return [p for p in parts if p]
+
+
+def stream_sentences(fragments):
+    """Yield each sentence as soon as it is complete in a stream of text fragments (e.g. LLM tokens)."""
+    buf = ""
+    for fragment in fragments:
+        buf += fragment
+        parts = _SENTENCE_END.split(buf)
+        for part in parts[:-1]:
+            part = " ".join(part.split())
+            if part:
+                yield part
+        buf = parts[-1]
+    tail = " ".join(buf.split())
+    if tail:
+        yield tail
+
+
+def split_page(text):
+    """(complete sentences, trailing fragment continued on the next page)."""
+    sentences = split_sentences(text)
+    if sentences and not text.rstrip().endswith((".", "!", "?")):
+        return sentences[:-1], sentences[-1]
+    return sentences, ""
+
+
+class Cursor:
+    def __init__(self, path, page=0, sentence=0):
+        self.path = path
+        self.page = page
+        self.sentence = sentence  # index of the next sentence to speak; may run past `page` after a skip
+
+    def __repr__(self):
+        return f"Cursor({os.path.basename(self.path)!r}, page={self.page}, sentence={self.sentence})"
+
+
+class DocumentReader:
+    """Streams a document as sentences, stopping after chunk_chars characters.
+
+    The generators returned by read/resume/next_page/skip move the
+    document's cursor past a sentence only when the next one is pulled,
+    i.e. once it has been spoken to the end. Whatever speaks them can stop
+    at any point and the next "continue" starts with the interrupted sentence.
+    """
+
+    def __init__(self, cache, chunk_chars=1500, skip_sentences=5, max_cursors=20):
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.skip_sentences = skip_sentences
+        self.max_cursors = max_cursors
+        self.cursors = OrderedDict()  # path -> Cursor, most recent last
+        self.current = None
+
+    def _cursor(self, path, reset=False):
+        path = os.path.abspath(path)
+        if reset or path not in self.cursors:
+            self.cursors[path] = Cursor(path)
+        self.cursors.move_to_end(path)
+        while len(self.cursors) > self.max_cursors:
+            self.cursors.popitem(last=False)
+        self.current = path
+        return self.cursors[path]
+
+    def _pages(self, path, start):
+        """(page number, text) from `start` on; cache misses share one live extractor."""
+        live = None
+        page = start
+        try:
+            while True:
+                text = self.cache.get(path, page)
+                if text is None:
+                    if live is None:
+                        live = self.cache.extract(path, page)
+                    text = next(live, None)
+                    if text is None:
+                        return
+                    self.cache.put(path, text, page)
+                elif live is not None:
+                    live.close()
+                    live = None
+                yield page, text
+                page += 1
+        finally:
+            # stopping early (e.g. "stop" or end of chunk) releases the extractor
+            if live is not None:
+                live.close()
+
+    def _stream(self, cur):
+        spoken = 0
+        # a sentence cut by a page break is read as the first sentence of the next page
+        carry = ""
+        if cur.page > 0:
+            carry = split_page(self.cache.page(cur.path, cur.page - 1) or "")[1]
+        start = cur.sentence
+        for page, text in self._pages(cur.path, cur.page):
+            sentences, tail = split_page(text)
+            if carry and sentences:
+                sentences[0] = f"{carry} {sentences[0]}"
+            elif carry:
+                tail = f"{carry} {tail}".strip()
+            carry = tail
+            if start >= len(sentences):
+                # skipped past this page: the rest of the skip carries over to the next one
+                start -= len(sentences)
+                cur.page, cur.sentence = page + 1, start
+                continue
+            for i in range(start, len(sentences)):
+                if spoken >= self.chunk_chars:
+                    return
+                cur.page, cur.sentence = page, i
+                spoken += len(sentences[i])
+                yield sentences[i]
+                cur.sentence = i + 1  # pulled again, so that sentence was spoken to the end
+            start = 0
+            cur.page, cur.sentence = page + 1, 0
+        if carry:
+            yield carry
+        self.cursors.pop(cur.path, None)
+        if self.current == cur.path:
+            self.current = None
+        yield "End of document."
+
+    # ---------- commands ----------
+    def read(self, path):
+        """Start reading path from the beginning."""
+        return self._stream(self._cursor(path, reset=True))
+
+    def resume(self):
+        """Continue the current document; None if nothing is being read."""
+        if self.current is None:
+            return None
+        return self._stream(self._cursor(self.current))
+
+    def next_page(self):
+        if self.current is None:
+            return None
+        cur = self._cursor(self.current)
+        cur.page, cur.sentence = cur.page + (1 if cur.sentence else 0), 0
+        return self._stream(cur)
+
+    def skip(self):
+        """Skip skip_sentences sentences ahead, then continue reading."""
+        if self.current is None:
+            return None
+        cur = self._cursor(self.current)
+        cur.sentence += self.skip_sentences
+        return self._stream(cur)
@@ -0,0 +1,239 @@
+"""
+executor.py
+Execuția comenzilor în afara thread-ului de recunoaștere.
+ - pool de worker-i cu coadă pe priorități; recognizer-ul doar pune comenzi în coadă
+ - timeout per comandă și token de anulare cooperativ (handler-ele îl verifică
+   între pași: propoziții citite, pagini extrase, răspunsuri primite)
+ - submit(..., preempt=True) anulează tot ce rulează sau așteaptă (ex. "stop")
+ - un worker blocat peste timeout este înlocuit, ca pool-ul să rămână disponibil
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+URGENT, HIGH, NORMAL, LOW = 0, 1, 2, 3
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise Cancelled if the job was cancelled or timed out."""
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+
+
+NO_TOKEN = CancelToken()  # for code running outside of a job; never cancelled
+
+
+class Job:
+    def __init__(self, seq, fn, args, kwargs, name, priority, timeout):
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name or getattr(fn, "__name__", "job")
+        self.priority = priority
+        self.timeout = timeout
+        self.token = CancelToken()
+        self.state = "queued"  # queued, running, done, failed, cancelled, timed_out
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.deadline = None
+        self._done = threading.Event()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def __repr__(self):
+        return f"Job({self.name!r}, {self.state})"
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def cancel(self, reason="cancelled"):
+        self.token.cancel(reason)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class CommandExecutor:
+    """Runs submitted callables on `workers` threads, most urgent first.
+
+    Python threads cannot be killed, so timeouts and cancellation are
+    cooperative: the job's token is cancelled and the handler stops at its
+    next check. A worker still stuck after its deadline is retired and a
+    fresh one takes its place; `on_timeout(job)` is called when that happens.
+    """
+
+    def __init__(self, workers=2, default_timeout=30.0, on_timeout=None):
+        self.workers = workers
+        self.default_timeout = default_timeout
+        self.on_timeout = on_timeout
+        self._queue = []
+        self._running = {}  # thread -> job
+        self._retired = set()
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._closed = False
+        self.stats_counts = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "timed_out": 0}
+        for _ in range(workers):
+            self._spawn()
+        threading.Thread(target=self._watchdog, daemon=True, name="executor-watchdog").start()
+
+    def _spawn(self):
+        threading.Thread(target=self._worker, daemon=True, name="executor-worker").start()
+
+    # ---------- API ----------
+    def submit(self, fn, *args, name=None, priority=NORMAL, timeout=None, preempt=False, **kwargs):
+        """Queue fn(*args, **kwargs); preempt=True first cancels all queued and running jobs."""
+        if preempt:
+            self.cancel_all("preempted")
+        job = Job(next(self._seq), fn, args, kwargs, name, priority,
+                  self.default_timeout if timeout is None else timeout)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("executor is shut down")
+            heapq.heappush(self._queue, job)
+            self.stats_counts["submitted"] += 1
+            self._cond.notify_all()
+        return job
+
+    def cancel_all(self, reason="cancelled"):
+        """Cancel every queued and running job; returns how many were affected."""
+        with self._cond:
+            jobs = self._queue + list(self._running.values())
+            self._queue = []
+        for job in jobs:
+            job.cancel(reason)
+            if job.state == "queued":
+                self._finish(job, "cancelled")
+        return len(jobs)
+
+    def current_token(self):
+        """Token of the job running on this thread (NO_TOKEN outside of a job)."""
+        job = getattr(self._local, "job", None)
+        return job.token if job is not None else NO_TOKEN
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or running."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._running:
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(left if left is not None else 0.1)
+        return True
+
+    def stats(self):
+        with self._cond:
+            return dict(self.stats_counts, queued=len(self._queue), running=len(self._running))
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.cancel_all("shutdown")
+
+    # ---------- internals ----------
+    def _finish(self, job, state, result=None, error=None):
+        with self._cond:
+            if job.done:
+                return
+            job.state = state
+            job.result = result
+            job.error = error
+            self.stats_counts[state] += 1
+            job._done.set()
+            self._cond.notify_all()
+
+    def _worker(self):
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                job = heapq.heappop(self._queue)
+                skip = job.token.cancelled
+                if not skip:
+                    job.state = "running"
+                    job.started = time.monotonic()
+                    job.deadline = job.started + job.timeout if job.timeout else None
+                    self._running[me] = job
+                    self._cond.notify_all()
+            if skip:
+                # cancelled with Job.cancel() while still queued
+                self._finish(job, "cancelled")
+                continue
+            self._local.job = job
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+                if job.token.cancelled:
+                    state = "timed_out" if job.token.reason == "timeout" else "cancelled"
+                    self._finish(job, state, result)
+                else:
+                    self._finish(job, "done", result)
+            except Cancelled:
+                self._finish(job, "timed_out" if job.token.reason == "timeout" else "cancelled")
+            except Exception as e:
+                print(f"Command '{job.name}' failed:", e)
+                self._finish(job, "failed", error=e)
+            finally:
+                self._local.job = None
+                with self._cond:
+                    self._running.pop(me, None)
+                    retired = me in self._retired
+                    self._retired.discard(me)
+                    self._cond.notify_all()
+            if retired:
+                return  # a replacement worker was started while this one was stuck
+
+    def _watchdog(self):
+        while True:
+            expired = []
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for thread, job in self._running.items():
+                    if job.deadline is not None and now >= job.deadline and thread not in self._retired:
+                        expired.append((thread, job))
+                        self._retired.add(thread)
+            for thread, job in expired:
+                job.cancel("timeout")
+                self._spawn()
+                if self.on_timeout:
+                    try:
+                        self.on_timeout(job)
+                    except Exception as e:
+                        print("Timeout handler error:", e)
+            time.sleep(0.1)
@@ -0,0 +1,396 @@
+"""
+extractors.py
+Extragere de text din fișierele pe care JARVIS le poate citi.
+ - registru de extractori după extensie (@register(".ext")), extensibil cu
+   module-plugin puse în extractor_plugins/
+ - .txt/.md/.py/.csv, .pdf (PyPDF2, importat doar când e nevoie), .docx,
+   .odt, .html/.htm, .json
+ - ExtractionPool: extragerea rulează în procese separate, cu timeout și
+   limită de memorie; un extractor blocat este omorât, nu blochează JARVIS
+"""
+
+import argparse
+import html.parser
+import importlib.util
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+if __name__ == "__main__":
+    # worker process: plugins import "extractors" and must register into this module
+    sys.modules.setdefault("extractors", sys.modules[__name__])
+
+PAGE_CHARS = 4000  # size of a "page" for formats without real pages
+PLUGIN_DIR = Path(__file__).resolve().parent / "extractor_plugins"
+
+EXTRACTORS = {}  # suffix -> function(path, start) yielding page texts
+SUPPORTED_SUFFIXES = set()  # kept in sync with EXTRACTORS by register()
+TEXT_SUFFIXES = {".txt", ".md", ".py", ".csv"}
+PDF_SUFFIXES = {".pdf"}
+
+
+def register(*suffixes):
+    """Decorator: use the function to extract pages from files with these suffixes."""
+    def _wrap(fn):
+        for suffix in suffixes:
+            EXTRACTORS[suffix.lower()] = fn
+            SUPPORTED_SUFFIXES.add(suffix.lower())
+        return fn
+    return _wrap
+
+
+def load_plugins(directory=PLUGIN_DIR):
+    """Import every module in directory; plugins call register() at import time."""
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".py") or name.startswith("_"):
+            continue
+        spec = importlib.util.spec_from_file_location(f"extractor_plugins.{name[:-3]}", os.path.join(directory, name))
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as e:
+            print(f"Extractor plugin {name} failed to load:", e)
+
+
+def paginate(paragraphs, start=0):
+    """Group paragraphs into pages of about PAGE_CHARS characters."""
+    page, buf, size = 0, [], 0
+    for p in paragraphs:
+        if not p:
+            continue
+        buf.append(p)
+        size += len(p) + 1
+        if size >= PAGE_CHARS:
+            if page >= start:
+                yield "\n".join(buf)
+            page, buf, size = page + 1, [], 0
+    if buf and page >= start:
+        yield "\n".join(buf)
+
+
+# -------------------- built-in extractors --------------------
+@register(*TEXT_SUFFIXES)
+def _text_pages(path, start):
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        page = 0
+        while True:
+            chunk = fh.read(PAGE_CHARS)
+            if not chunk:
+                break
+            # end the page on whitespace so no word is split across pages
+            for _ in range(100):
+                if chunk[-1].isspace():
+                    break
+                c = fh.read(1)
+                if not c:
+                    break
+                chunk += c
+            if page >= start:
+                yield chunk
+            page += 1
+
+
+@register(*PDF_SUFFIXES)
+def _pdf_pages(path, start):
+    import PyPDF2
+    with open(path, "rb") as fh:
+        reader = PyPDF2.PdfReader(fh)
+        for i in range(start, len(reader.pages)):
+            yield reader.pages[i].extract_text() or ""
+
+
+def _xml_paragraphs(path, member, tags):
+    with zipfile.ZipFile(path) as zf, zf.open(member) as fh:
+        for _, elem in ElementTree.iterparse(fh):
+            if elem.tag in tags:
+                yield "".join(elem.itertext()).strip()
+                elem.clear()
+
+
+@register(".docx")
+def _docx_pages(path, start):
+    w = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    return paginate(_xml_paragraphs(path, "word/document.xml", {w + "p"}), start)
+
+
+@register(".odt")
+def _odt_pages(path, start):
+    t = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+    return paginate(_xml_paragraphs(path, "content.xml", {t + "p", t + "h"}), start)
+
+
+class _HTMLText(html.parser.HTMLParser):
+    SKIP = {"script", "style", "head", "noscript"}
+    BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+             "section", "article", "blockquote", "pre", "td", "th"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._buf = []
+        self._skipping = 0
+
+    def _flush(self):
+        text = " ".join(" ".join(self._buf).split())
+        if text:
+            self.parts.append(text)
+        self._buf = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+        elif tag in self.BLOCK:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+        elif tag in self.BLOCK:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self._buf.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+@register(".html", ".htm")
+def _html_pages(path, start):
+    parser = _HTMLText()
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        for line in fh:
+            parser.feed(line)
+    parser.close()
+    return paginate(parser.parts, start)
+
+
+def _json_lines(value, prefix=""):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _json_lines(v, f"{prefix}{k} ")
+    elif isinstance(value, list):
+        for v in value:
+            yield from _json_lines(v, prefix)
+    elif value is not None:
+        yield f"{prefix.strip()}: {value}" if prefix else str(value)
+
+
+@register(".json")
+def _json_pages(path, start):
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        return paginate(_json_lines(json.load(fh)), start)
+
+
+load_plugins()
+
+
+# -------------------- in-process API --------------------
+def extract_pages(path, start=0, count=None):
+    """Yield the text of each page of path, beginning at page `start` (at most `count` pages)."""
+    ext = Path(path).suffix.lower()
+    fn = EXTRACTORS.get(ext)
+    if fn is None:
+        raise ValueError(f"Unsupported file type: {ext}")
+    pages = fn(path, start)
+    if count is None:
+        return pages
+    return (text for _, text in zip(range(count), pages))
+
+
+def extract_text(path, max_chars=None):
+    """Concatenated text of the whole document (or its first max_chars)."""
+    parts, total = [], 0
+    for page in extract_pages(path):
+        parts.append(page)
+        total += len(page)
+        if max_chars is not None and total >= max_chars:
+            break
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+# -------------------- isolated workers --------------------
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+class _Worker:
+    """One extractor process; jobs go in on stdin, pages come back as JSON lines."""
+
+    def __init__(self, memory_mb):
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", "--memory-mb", str(memory_mb or 0)]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True, encoding="utf-8", bufsize=1)
+        self.lines = queue.Queue(maxsize=4)  # small: a slow consumer throttles the worker
+        self.dead = False
+        threading.Thread(target=self._pump, daemon=True).start()
+
+    def _pump(self):
+        for line in self.proc.stdout:
+            while not self.dead:
+                try:
+                    self.lines.put(json.loads(line), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if self.dead:
+                return
+        self.dead = True
+        try:
+            self.lines.put_nowait({"error": "extractor process exited"})
+        except queue.Full:
+            pass
+
+    def alive(self):
+        return not self.dead and self.proc.poll() is None
+
+    def send(self, job):
+        self.proc.stdin.write(json.dumps(job) + "\n")
+        self.proc.stdin.flush()
+
+    def recv(self, timeout):
+        try:
+            return self.lines.get(timeout=timeout)
+        except queue.Empty:
+            raise ExtractionTimeout(f"no result within {timeout}s") from None
+
+    def kill(self):
+        self.dead = True
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class ExtractionPool:
+    """Bounded pool of extractor processes.
+
+    `timeout` is the longest the caller waits for a worker or for the next
+    page; a worker that misses it is killed and replaced. `memory_mb` caps
+    each worker's address space where the OS supports it (resource.setrlimit).
+    """
+
+    def __init__(self, max_workers=2, timeout=20, memory_mb=1024):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.killed = 0
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ExtractionTimeout("all extraction workers are busy")
+        with self._lock:
+            while self._idle:
+                w = self._idle.pop()
+                if w.alive():
+                    return w
+        try:
+            return _Worker(self.memory_mb)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker, reusable):
+        if reusable and worker.alive():
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            if worker.alive():
+                self.killed += 1
+            worker.kill()
+        self._slots.release()
+
+    def stream(self, path, start=0, count=None, max_chars=None):
+        """Like extract_pages, but the pages are produced by a worker process.
+
+        Closing the generator early kills the worker, so an abandoned
+        extraction never keeps running in the background.
+        """
+        worker = self._acquire()
+        reusable = False
+        try:
+            worker.send({"path": os.path.abspath(path), "start": start, "count": count, "max_chars": max_chars})
+            while True:
+                msg = worker.recv(self.timeout)
+                if "text" in msg:
+                    yield msg["text"]
+                elif "error" in msg:
+                    reusable = True
+                    raise ExtractionError(msg["error"])
+                else:
+                    reusable = True
+                    return
+        finally:
+            self._release(worker, reusable)
+
+    def extract_text(self, path, max_chars=None):
+        return "\n".join(self.stream(path, max_chars=max_chars))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for w in idle:
+            w.kill()
+
+
+def _worker_main(memory_mb):
+    if memory_mb:
+        try:
+            import resource
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # not available on Windows
+    out = sys.stdout
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            total = 0
+            for text in extract_pages(job["path"], job["start"], job["count"]):
+                out.write(json.dumps({"text": text}) + "\n")
+                out.flush()
+                total += len(text)
+                if job["max_chars"] is not None and total >= job["max_chars"]:
+                    break
+            out.write('{"end": true}\n')
+        except MemoryError:
+            out.write(json.dumps({"error": "out of memory"}) + "\n")
+            out.flush()
+            return
+        except Exception as e:
+            out.write(json.dumps({"error": f"{type(e).__name__}: {e}"}) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JARVIS document extraction worker.")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--memory-mb", type=int, default=0)
+    parser.add_argument("path", nargs="?")
+    args = parser.parse_args()
+    if args.worker:
+        _worker_main(args.memory_mb)
+    elif args.path:
+        t0 = time.monotonic()
+        for i, text in enumerate(extract_pages(args.path)):
+            print(f"--- page {i} ---\n{text}")
+        print(f"({time.monotonic() - t0:.2f}s)")
@@ -0,0 +1,227 @@
+"""
+file_index.py
+Index persistent de nume de fișiere (SQLite) pentru search_files.
+ - construit o singură dată, încărcat la pornire
+ - ținut la zi prin rescanări bazate pe mtime-ul directoarelor
+ - search() răspunde din index; dacă indexul lipsește sau e vechi, cade pe crawler.crawl
+ - dacă nu există potrivire exactă, caută aproximativ pe trigrame (fuzzy.py)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from crawler import IgnoreRules, crawl
+from fuzzy import TrigramIndex, normalize_name, normalize_query
+
+DEFAULT_INDEX_PATH = str(Path.home() / ".jarvis" / "file_index.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime REAL);
+CREATE TABLE IF NOT EXISTS files (dir TEXT, name TEXT, name_lower TEXT, path TEXT PRIMARY KEY);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+"""
+
+
+class FileIndex:
+    """Filename index over a set of root directories.
+
+    The index lives in a SQLite file. Directory mtimes are stored next to the
+    file entries, so a refresh only re-lists directories whose mtime changed.
+    """
+
+    def __init__(self, roots, db_path=DEFAULT_INDEX_PATH, rescan_interval=300, max_age=24 * 3600,
+                 ignore=None, root_budgets=None):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.ignore = ignore if ignore is not None else IgnoreRules()
+        self.root_budgets = {os.path.abspath(r): b for r, b in (root_budgets or {}).items()}
+        self.db_path = db_path
+        self.rescan_interval = rescan_interval
+        self.max_age = max_age
+        self.ready = False
+        self.fuzzy = TrigramIndex()
+        # refresh() writes through one connection, search() reads through
+        # another; WAL mode lets queries run while a rescan is in progress.
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+        self._read_conn = None
+
+    # ---------- storage ----------
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = self._open()
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _reader(self):
+        if self._read_conn is None:
+            self._connect()
+            self._read_conn = self._open()
+        return self._read_conn
+
+    def _meta(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._connect().execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, str(value)))
+
+    def load(self):
+        """Open the on-disk index. Returns True if it is usable right away."""
+        with self._lock:
+            self._connect()
+            roots_ok = self._meta("roots") == "\n".join(self.roots)
+            last = float(self._meta("refreshed_at", 0))
+            self.ready = roots_ok and (time.time() - last) < self.max_age
+        return self.ready
+
+    # ---------- scanning ----------
+    def _list_dir(self, path):
+        """Return (mtime, files, subdirs) for one directory, or None if it is gone."""
+        try:
+            mtime = os.stat(path).st_mtime
+            files, subdirs = [], []
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.ignore.match(entry.name):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+            return mtime, files, subdirs
+        except OSError:
+            return None
+
+    def _load_fuzzy(self):
+        with self._read_lock:
+            rows = self._reader().execute("SELECT path, name FROM files").fetchall()
+        for path, name in rows:
+            self.fuzzy.add(path, name)
+
+    def _drop_tree(self, conn, path):
+        stack = [path]
+        while stack:
+            d = stack.pop()
+            stack.extend(r[0] for r in conn.execute("SELECT path FROM dirs WHERE parent=?", (d,)))
+            for (gone,) in conn.execute("SELECT path FROM files WHERE dir=?", (d,)).fetchall():
+                self.fuzzy.remove(gone)
+            conn.execute("DELETE FROM files WHERE dir=?", (d,))
+            conn.execute("DELETE FROM dirs WHERE path=?", (d,))
+
+    def refresh(self):
+        """Rescan directories whose mtime changed since the last refresh.
+
+        On an empty index this is the initial full build. Returns the number of
+        directories that were re-listed.
+        """
+        changed = 0
+        with self._lock:
+            conn = self._connect()
+            if self._meta("roots") != "\n".join(self.roots):
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM dirs")
+                self.fuzzy = TrigramIndex()
+            stack = [(root, None) for root in self.roots]
+            while stack and not self._stop.is_set():
+                path, parent = stack.pop()
+                row = conn.execute("SELECT mtime FROM dirs WHERE path=?", (path,)).fetchone()
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    self._drop_tree(conn, path)
+                    continue
+                if row is not None and row[0] == mtime:
+                    # unchanged listing: only descend into the known subdirectories
+                    stack.extend((r[0], path) for r in conn.execute("SELECT path FROM dirs WHERE parent=?", (path,)))
+                    continue
+                listing = self._list_dir(path)
+                if listing is None:
+                    self._drop_tree(conn, path)
+                    continue
+                mtime, files, subdirs = listing
+                changed += 1
+                known = {r[0] for r in conn.execute("SELECT path FROM dirs WHERE parent=?", (path,))}
+                for gone in known.difference(subdirs):
+                    self._drop_tree(conn, gone)
+                old = {r[0] for r in conn.execute("SELECT name FROM files WHERE dir=?", (path,))}
+                for name in old.difference(files):
+                    self.fuzzy.remove(os.path.join(path, name))
+                for name in set(files).difference(old):
+                    self.fuzzy.add(os.path.join(path, name), name)
+                conn.execute("DELETE FROM files WHERE dir=?", (path,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO files(dir, name, name_lower, path) VALUES (?, ?, ?, ?)",
+                    [(path, f, f.lower(), os.path.join(path, f)) for f in files])
+                conn.execute("INSERT OR REPLACE INTO dirs(path, parent, mtime) VALUES (?, ?, ?)", (path, parent, mtime))
+                stack.extend((d, path) for d in subdirs)
+                if changed % 500 == 0:
+                    conn.commit()
+            if not self._stop.is_set():
+                self._set_meta("roots", "\n".join(self.roots))
+                self._set_meta("refreshed_at", time.time())
+                self.ready = True
+            conn.commit()
+        return changed
+
+    # ---------- background upkeep ----------
+    def start(self):
+        """Load the index and keep it current on a background thread."""
+        self.load()
+
+        def _run():
+            self._load_fuzzy()
+            while not self._stop.is_set():
+                try:
+                    t0 = time.monotonic()
+                    n = self.refresh()
+                    print(f"File index: {n} directories rescanned in {time.monotonic() - t0:.1f}s")
+                except Exception as e:
+                    print("File index error:", e)
+                self._stop.wait(self.rescan_interval)
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- queries ----------
+    def search(self, query, max_results=10, fuzzy=True):
+        """Case-insensitive substring search over file names.
+
+        When nothing contains the recognized text verbatim, the best trigram
+        matches are returned instead (unless fuzzy=False), so "resume p d f"
+        still finds Resume.pdf.
+        """
+        if not self.ready:
+            q = query.lower()
+            key = normalize_query(query) if fuzzy else ""
+            result = crawl(self.roots, lambda name: q in name.lower() or (key and key in normalize_name(name)),
+                           max_results=max_results, ignore=self.ignore, root_budgets=self.root_budgets)
+            print("Cold scan:\n" + result.report())
+            return result.paths
+        q = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._read_lock:
+            rows = self._reader().execute(
+                "SELECT path FROM files WHERE name_lower LIKE ? ESCAPE '\\' LIMIT ?",
+                (f"%{q}%", max_results)).fetchall()
+        if rows or not fuzzy:
+            return [r[0] for r in rows]
+        return [path for _, path in self.fuzzy.query(query, limit=max_results)]
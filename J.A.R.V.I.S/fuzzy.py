@@ -0,0 +1,124 @@
+"""
+fuzzy.py
+Potrivire aproximativă a numelor de fișiere pe trigrame.
+ - toleranță la spații ("resume p d f"), extensii rostite ("dot pdf", "text")
+   și cuvinte recunoscute greșit de Vosk
+ - index inversat trigramă -> nume, rezultate ordonate după similaritate (Dice)
+"""
+
+import math
+import os
+import re
+import threading
+from array import array
+
+# Words Vosk produces for spoken extensions / letters.
+FILLER_WORDS = {"dot", "file", "the", "my", "a", "an", "called", "named"}
+LETTER_NAMES = {
+    "pee": "p", "dee": "d", "eff": "f", "ef": "f", "tee": "t", "ex": "x", "ess": "s",
+    "see": "c", "cee": "c", "em": "m", "en": "n", "el": "l", "vee": "v", "why": "y",
+}
+EXTENSION_WORDS = {"text": "txt", "markdown": "md", "python": "py", "word": "docx", "excel": "xlsx"}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name):
+    """File basename -> matching key: lowercase letters and digits only."""
+    return _NON_ALNUM.sub("", name.lower())
+
+
+def normalize_query(text):
+    """Spoken query -> matching key ("resume dot p d f" -> "resumepdf")."""
+    words = [LETTER_NAMES.get(w, w) for w in text.lower().split()]
+    words = [w for w in words if w not in FILLER_WORDS]
+    if len(words) > 1 and words[-1] in EXTENSION_WORDS:
+        words[-1] = EXTENSION_WORDS[words[-1]]
+    return normalize_name("".join(words))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """In-memory trigram index over file basenames.
+
+    Deleted entries are tombstoned and the postings are compacted once the
+    tombstones outnumber a quarter of the index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.keys = []
+        self.paths = []
+        self.ids = {}  # path -> id
+        self.postings = {}  # trigram -> array of ids
+        self.dead = set()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, path, name=None):
+        key = normalize_name(name or os.path.basename(path))
+        if not key:
+            return
+        with self._lock:
+            if path in self.ids:
+                return
+            i = len(self.keys)
+            self.keys.append(key)
+            self.paths.append(path)
+            self.ids[path] = i
+            for t in trigrams(key):
+                self.postings.setdefault(t, array("I")).append(i)
+
+    def remove(self, path):
+        with self._lock:
+            i = self.ids.pop(path, None)
+            if i is not None:
+                self.dead.add(i)
+            if len(self.dead) > max(1000, len(self.keys) // 4):
+                self._compact()
+
+    def _compact(self):
+        live = [(self.paths[i], self.keys[i]) for i in range(len(self.keys)) if i not in self.dead]
+        self._clear()
+        for i, (path, key) in enumerate(live):
+            self.keys.append(key)
+            self.paths.append(path)
+            self.ids[path] = i
+            for t in trigrams(key):
+                self.postings.setdefault(t, array("I")).append(i)
+
+    def query(self, text, limit=10, threshold=0.5):
+        """Return [(score, path)] for names similar to text, best first."""
+        qkey = normalize_query(text)
+        if not qkey:
+            return []
+        qgrams = trigrams(qkey)
+        with self._lock:
+            # A name scoring >= threshold must share at least `need` trigrams
+            # with the query, so it has to appear in one of the len - need + 1
+            # rarest query postings (prefix filtering).
+            need = max(1, math.ceil(threshold * len(qgrams) / (2 - threshold)))
+            ordered = sorted(qgrams, key=lambda t: len(self.postings.get(t, ())))
+            candidates = set()
+            for t in ordered[:len(ordered) - need + 1]:
+                candidates.update(self.postings.get(t, ()))
+            candidates.difference_update(self.dead)
+            scored = []
+            for i in candidates:
+                key = self.keys[i]
+                grams = trigrams(key)
+                score = 2 * len(qgrams & grams) / (len(qgrams) + len(grams))
+                if qkey in key:
+                    score = max(score, 0.9)
+                if score >= threshold:
+                    scored.append((score, -len(key), self.paths[i]))
+        scored.sort(reverse=True)
+        return [(s, p) for s, _, p in scored[:limit]]
@@ -0,0 +1,159 @@
+"""
+intents.py
+Router de intenții pentru comenzile vocale, în locul lanțului de if-uri din handle_command.
+ - fiecare intenție are pattern-uri regex (cu sloturi numite, ex. (?P<target>.+))
+   și extractori de sloturi care curăță valoarea
+ - toate pattern-urile sunt compilate o singură dată într-un singur regex
+   combinat; potrivirea se face pe toată comanda, pe cuvinte întregi
+ - dispatch() întoarce intenția cea mai bună (prioritate, apoi cea mai
+   specifică) împreună cu sloturile extrase
+ - comenzi noi pot fi adăugate ca plugin-uri în intent_plugins/
+"""
+
+import importlib.util
+import os
+import re
+import threading
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent / "intent_plugins"
+
+_GROUP = re.compile(r"\(\?P<(\w+)>")
+_FILLER = {"the", "a", "an", "my", "file", "document", "please"}
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s'.-]", " ", text.lower()).split()).rstrip(".")
+
+
+def clean_target(value):
+    """Slot extractor for file/app names: strips filler words around the name."""
+    words = value.split()
+    while words and words[0] in _FILLER:
+        words.pop(0)
+    while words and words[-1] in _FILLER:
+        words.pop()
+    return " ".join(words) or value.strip()
+
+
+def _specificity(pattern):
+    # literal characters outside of the slots: "search for (?P<target>.+)" beats "(?P<target>.+)"
+    return len(re.sub(r"\(\?P<\w+>.*?\)|[\\()?:|*+.\[\]^$]", "", pattern))
+
+
+class Intent:
+    def __init__(self, name, patterns, handler, priority=0, slots=None):
+        self.name = name
+        self.patterns = list(patterns)
+        self.handler = handler
+        self.priority = priority
+        self.slots = slots or {}
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class Match:
+    def __init__(self, intent, slots, text):
+        self.intent = intent
+        self.slots = slots
+        self.text = text
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    def run(self):
+        return self.intent.handler(**self.slots)
+
+    def __repr__(self):
+        return f"Match({self.intent.name!r}, {self.slots!r})"
+
+
+class IntentRouter:
+    """Registry of intents, compiled into one alternation regex on first dispatch."""
+
+    def __init__(self):
+        self.intents = []
+        self._regex = None
+        self._groups = {}  # alternative group name -> (intent, {renamed slot group: slot name})
+        self._lock = threading.Lock()
+
+    # ---------- registration ----------
+    def add(self, name, patterns, handler, priority=0, slots=None):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        with self._lock:
+            self.intents.append(Intent(name, patterns, handler, priority, slots))
+            self._regex = None  # recompiled on the next dispatch
+
+    def intent(self, name, *patterns, priority=0, slots=None):
+        """Decorator: register the function as the handler of an intent.
+
+        The handler is called with the named groups of the matching pattern as
+        keyword arguments, after running them through their slot extractors.
+        """
+        def _wrap(fn):
+            self.add(name, patterns, fn, priority, slots)
+            return fn
+        return _wrap
+
+    def load_plugins(self, app, directory=PLUGIN_DIR):
+        """Import every module in directory and call its setup(router, app)."""
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".py") or name.startswith("_"):
+                continue
+            spec = importlib.util.spec_from_file_location(f"intent_plugins.{name[:-3]}", os.path.join(directory, name))
+            module = importlib.util.module_from_spec(spec)
+            try:
+                spec.loader.exec_module(module)
+                module.setup(self, app)
+            except Exception as e:
+                print(f"Intent plugin {name} failed to load:", e)
+
+    # ---------- compilation ----------
+    def _compile(self):
+        alternatives = []
+        groups = {}
+        for i, intent in enumerate(self.intents):
+            for j, pattern in enumerate(intent.patterns):
+                alt = f"i{i}_{j}"
+                renamed = {}
+
+                def _rename(m, alt=alt, renamed=renamed):
+                    renamed[f"{alt}__{m.group(1)}"] = m.group(1)
+                    return f"(?P<{alt}__{m.group(1)}>"
+                body = _GROUP.sub(_rename, pattern)
+                groups[alt] = (intent, renamed)
+                alternatives.append(((-intent.priority, -_specificity(pattern), i, j), f"(?P<{alt}>{body})"))
+        # the regex engine takes the first alternative that matches, so order is the ranking
+        alternatives.sort(key=lambda a: a[0])
+        regex = re.compile("|".join(body for _, body in alternatives) or r"(?!)")
+        return regex, groups
+
+    def compile(self):
+        with self._lock:
+            if self._regex is None:
+                self._regex, self._groups = self._compile()
+            return self._regex
+
+    # ---------- dispatch ----------
+    def dispatch(self, text):
+        """Best Match for text (already normalized or not), or None."""
+        text = normalize(text)
+        m = self.compile().fullmatch(text)
+        if m is None:
+            return None
+        alt = m.lastgroup
+        intent, renamed = self._groups[alt]
+        slots = {}
+        for group, slot in renamed.items():
+            value = m.group(group)
+            if value is None:
+                continue
+            extract = intent.slots.get(slot)
+            slots[slot] = extract(value) if extract else value.strip()
+        return Match(intent, slots, text)
@@ -1,40 +1,79 @@
 # jarvis.py
 import speech_recognition as sr
-import pyttsx3
 import os
+import sys
 import subprocess
 import platform
 import time
 from pathlib import Path
-import PyPDF2
+from file_index import FileIndex, DEFAULT_INDEX_PATH
+from content_index import ContentIndex, DEFAULT_CONTENT_INDEX_PATH
+from extractors import PDF_SUFFIXES, SUPPORTED_SUFFIXES, ExtractionPool
+from text_cache import TextCache, DEFAULT_TEXT_CACHE_PATH
+from doc_reader import DocumentReader
+from tracing import tracer
+from intents import IntentRouter, clean_target
+from speech import SpeechEngine
+from speech_cache import PhraseCache, AudioPlayer, DEFAULT_SPEECH_CACHE_DIR
 
 # CONFIG
 WAKE_WORD = "jarvis"
 VOICE_LANGUAGE = "en"  # limbă de recunoaștere (speech_recognition folosește engleză implicit la Google)
 ROOT_SEARCH_PATHS = [str(Path.home())]  # unde caută fișiere (poți adăuga "C:\\Users\\You\\Documents")
+INDEX_PATH = DEFAULT_INDEX_PATH  # indexul persistent de nume de fișiere
+INDEX_RESCAN_INTERVAL = 300  # secunde între rescanările incrementale
+ROOT_SCAN_BUDGETS = {}  # buget de timp (s) per rădăcină la scanarea la rece (ex. un drive montat lent)
+CONTENT_INDEX_PATH = DEFAULT_CONTENT_INDEX_PATH  # indexul full-text al documentelor
+CONTENT_INDEX_INTERVAL = 900  # secunde între actualizările indexului de conținut
+TEXT_CACHE_PATH = DEFAULT_TEXT_CACHE_PATH  # cache-ul de text extras din documente
+TEXT_CACHE_MAX_MB = 64
+READ_CHUNK_CHARS = 1500  # câte caractere citește o comandă "read"/"continue"
+EXTRACT_WORKERS = 2  # procese pentru extragerea textului din documente
+EXTRACT_TIMEOUT = 20  # secunde de așteptare pentru o pagină înainte de a opri extractorul
+EXTRACT_MEMORY_MB = 1024  # limită de memorie per proces de extragere (Linux/macOS)
+TRACING = True  # latența pe etape; sumarul p50/p95/p99 e afișat la ieșire
+SPEECH_CACHE_DIR = DEFAULT_SPEECH_CACHE_DIR  # audio pre-randat pentru frazele fixe ("Yes?", ajutor)
+ACTIVATION_SOUND = str(Path(__file__).resolve().parent / "activation.mp3")  # sunet de pornire; .mp3 cere ffmpeg, None = fără sunet
 
-# Init TTS
-tts = pyttsx3.init()
-# Optionally set voice properties
-tts.setProperty("rate", 160)  # viteză
-tts.setProperty("volume", 1.0)
+tracer.enabled = TRACING
+
+# TTS: a single thread owns pyttsx3, started on first use (benchmark.py imports this module without audio devices)
+phrase_cache = PhraseCache(SPEECH_CACHE_DIR, rate=160, volume=1.0)
+speech = SpeechEngine(rate=160, volume=1.0, on_start=tracer.speech_started, cache=phrase_cache, player=AudioPlayer())
+
+READY_TEXT = "J. A. R. V. I. S. here. I'm listening."
+HELP_TEXT = "I didn't understand exactly. I can open files, search, read files, tell the time. Try: 'Jarvis open resume pdf' or 'Jarvis read project notes'."
+# said often: rendered once, then played from the cache right away
+CACHED_PHRASES = [READY_TEXT, HELP_TEXT, "Yes?", "I didn't catch the command.", "I couldn't find that file to read.",
+                  "I couldn't find anything with that name.", "I'm not reading anything right now.", "Goodbye."]
 
 def speak(text):
     print("JARVIS (speaks):", text)
-    tts.say(text)
-    tts.runAndWait()
+    tracer.speech_requested()
+    return speech.say(text)
+
+def speak_sentences(sentences):
+    tracer.speech_requested()
+    speech.say_each(sentences, on_sentence=lambda sentence: print("JARVIS (speaks):", sentence))
 
 # STT init
 recognizer = sr.Recognizer()
-mic = sr.Microphone()
+mic = None  # opened by listen(), so importing needs no microphone
+last_speech_end = None  # monotonic time the last phrase ended
 
 def listen(timeout=None, phrase_time_limit=None):
+    global mic, last_speech_end
+    speech.wait_idle()  # don't record our own voice
+    if mic is None:
+        mic = sr.Microphone()
     with mic as source:
         recognizer.adjust_for_ambient_noise(source, duration=0.6)
         try:
             audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            last_speech_end = time.monotonic()
             # Use Google Web Speech API (default) - requires internet.
-            text = recognizer.recognize_google(audio, language="en-US")
+            with tracer.span("recognize_google"):
+                text = recognizer.recognize_google(audio, language="en-US")
             return text.lower()
         except sr.WaitTimeoutError:
             return ""
@@ -62,109 +101,132 @@ def open_with_default(path):
     except Exception as e:
         speak(f"Failed to open {os.path.basename(path)}: {e}")
 
-# Helper: search for files by name pattern
-def search_files(query, max_results=5):
-    results = []
-    q_lower = query.lower()
-    for root in ROOT_SEARCH_PATHS:
-        for dirpath, dirnames, filenames in os.walk(root):
-            for f in filenames:
-                if q_lower in f.lower():
-                    results.append(os.path.join(dirpath, f))
-                    if len(results) >= max_results:
-                        return results
-    return results
-
-# Helper: read text file or PDF (first N chars/pages)
-def read_file(path, max_chars=1500):
+# Helper: search for files by name pattern (answered from the file index)
+file_index = FileIndex(ROOT_SEARCH_PATHS, INDEX_PATH, rescan_interval=INDEX_RESCAN_INTERVAL,
+                       root_budgets=ROOT_SCAN_BUDGETS)
+
+@tracer.traced("search_files")
+def search_files(query, max_results=5, fuzzy=True):
+    return file_index.search(query, max_results, fuzzy)
+
+content_index = ContentIndex(CONTENT_INDEX_PATH)
+
+# Helper: read a document (text, PDF, docx...) sentence by sentence, through the extracted-text cache
+extraction_pool = ExtractionPool(EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB)
+text_cache = TextCache(TEXT_CACHE_PATH, max_bytes=TEXT_CACHE_MAX_MB * 1024 * 1024,
+                       extract=extraction_pool.stream)
+reader = DocumentReader(text_cache, chunk_chars=READ_CHUNK_CHARS)
+
+@tracer.traced("read_file")
+def read_file(path):
     path = str(path)
     if not os.path.exists(path):
         speak("File not found.")
         return
     ext = Path(path).suffix.lower()
+    if ext not in SUPPORTED_SUFFIXES:
+        speak("I can't read that type of file yet.")
+        return
     try:
-        if ext in ['.txt', '.md', '.py', '.csv']:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read(max_chars)
-                speak(text if text else "File is empty.")
-        elif ext in ['.pdf']:
-            with open(path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                if len(reader.pages) > 0:
-                    page0 = reader.pages[0]
-                    text = page0.extract_text() or ""
-                    speak(text[:max_chars] if text else "I couldn't extract text from that PDF.")
-                else:
-                    speak("PDF has no pages.")
+        text = text_cache.page(path, 0)
+        if text is None:
+            speak("PDF has no pages." if ext in PDF_SUFFIXES else "File is empty.")
+        elif text:
+            speak_sentences(reader.read(path))
         else:
-            speak("I can only read simple text files and PDFs for now.")
+            speak("I couldn't extract any text from that document.")
     except Exception as e:
         speak(f"Error reading file: {e}")
 
-# Handle recognized command text
-def handle_command(text):
-    print("Heard:", text)
-    if not text:
-        return
+# Command handlers, registered as intents (see intents.py)
+router = IntentRouter()
 
-    # Basic commands
-    if text.startswith("open "):
-        target = text.replace("open ", "", 1).strip()
-        # search for file or app
-        files = search_files(target, max_results=3)
-        if files:
-            open_with_default(files[0])
-        else:
-            # try to open application by name (windows: start)
-            try:
-                if platform.system() == "Windows":
-                    subprocess.Popen(["start", "", target], shell=True)
-                elif platform.system() == "Darwin":
-                    subprocess.Popen(["open", "-a", target])
-                else:
-                    subprocess.Popen([target])
-                speak(f"Attempting to open {target}")
-            except Exception:
-                speak(f"I couldn't find or open {target}")
-        return
+@router.intent("open", r"open (?P<target>.+)", slots={"target": clean_target})
+def open_intent(target):
+    # search for file or app
+    files = search_files(target, max_results=3)
+    if files:
+        open_with_default(files[0])
+    else:
+        # try to open application by name (windows: start)
+        try:
+            if platform.system() == "Windows":
+                subprocess.Popen(["start", "", target], shell=True)
+            elif platform.system() == "Darwin":
+                subprocess.Popen(["open", "-a", target])
+            else:
+                subprocess.Popen([target])
+            speak(f"Attempting to open {target}")
+        except Exception:
+            speak(f"I couldn't find or open {target}")
 
-    if text.startswith("search for "):
-        target = text.replace("search for ", "", 1).strip()
-        results = search_files(target, max_results=5)
-        if results:
-            speak(f"I found {len(results)} items. Opening first match.")
-            open_with_default(results[0])
-        else:
-            speak("I couldn't find anything with that name.")
-        return
+@router.intent("search", r"(?:search|look) for (?P<target>.+)", r"find (?P<target>.+)", slots={"target": clean_target})
+def search_intent(target):
+    results = search_files(target, max_results=5, fuzzy=False)
+    if not results:
+        # nothing named like that: look inside documents, then for similar names
+        results = [hit.path for hit in content_index.search(target, limit=5)]
+        results = results or search_files(target, max_results=5)
+    if results:
+        speak(f"I found {len(results)} items. Opening first match.")
+        open_with_default(results[0])
+    else:
+        speak("I couldn't find anything with that name.")
 
-    if text.startswith("read ") or "read file" in text:
-        # try to parse filename
-        target = text.replace("read ", "", 1).replace("read file ", "", 1).strip()
-        files = search_files(target, max_results=3)
-        if files:
-            read_file(files[0])
-        else:
-            speak("I couldn't find that file to read.")
-        return
+def _continue_reading(sentences):
+    if sentences is None:
+        speak("I'm not reading anything right now.")
+    else:
+        speak_sentences(sentences)
 
-    if "time" in text:
-        speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
-        return
+# reading controls for the current document
+router.add("resume_reading", [r"continue(?: reading)?", r"keep reading"], lambda: _continue_reading(reader.resume()))
+router.add("next_page", r"next page", lambda: _continue_reading(reader.next_page()))
+router.add("skip", r"skip(?: ahead)?", lambda: _continue_reading(reader.skip()))
 
-    if "hello" in text or "hi" in text:
-        speak("Hello. How can I help you today?")
-        return
+@router.intent("read", r"read(?: file)? (?P<target>.+)", slots={"target": clean_target})
+def read_intent(target):
+    files = search_files(target, max_results=3)
+    if files:
+        read_file(files[0])
+    else:
+        speak("I couldn't find that file to read.")
+
+@router.intent("time", r"what time is it", r"what's the time", r"tell me the time", priority=-1)
+def time_intent():
+    speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
 
-    if "stop listening" in text or "goodbye" in text or "shutdown" in text:
-        speak("Shutting down. Bye!")
-        raise SystemExit
+@router.intent("hello", r"(?:hello|hi|hey)(?: jarvis)?", priority=-1)
+def hello_intent():
+    speak("Hello. How can I help you today?")
 
-    # fallback
-    speak("I didn't understand exactly. I can open files, search, read files, tell the time. Try: 'Jarvis open resume pdf' or 'Jarvis read project notes'.")
+@router.intent("shutdown", r"(?:jarvis )?(?:stop listening|shutdown|shut down|goodbye)", priority=-1)
+def shutdown_intent():
+    speak("Shutting down. Bye!")
+    speech.wait_idle(5)
+    raise SystemExit
+
+# extra commands from intent_plugins/
+router.load_plugins(sys.modules[__name__])
+
+# Handle recognized command text
+@tracer.traced("handle_command")
+def handle_command(text):
+    print("Heard:", text)
+    if not text:
+        return
+    match = router.dispatch(text)
+    if match is None:
+        speak(HELP_TEXT)
+        return
+    match.run()
 
 def main_loop():
-    speak("J. A. R. V. I. S. here. I'm listening.")
+    file_index.start()
+    content_index.start(INDEX_PATH, CONTENT_INDEX_INTERVAL)
+    speech.play(phrase_cache.load_sound(ACTIVATION_SOUND))
+    speak(READY_TEXT)
+    speech.warm(CACHED_PHRASES)
     while True:
         print("Listening for wake word...")
         text = listen(timeout=5, phrase_time_limit=6)
@@ -179,7 +241,11 @@ def main_loop():
                 # listen for the next phrase (the real command)
                 command = listen(timeout=6, phrase_time_limit=8)
             if command:
-                handle_command(command)
+                trace = tracer.begin(last_speech_end)
+                try:
+                    handle_command(command)
+                finally:
+                    tracer.end(trace)
             else:
                 speak("I didn't catch the command.")
         # else: ignore until wake word
@@ -190,3 +256,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("Exiting...")
         speak("Goodbye.")
+        speech.wait_idle(5)
+        print(tracer.report())
@@ -0,0 +1,187 @@
+"""
+jarvis_client.py
+Client subțire pentru jarvis_daemon.py: trimite comenzi fără să le rostești.
+ - doar biblioteca standard, deci pornește instant (modelul, indexul și TTS-ul stau în daemon)
+ - protocol: câte un obiect JSON pe linie, pe socket-ul Unix ~/.jarvis/jarvis.sock
+   (sau pe 127.0.0.1:PORT, pe Windows ori cu --port)
+ - fiecare cerere poartă secretul din ~/.jarvis/daemon.token (scris de daemon, citibil doar de utilizator)
+ - comenzi text, fișiere audio (WAV/PCM 16-bit mono, trimise pe bucăți) și starea daemon-ului
+Exemple: python jarvis_client.py open resume pdf
+         python jarvis_client.py --quiet what time is it
+         python jarvis_client.py --audio command.wav
+         python jarvis_client.py --status
+"""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import sys
+import wave
+from pathlib import Path
+
+DEFAULT_SOCKET_PATH = str(Path.home() / ".jarvis" / "jarvis.sock")
+DEFAULT_TOKEN_PATH = str(Path.home() / ".jarvis" / "daemon.token")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+AUDIO_CHUNK_MS = 250
+
+
+def use_unix_socket(port=None):
+    return port is None and hasattr(socket, "AF_UNIX")
+
+
+def read_token(path=DEFAULT_TOKEN_PATH):
+    """The daemon's per-user secret, or None if it hasn't written one yet."""
+    try:
+        with open(path, encoding="ascii") as fh:
+            return fh.read().strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+class DaemonNotRunning(ConnectionError):
+    pass
+
+
+class JarvisClient:
+    """One connection to the daemon; request() sends a JSON object and returns the reply."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, port=None, host=DEFAULT_HOST, timeout=60.0,
+                 token_path=DEFAULT_TOKEN_PATH):
+        self.socket_path = socket_path
+        self.port = port
+        self.host = host
+        self.timeout = timeout
+        self.token_path = token_path
+        self._token = None
+        self._sock = None
+        self._file = None
+
+    def connect(self):
+        if self._sock is not None:
+            return self
+        self._token = read_token(self.token_path)
+        if self._token is None:
+            raise DaemonNotRunning(f"no daemon token at {self.token_path}")
+        try:
+            if use_unix_socket(self.port):
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            else:
+                sock = socket.create_connection((self.host, self.port or DEFAULT_PORT), timeout=self.timeout)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonNotRunning(str(e)) from e
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, payload):
+        self.connect()
+        self._file.write(json.dumps(dict(payload, token=self._token)).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("the daemon closed the connection")
+        return json.loads(line)
+
+    def command(self, text, speak=True, wait=True):
+        """Run a text command; the reply lists what JARVIS said while running it."""
+        return self.request({"op": "command", "text": text, "speak": speak, "wait": wait})
+
+    def status(self):
+        return self.request({"op": "status"})
+
+    def send_audio(self, pcm, sample_rate=16000, speak=True, chunk_ms=AUDIO_CHUNK_MS, on_partial=None):
+        """Stream 16-bit mono PCM for recognition; the last reply has the text and the command's result."""
+        step = sample_rate * chunk_ms // 1000 * 2
+        reply = {}
+        for i in range(0, len(pcm), step):
+            reply = self.request({"op": "audio", "sample_rate": sample_rate,
+                                  "pcm": base64.b64encode(pcm[i:i + step]).decode("ascii")})
+            if not reply.get("ok"):
+                return reply
+            if on_partial and reply.get("partial"):
+                on_partial(reply["partial"])
+        return self.request({"op": "audio", "sample_rate": sample_rate, "pcm": "", "final": True, "speak": speak})
+
+    def shutdown(self):
+        return self.request({"op": "shutdown"})
+
+
+def read_pcm(path, rate=16000):
+    """(samples as bytes, sample rate) of a 16-bit mono WAV file, or of raw PCM at `rate`."""
+    if not path.lower().endswith(".wav"):
+        with open(path, "rb") as fh:
+            return fh.read(), rate
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2 or w.getnchannels() != 1:
+            raise ValueError(f"{os.path.basename(path)}: expected 16-bit mono PCM")
+        return w.readframes(w.getnframes()), w.getframerate()
+
+
+def _print_reply(reply):
+    if not reply.get("ok"):
+        print("Error:", reply.get("error"))
+        return
+    if reply.get("text") is not None:
+        print("Heard:", reply["text"] or "(nothing)")
+    for line in reply.get("replies", []):
+        print("JARVIS:", line)
+    if reply.get("state") not in (None, "done"):
+        print(f"({reply['state']}{': ' + reply['error'] if reply.get('error') else ''})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send commands to a running JARVIS daemon.")
+    parser.add_argument("text", nargs="*", help="command text, e.g. open resume pdf")
+    parser.add_argument("--audio", help="a .wav (16-bit mono) or raw .pcm file to recognize and run")
+    parser.add_argument("--rate", type=int, default=16000, help="sample rate of a raw .pcm file")
+    parser.add_argument("--status", action="store_true", help="print the daemon's status")
+    parser.add_argument("--shutdown", action="store_true", help="stop the daemon")
+    parser.add_argument("--quiet", action="store_true", help="don't speak the answer aloud, only print it")
+    parser.add_argument("--no-wait", action="store_true", help="return as soon as the command is queued")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--port", type=int, help="connect over TCP on 127.0.0.1 instead of the Unix socket")
+    parser.add_argument("--token-file", default=DEFAULT_TOKEN_PATH)
+    args = parser.parse_args(argv)
+    if not (args.text or args.audio or args.status or args.shutdown):
+        parser.error("nothing to send: give a command, --audio, --status or --shutdown")
+
+    try:
+        with JarvisClient(args.socket, args.port, token_path=args.token_file) as client:
+            if args.status:
+                print(json.dumps(client.status(), indent=2))
+            if args.audio:
+                pcm, rate = read_pcm(args.audio, args.rate)
+                _print_reply(client.send_audio(pcm, rate, speak=not args.quiet,
+                                               on_partial=lambda text: print("...", text)))
+            if args.text:
+                _print_reply(client.command(" ".join(args.text), speak=not args.quiet, wait=not args.no_wait))
+            if args.shutdown:
+                _print_reply(client.shutdown())
+    except DaemonNotRunning:
+        print("The JARVIS daemon is not running. Start it with: python jarvis_daemon.py")
+        return 2
+    except (OSError, ValueError) as e:
+        print("Error:", e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
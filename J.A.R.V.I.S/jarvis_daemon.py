@@ -0,0 +1,343 @@
+"""
+jarvis_daemon.py
+JARVIS rezident: un singur proces ține încălzite modelul Vosk, recognizer-ul, indexul de fișiere și TTS-ul.
+ - rulează jarvis_vosk.py sau jarvis_vosk_openai.py (--script), cu microfon sau fără (--no-mic)
+ - API local, câte un obiect JSON pe linie, pe un socket Unix (~/.jarvis/jarvis.sock, doar pentru
+   utilizatorul curent) sau pe 127.0.0.1 (Windows ori --port)
+ - fiecare cerere trebuie să conțină "token": secretul din ~/.jarvis/daemon.token (0600);
+   o linie care nu e JSON (ex. o cerere HTTP venită dintr-un browser) închide conexiunea
+   {"op": "command", "text": "open resume pdf", "speak": true, "wait": true}
+   {"op": "audio", "sample_rate": 16000, "pcm": "<base64>", "final": false}   (PCM 16-bit mono, pe bucăți)
+   {"op": "status"}, {"op": "ping"}, {"op": "shutdown"}
+ - răspunsul unei comenzi conține ce a spus JARVIS în timp ce o executa; cu "speak": false
+   nimic nu e rostit, iar textul citit dintr-un document ("read ...") vine tot în răspuns
+ - clientul (jarvis_client.py) folosește doar biblioteca standard și pornește instant
+Exemplu: python jarvis_daemon.py --script jarvis_vosk_openai
+         python jarvis_client.py what time is it
+"""
+
+import _thread
+import argparse
+import base64
+import hmac
+import importlib
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+import time
+
+from jarvis_client import (DEFAULT_SOCKET_PATH, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_TOKEN_PATH, JarvisClient,
+                           DaemonNotRunning, read_token, use_unix_socket)
+from tracing import tracer
+
+COMMAND_WAIT_SLACK = 5  # seconds past the handler timeout before a waiting client gets an answer anyway
+MAX_LINE_BYTES = 4 * 1024 * 1024  # one request line (audio chunks are base64)
+
+
+def ensure_token(path=DEFAULT_TOKEN_PATH):
+    """The per-user secret clients must send; created once, readable and writable by its owner only."""
+    token = read_token(path)
+    if token is not None:
+        os.chmod(path, 0o600)
+        return token
+    token = secrets.token_hex(32)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    try:
+        os.remove(tmp)  # O_CREAT would keep the mode of a leftover file
+    except OSError:
+        pass
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as fh:
+        fh.write(token)
+    os.replace(tmp, path)
+    return token
+
+
+class JarvisDaemon:
+    """Serves IPC requests against one loaded JARVIS module (jarvis_vosk or jarvis_vosk_openai)."""
+
+    def __init__(self, module, mic=True, token=None):
+        self.m = module
+        self.mic = mic
+        self.token = token or ensure_token()
+        self.started = time.monotonic()
+        self.counts = {"connections": 0, "commands": 0, "audio_commands": 0, "errors": 0, "refused": 0}
+        self._replies = {}  # id(job token) -> (job, {"lines": [...], "speak": bool})
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # every speak() of the module goes through here, so replies can be sent back to the client
+        self._speak_aloud = module.speak
+        module.speak = self._speak
+        # and so does reading a document, which the module speaks from a job of its own
+        self._read_aloud = module.speak_sentences
+        module.speak_sentences = self._speak_sentences
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _reply(self):
+        """The reply being collected for the client command running on this thread, if any."""
+        token = self.m.executor.current_token()
+        with self._lock:  # also waits until command() has registered a job submitted just now
+            return self._replies.get(id(token), (None, None))[1]
+
+    def _speak(self, text, *args, **kwargs):
+        reply = self._reply()
+        if reply is not None:
+            reply["lines"].append(text)
+            if not reply["speak"]:
+                print("JARVIS (to client):", text)
+                return None
+        return self._speak_aloud(text, *args, **kwargs)
+
+    def _speak_sentences(self, sentences):
+        reply = self._reply()
+        if reply is None or reply["speak"]:
+            return self._read_aloud(sentences)
+        # not spoken: the sentences go back to the client, and pulling them moves the reading
+        # cursor as if they had been read, so "continue" goes on from there
+        token = self.m.executor.current_token()
+        for sentence in sentences:
+            if token.cancelled:
+                break
+            reply["lines"].append(sentence)
+
+    # ---------- warm-up ----------
+    def warm_up(self):
+        """Without a microphone: load what main() would, then keep it resident."""
+        m = self.m
+        m.loader.start()
+        m.loader.wait_ready()
+        if m.loader.pipeline is None:
+            raise RuntimeError(f"could not load the Vosk model: {m.loader.error}")
+        m.pipeline = m.loader.pipeline
+        with m.startup.phase("file_index_load"):
+            m.file_index.start()
+        m.content_index.start(m.INDEX_PATH, m.CONTENT_INDEX_INTERVAL)
+        m.speech.warm(m.CACHED_PHRASES)
+        print(m.startup.report())
+
+    # ---------- requests ----------
+    def handle(self, request, session):
+        op = request.get("op")
+        if op == "command":
+            text = str(request.get("text", "")).lower().strip()
+            if not text:
+                return {"ok": False, "error": "empty command"}
+            self._count("commands")
+            return self.command(text, request.get("speak", True), request.get("wait", True))
+        if op == "audio":
+            return self.audio(request, session)
+        if op == "status":
+            return dict(self.status(), ok=True)
+        if op == "ping":
+            return {"ok": True, "ready": self.m.loader.wait_ready(0)}
+        if op == "shutdown":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def command(self, text, speak=True, wait=True):
+        print("Command (client):", text)
+        trace = tracer.begin()
+        reply = {"lines": [], "speak": bool(speak)}
+        with self._lock:
+            # forget finished jobs that nobody waited for
+            for key in [k for k, (old, _) in self._replies.items() if old.done]:
+                del self._replies[key]
+            job = self.m.submit_command(text, trace)
+            self._replies[id(job.token)] = (job, reply)
+        if not wait:
+            return {"ok": True, "state": job.state, "replies": []}
+        job.wait(self.m.HANDLER_TIMEOUT + COMMAND_WAIT_SLACK)
+        return {"ok": True, "state": job.state, "replies": list(reply["lines"]),
+                "error": str(job.error) if job.error else None}
+
+    def audio(self, request, session):
+        """Recognize a client's audio stream with its own recognizer on the shared model."""
+        model = self.m.loader.model
+        if model is None:
+            return {"ok": False, "error": "the speech model is still loading"}
+        rate = int(request.get("sample_rate", self.m.SAMPLE_RATE))
+        rec = session.get("recognizer")
+        if rec is None or session.get("rate") != rate:
+            from vosk import KaldiRecognizer
+            rec = session["recognizer"] = KaldiRecognizer(model, rate)
+            session["rate"] = rate
+        try:
+            pcm = base64.b64decode(request.get("pcm") or "")
+        except ValueError:
+            return {"ok": False, "error": "pcm must be base64"}
+        if pcm:
+            rec.AcceptWaveform(pcm)
+        if not request.get("final"):
+            return {"ok": True, "partial": json.loads(rec.PartialResult()).get("partial", "")}
+        text = json.loads(rec.FinalResult()).get("text", "")
+        session.pop("recognizer", None)
+        # the wake word is optional here: the client already chose to talk to JARVIS
+        text = " ".join(w for w in text.split() if w != self.m.WAKE_WORD)
+        print("Heard (client):", text)
+        if not text:
+            return {"ok": True, "text": "", "state": None, "replies": []}
+        self._count("audio_commands")
+        return dict(self.command(text, request.get("speak", True), request.get("wait", True)), text=text)
+
+    def status(self):
+        m = self.m
+        out = {"script": m.__name__, "pid": os.getpid(), "uptime_s": round(time.monotonic() - self.started, 1),
+               "ready": m.loader.wait_ready(0), "startup_ms": m.startup.summary(), "daemon": dict(self.counts),
+               "executor": m.executor.stats(), "speech": m.speech.stats(), "vad": m.vad.stats(),
+               "audio_buffer": m.audio_buf.stats(), "stages": tracer.summary()}
+        for name in ("llm_cache", "conversation", "llm"):
+            obj = getattr(m, name, None)
+            if obj is not None:
+                out[name] = obj.stats()
+        return out
+
+    def stop(self):
+        """Stop serving; with a microphone, main() of the module is interrupted like with Ctrl+C."""
+        if not self._stop.is_set():
+            self._stop.set()
+            if self.mic:
+                _thread.interrupt_main()
+
+    def wait(self):
+        while not self._stop.wait(0.5):
+            pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    jarvis = None
+
+    def _reply(self, reply):
+        try:
+            self.wfile.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+    def _refuse(self, error):
+        self.jarvis._count("refused")
+        self._reply({"ok": False, "error": error})
+
+    def handle(self):
+        self.jarvis._count("connections")
+        session = {}  # per connection: the audio recognizer
+        while True:
+            try:
+                line = self.rfile.readline(MAX_LINE_BYTES + 1)
+            except (ConnectionResetError, OSError):
+                return
+            if not line:
+                return
+            # requests are JSON objects; anything else (e.g. "POST / HTTP/1.1" from a web page) ends the connection
+            if not line.lstrip().startswith(b"{") or len(line) > MAX_LINE_BYTES:
+                self._refuse("bad request")
+                return
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._refuse("bad request: not JSON")
+                return
+            if not hmac.compare_digest(str(request.get("token", "")).encode("utf-8"),
+                                       self.jarvis.token.encode("utf-8")):
+                self._refuse("missing or wrong token")
+                return
+            try:
+                reply = self.jarvis.handle(request, session)
+            except ValueError as e:
+                reply = {"ok": False, "error": f"bad request: {e}"}
+            except Exception as e:
+                self.jarvis._count("errors")
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            if not self._reply(reply):
+                return
+
+
+def _remove_stale_socket(path, token_path):
+    """False if another daemon is answering on path."""
+    if not os.path.exists(path):
+        return True
+    try:
+        with JarvisClient(path, timeout=2, token_path=token_path) as client:
+            client.request({"op": "ping"})
+        return False
+    except (DaemonNotRunning, OSError, ValueError):
+        os.remove(path)
+        return True
+
+
+def serve(daemon, socket_path=DEFAULT_SOCKET_PATH, port=None, token_path=DEFAULT_TOKEN_PATH):
+    """Start the IPC server on a background thread; returns it (call shutdown() to stop)."""
+    handler = type("Handler", (_Handler,), {"jarvis": daemon})
+    if use_unix_socket(port):
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        if not _remove_stale_socket(socket_path, token_path):
+            raise RuntimeError(f"a JARVIS daemon is already listening on {socket_path}")
+        old_umask = os.umask(0o177)  # the socket is created readable and writable by its owner only
+        try:
+            server = socketserver.ThreadingUnixStreamServer(socket_path, handler)
+        finally:
+            os.umask(old_umask)
+    else:
+        server = socketserver.ThreadingTCPServer((DEFAULT_HOST, port or DEFAULT_PORT), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="jarvis-ipc").start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep JARVIS loaded and accept commands from jarvis_client.py.")
+    parser.add_argument("--script", default="jarvis_vosk", choices=["jarvis_vosk", "jarvis_vosk_openai"])
+    parser.add_argument("--no-mic", action="store_true", help="only serve clients, don't listen to the microphone")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of the Unix socket")
+    parser.add_argument("--offline", action="store_true", help="disable the LLM fallback")
+    parser.add_argument("--token-file", default=DEFAULT_TOKEN_PATH, help="per-user secret clients must send")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module = importlib.import_module(args.script)
+    if args.offline and hasattr(module, "llm"):
+        module.llm = None
+    daemon = JarvisDaemon(module, mic=not args.no_mic, token=ensure_token(args.token_file))
+    module.loader.start()  # the model loads while the server comes up
+    try:
+        server = serve(daemon, args.socket, args.port, args.token_file)
+    except (RuntimeError, OSError) as e:
+        print("JARVIS daemon:", e)
+        return 1
+    where = args.socket if use_unix_socket(args.port) else f"{DEFAULT_HOST}:{args.port or DEFAULT_PORT}"
+    print(f"JARVIS daemon ({args.script}) listening on {where}")
+    try:
+        if daemon.mic:
+            module.main()  # returns on Ctrl+C or a client's shutdown
+        else:
+            daemon.warm_up()
+            daemon.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        if use_unix_socket(args.port):
+            try:
+                os.remove(args.socket)
+            except OSError:
+                pass
+        if not daemon.mic:
+            module.executor.shutdown()
+            print("Speech:", module.speech.stats())
+            module.speech.close()
+            print(tracer.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,77 +4,148 @@ Varianta offline (Vosk STT + pyttsx3 TTS).
 Funcții:
  - wake word: "jarvis"
  - ascultă comenzi în engleză
- - caută fișiere, deschide fișiere, citește text din .txt/.pdf
+ - caută fișiere, deschide fișiere, citește documente (.txt, .pdf, .docx, ... vezi extractors.py)
  - folosește Vosk model local (config: MODEL_PATH)
+ - pornire în etape: microfonul și cuvântul de trezire primele, modelul în fundal (startup.py)
  - rulabil cross-platform (Windows/macOS/Linux)
 """
 
+import importlib.util
 import os
 import sys
-import queue
 import threading
 import subprocess
 import platform
 import time
 from pathlib import Path
 
-# STT (Vosk) and audio
-try:
-    from vosk import Model, KaldiRecognizer
-    import sounddevice as sd
-except Exception as e:
-    print("Missing vosk or sounddevice. Install with: pip install vosk sounddevice")
-    raise
-
-# TTS
-try:
-    import pyttsx3
-except Exception as e:
-    print("Missing pyttsx3. Install with: pip install pyttsx3")
-    raise
+from startup import StartupTimer, RecognizerLoader, DEFAULT_STARTUP_LOG
+from file_index import FileIndex, DEFAULT_INDEX_PATH
+from content_index import ContentIndex, DEFAULT_CONTENT_INDEX_PATH
+from extractors import PDF_SUFFIXES, SUPPORTED_SUFFIXES, ExtractionPool
+from text_cache import TextCache, DEFAULT_TEXT_CACHE_PATH
+from doc_reader import DocumentReader
+from tracing import tracer
+from intents import IntentRouter, clean_target
+from executor import CommandExecutor, HIGH, LOW, NORMAL, URGENT
+from speech import SpeechEngine
+from speech_cache import PhraseCache, AudioPlayer, DEFAULT_SPEECH_CACHE_DIR
 
-# PDF reading
+# STT (Vosk) and audio; vosk itself is imported by the model loader thread
 try:
-    import PyPDF2
+    if importlib.util.find_spec("vosk") is None:
+        raise ImportError("No module named 'vosk'")
+    from vad import VoiceActivityGate
+    from audio_buffer import AudioRingBuffer
 except Exception as e:
-    print("Missing PyPDF2. Install with: pip install PyPDF2")
+    print("Missing vosk or sounddevice. Install with: pip install vosk sounddevice")
     raise
 
 # -------------------- CONFIG --------------------
 MODEL_PATH = "models/vosk-model-small-en-us-0.15"  # schimba dacă ai alt model
+WAKE_MODEL_PATH = None  # model mic încărcat primul, doar pentru "jarvis" (util cu un MODEL_PATH mare); None = MODEL_PATH
 SAMPLE_RATE = 16000  # ideal pentru majoritatea modelelor Vosk small
 WAKE_WORD = "jarvis"
+COMMAND_TIMEOUT = 6.0  # secunde de ascultare a comenzii după "jarvis"
+VAD_MARGIN_DB = 9.0  # cât peste zgomotul de fond trebuie să fie vorbirea (ajustează per microfon)
+VAD_HANGOVER_MS = 800  # cât audio se mai decodează după ultima vorbire
+VAD_PREROLL_MS = 300  # cât audio de dinainte de vorbire se păstrează
+VAD_REPORT_INTERVAL = 300  # secunde de audio între rapoartele VAD
+CAPTURE_BLOCK_MS = 30  # mărimea blocului de captură; mai mic = latență mai mică, mai multe callback-uri
+DECODE_BATCH_MS = 120  # cât audio primește recognizer-ul odată
+RING_BUFFER_SECONDS = 10  # capacitatea buffer-ului circular de captură
+AUDIO_OVERFLOW_POLICY = "skip_ahead"  # drop_oldest | drop_while_busy | skip_ahead
+AUDIO_MAX_LAG_S = 1.0  # skip_ahead: cât audio vechi se mai decodează după o comandă lungă
 ROOT_SEARCH_PATHS = [str(Path.home())]  # poți adăuga și "C:\\Users\\You\\Documents"
+INDEX_PATH = DEFAULT_INDEX_PATH  # indexul de fișiere (SQLite)
+INDEX_RESCAN_INTERVAL = 300  # secunde între rescanările incrementale
+ROOT_SCAN_BUDGETS = {}  # buget de timp (s) per rădăcină la scanarea la rece, ex. {"D:\\": 2.0}
+CONTENT_INDEX_PATH = DEFAULT_CONTENT_INDEX_PATH  # indexul full-text al documentelor
+CONTENT_INDEX_INTERVAL = 900  # secunde între actualizările indexului de conținut
+TEXT_CACHE_PATH = DEFAULT_TEXT_CACHE_PATH  # cache-ul de text extras din documente
+TEXT_CACHE_MAX_MB = 64
+READ_CHUNK_CHARS = 1500  # câte caractere citește o comandă "read"/"continue"
+EXTRACT_WORKERS = 2  # procese pentru extragerea textului din documente
+EXTRACT_TIMEOUT = 20  # secunde de așteptare pentru o pagină înainte de a opri extractorul
+EXTRACT_MEMORY_MB = 1024  # limită de memorie per proces de extragere (Linux/macOS)
+COMMAND_WORKERS = 2  # thread-uri care execută comenzile (recognizer-ul doar le pune în coadă)
+HANDLER_TIMEOUT = 30  # secunde după care o comandă este anulată
+TRACING = True  # latența pe etape; sumarul p50/p95/p99 e afișat la ieșire
 TTS_RATE = 150
 TTS_VOLUME = 1.0
+TTS_VOICE = None  # id-ul vocii pyttsx3; None = vocea implicită
+SPEECH_CACHE_DIR = DEFAULT_SPEECH_CACHE_DIR  # audio pre-randat pentru frazele fixe
+ACTIVATION_SOUND = str(Path(__file__).resolve().parent / "activation.mp3")  # redat la pornire; .mp3 cere ffmpeg, None = fără sunet
+STARTUP_LOG = DEFAULT_STARTUP_LOG  # duratele etapelor de pornire, o linie JSON per pornire; None = doar afișate
 # ------------------------------------------------
 
-if not os.path.exists(MODEL_PATH):
-    print(f"Model not found at {MODEL_PATH}. Please download and extract a Vosk model there.")
-    sys.exit(1)
+startup = StartupTimer("jarvis_vosk")
+startup.lap("imports")
+
+for path in filter(None, (MODEL_PATH, WAKE_MODEL_PATH)):
+    if not os.path.exists(path):
+        print(f"Model not found at {path}. Please download and extract a Vosk model there.")
+        sys.exit(1)
+
+tracer.enabled = TRACING
 
-# Init model
-print("Loading Vosk model (this may take a few seconds)...")
-model = Model(MODEL_PATH)
-recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+# The model loads on a background thread (started by main() or the recognition loop):
+# cheap wake-word grammar first, full vocabulary only after "jarvis"
+loader = RecognizerLoader(MODEL_PATH, SAMPLE_RATE, WAKE_WORD, COMMAND_TIMEOUT, startup,
+                          wake_model_path=WAKE_MODEL_PATH)
+pipeline = None  # set once the wake-word stage is loaded
+# silent blocks never reach Kaldi
+vad = VoiceActivityGate(SAMPLE_RATE, margin_db=VAD_MARGIN_DB, hangover_ms=VAD_HANGOVER_MS,
+                        preroll_ms=VAD_PREROLL_MS)
 
-# audio queue to avoid blocking
-audio_q = queue.Queue()
+# preallocated ring buffer between the audio callback and the recognizer
+audio_buf = AudioRingBuffer(SAMPLE_RATE, RING_BUFFER_SECONDS, policy=AUDIO_OVERFLOW_POLICY,
+                            max_lag_s=AUDIO_MAX_LAG_S)
 
-# init TTS
-tts = pyttsx3.init()
-tts.setProperty("rate", TTS_RATE)
-tts.setProperty("volume", TTS_VOLUME)
+# fixed phrases are rendered once and then played from the cache without waiting for the TTS engine
+READY_TEXT = "J. A. R. V. I. S. is ready and listening. Say 'Jarvis' before commands."
+HELP_TEXT = "I didn't understand. Try: 'Jarvis open resume pdf', 'Jarvis read notes', 'Jarvis search for budget spreadsheet', or 'Jarvis what time is it'."
+LOADING_TEXT = "One moment, I'm still loading."
+LOAD_ERROR_TEXT = "I couldn't load the speech model."
+CACHED_PHRASES = [READY_TEXT, HELP_TEXT, LOADING_TEXT, "Yes?", "Okay.", "I couldn't find that file to read.",
+                  "I couldn't find anything with that name.", "I'm not reading anything right now.",
+                  "Sorry, that took too long. I stopped it."]
 
-def speak(text):
-    """Speak text (non-blocking wrapper)."""
+# one speech thread owns the pyttsx3 engine (started on the first utterance,
+# so headless runs such as replay.py never touch it)
+phrase_cache = PhraseCache(SPEECH_CACHE_DIR, TTS_VOICE, TTS_RATE, TTS_VOLUME)
+speech = SpeechEngine(TTS_RATE, TTS_VOLUME, on_start=tracer.speech_started, voice=TTS_VOICE,
+                      cache=phrase_cache, player=AudioPlayer())
+
+# commands run here, so the recognizer keeps listening (e.g. for "stop")
+executor = CommandExecutor(COMMAND_WORKERS, HANDLER_TIMEOUT,
+                           on_timeout=lambda job: speak("Sorry, that took too long. I stopped it."))
+
+def speak(text, priority=NORMAL):
+    """Queue text on the speech thread; returns a SpeechHandle (wait/cancel) or None."""
+    if executor.current_token().cancelled:
+        return None  # the command asking for this was cancelled
     print("JARVIS:", text)
-    # run in thread to avoid blocking main loop
-    def _say():
-        tts.say(text)
-        tts.runAndWait()
-    th = threading.Thread(target=_say, daemon=True)
-    th.start()
+    tracer.speech_requested()
+    return speech.say(text, priority)
+
+reading_job = None
+
+def speak_sentences(sentences):
+    """Speak an iterable of sentences in order, pulling each one only when it is due."""
+    tracer.speech_requested()
+    def _say_all():
+        token = executor.current_token()  # cancelled by "stop" or by the next reading
+        try:
+            speech.say_each(sentences, LOW, cancelled=lambda: token.cancelled,
+                            on_sentence=lambda sentence: print("JARVIS:", sentence))
+        except Exception as e:
+            print("Reading error:", e)
+    global reading_job
+    if reading_job is not None:
+        reading_job.cancel()
+    # a job of its own without a timeout: reading a long chunk is not a stuck command
+    reading_job = executor.submit(_say_all, name="reading", priority=LOW, timeout=0)
 
 # Helper: open file with default application
 def open_with_default(path):
@@ -93,164 +164,253 @@ def open_with_default(path):
     except Exception as e:
         speak(f"Failed to open {os.path.basename(path)}: {str(e)}")
 
-# Search files by substring (case-insensitive)
-def search_files(query, max_results=10):
-    results = []
-    q = query.lower()
-    for root in ROOT_SEARCH_PATHS:
-        for dirpath, dirnames, filenames in os.walk(root):
-            for f in filenames:
-                if q in f.lower():
-                    results.append(os.path.join(dirpath, f))
-                    if len(results) >= max_results:
-                        return results
-    return results
-
-# Read simple text or first page of PDF
-def read_file(path, max_chars=1500):
+# Search files by substring (case-insensitive), answered from the file index
+file_index = FileIndex(ROOT_SEARCH_PATHS, INDEX_PATH, rescan_interval=INDEX_RESCAN_INTERVAL,
+                       root_budgets=ROOT_SCAN_BUDGETS)
+
+@tracer.traced("search_files")
+def search_files(query, max_results=10, fuzzy=True):
+    return file_index.search(query, max_results, fuzzy)
+
+content_index = ContentIndex(CONTENT_INDEX_PATH)
+
+# Read documents sentence by sentence (extracted text is cached on disk)
+extraction_pool = ExtractionPool(EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB)
+text_cache = TextCache(TEXT_CACHE_PATH, max_bytes=TEXT_CACHE_MAX_MB * 1024 * 1024,
+                       extract=extraction_pool.stream)
+reader = DocumentReader(text_cache, chunk_chars=READ_CHUNK_CHARS)
+
+@tracer.traced("read_file")
+def read_file(path):
     if not os.path.exists(path):
         speak("File not found.")
         return
     ext = Path(path).suffix.lower()
+    if ext not in SUPPORTED_SUFFIXES:
+        speak("I can't read that type of file yet.")
+        return
     try:
-        if ext in ['.txt', '.md', '.py', '.csv']:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
-                text = fh.read(max_chars)
-                speak(text if text else "File is empty.")
-        elif ext in ['.pdf']:
-            with open(path, 'rb') as fh:
-                reader = PyPDF2.PdfReader(fh)
-                if len(reader.pages) > 0:
-                    text = reader.pages[0].extract_text() or ""
-                    speak(text[:max_chars] if text else "I couldn't extract text from that PDF.")
-                else:
-                    speak("PDF has no pages.")
+        text = text_cache.page(path, 0)
+        if text is None:
+            speak("PDF has no pages." if ext in PDF_SUFFIXES else "File is empty.")
+        elif text:
+            speak_sentences(reader.read(path))
         else:
-            speak("I can only read plain text and PDFs for now.")
+            speak("I couldn't extract any text from that document.")
     except Exception as e:
         speak(f"Error reading file: {str(e)}")
 
-# Basic command handler
-def handle_command(text):
-    text = text.lower().strip()
-    print("Command:", text)
-    if not text:
-        return
+# Command handlers, registered as intents (see intents.py)
+router = IntentRouter()
 
-    # open <name>
-    if text.startswith("open "):
-        target = text.replace("open ", "", 1).strip()
-        files = search_files(target, max_results=3)
-        if files:
-            open_with_default(files[0])
-        else:
-            # try open application by name (best-effort)
-            try:
-                if platform.system() == "Windows":
-                    subprocess.Popen(["start", "", target], shell=True)
-                elif platform.system() == "Darwin":
-                    subprocess.Popen(["open", "-a", target])
-                else:
-                    subprocess.Popen([target])
-                speak(f"Attempting to open {target}")
-            except Exception:
-                speak(f"I couldn't find or open {target}")
-        return
+@router.intent("open", r"open (?P<target>.+)", slots={"target": clean_target})
+def open_intent(target):
+    files = search_files(target, max_results=3)
+    if files:
+        open_with_default(files[0])
+    else:
+        # try open application by name (best-effort)
+        try:
+            if platform.system() == "Windows":
+                subprocess.Popen(["start", "", target], shell=True)
+            elif platform.system() == "Darwin":
+                subprocess.Popen(["open", "-a", target])
+            else:
+                subprocess.Popen([target])
+            speak(f"Attempting to open {target}")
+        except Exception:
+            speak(f"I couldn't find or open {target}")
 
-    # search for <name>
-    if text.startswith("search for "):
-        target = text.replace("search for ", "", 1).strip()
-        results = search_files(target, max_results=5)
-        if results:
-            speak(f"I found {len(results)} items. Opening first match.")
-            open_with_default(results[0])
-        else:
-            speak("I couldn't find anything with that name.")
-        return
+@router.intent("search", r"(?:search|look) for (?P<target>.+)", r"find (?P<target>.+)", slots={"target": clean_target})
+def search_intent(target):
+    results = search_files(target, max_results=5, fuzzy=False)
+    if not results:
+        # nothing named like that: look inside documents, then for similar names
+        results = [hit.path for hit in content_index.search(target, limit=5)]
+        results = results or search_files(target, max_results=5)
+    if results:
+        speak(f"I found {len(results)} items. Opening first match.")
+        open_with_default(results[0])
+    else:
+        speak("I couldn't find anything with that name.")
 
-    # read <name>
-    if text.startswith("read ") or "read file" in text:
-        # attempt to extract filename phrase
-        target = text.replace("read ", "", 1).replace("read file ", "", 1).strip()
-        files = search_files(target, max_results=3)
-        if files:
-            read_file(files[0])
-        else:
-            speak("I couldn't find that file to read.")
-        return
+def _continue_reading(sentences):
+    if sentences is None:
+        speak("I'm not reading anything right now.")
+    else:
+        speak_sentences(sentences)
 
-    # time
-    if "time" in text:
-        speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
-        return
+# reading controls for the current document
+router.add("resume_reading", [r"continue(?: reading)?", r"keep reading"], lambda: _continue_reading(reader.resume()))
+router.add("next_page", r"next page", lambda: _continue_reading(reader.next_page()))
+router.add("skip", r"skip(?: ahead)?", lambda: _continue_reading(reader.skip()))
+
+@router.intent("read", r"read(?: file)? (?P<target>.+)", slots={"target": clean_target})
+def read_intent(target):
+    files = search_files(target, max_results=3)
+    if files:
+        read_file(files[0])
+    else:
+        speak("I couldn't find that file to read.")
 
-    # greetings
-    if "hello" in text or "hi" in text:
-        speak("Hello. How can I help you today?")
+@router.intent("time", r"what time is it", r"what's the time", r"tell me the time", priority=-1)
+def time_intent():
+    speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
+
+@router.intent("hello", r"(?:hello|hi|hey)(?: jarvis)?", priority=-1)
+def hello_intent():
+    speak("Hello. How can I help you today?")
+
+@router.intent("shutdown", r"(?:jarvis )?(?:stop listening|shutdown|shut down|goodbye)", priority=-1)
+def shutdown_intent():
+    speak("Shutting down. Goodbye.")
+    speech.wait_idle(5)
+    os._exit(0)
+
+@router.intent("stop", r"stop|cancel|stop it|stop reading|stop talking|never mind|be quiet|enough", priority=1)
+def stop_intent():
+    # whatever was running has already been cancelled by submit_command
+    speak("Okay.")
+
+# extra commands from intent_plugins/
+router.load_plugins(sys.modules[__name__])
+
+@tracer.traced("handle_command")
+def handle_command(text):
+    text = text.lower().strip()
+    print("Command:", text)
+    if not text:
         return
+    match = router.dispatch(text)
+    if match is None:
+        speak(HELP_TEXT)
+        return
+    match.run()
 
-    if "stop listening" in text or "shutdown" in text or "goodbye" in text:
-        speak("Shutting down. Goodbye.")
-        os._exit(0)
+def _run_command(text, trace=0):
+    try:
+        handle_command(text)
+    finally:
+        tracer.end(trace)
 
-    # fallback
-    speak("I didn't understand. Try: 'Jarvis open resume pdf', 'Jarvis read notes', 'Jarvis search for budget spreadsheet', or 'Jarvis what time is it'.")
+def submit_command(text, trace=0):
+    """Queue a recognized command on the executor; "stop" first cancels everything in flight."""
+    match = router.dispatch(text)
+    urgent = match is not None and match.name == "stop"
+    if urgent:
+        speech.interrupt()  # stop talking right away, before the job even runs
+    return executor.submit(_run_command, text, trace, name=text, priority=URGENT if urgent else NORMAL,
+                           preempt=urgent)
 
-# Audio callback: push recorded data to queue
+# Audio callback: copy recorded samples into the ring buffer
 def audio_callback(indata, frames, time_info, status):
     if status:
         print("Audio status:", status)
-    audio_q.put(bytes(indata))
+    with tracer.span("audio_capture"):
+        audio_buf.write(indata)
+
+def handle_event(event):
+    kind, text = event
+    if kind == "wake":
+        print("Wake word detected:", text)
+        speech.interrupt()  # barge-in: stop talking when the user says "jarvis"
+    elif kind == "prompt":
+        speak("Yes?", HIGH)
+    elif kind == "loading":
+        # the command stage may have failed to load after the wake-word stage
+        speak(LOAD_ERROR_TEXT if loader.error else LOADING_TEXT, HIGH)
+    elif kind == "command":
+        # the trace starts when the user stopped speaking
+        trace = tracer.begin(audio_buf.last_capture)
+        tracer.record("speech_end_to_command", audio_buf.last_capture)
+        print("Heard (final):", text)
+        submit_command(text, trace)
 
 def recognition_loop():
-    """Consume audio chunks from queue and feed Vosk recognizer."""
-    buffer = b""
+    """Read audio batches from the ring buffer, gate them with the VAD and feed the Vosk pipeline."""
+    global pipeline
+    # the microphone is already recording; decoding starts as soon as the wake-word stage is loaded
+    loader.start().wait_wake()
+    pipeline = loader.pipeline
+    if pipeline is None:
+        return
+    batch = SAMPLE_RATE * DECODE_BATCH_MS // 1000
+    next_report = VAD_REPORT_INTERVAL * SAMPLE_RATE
     while True:
         try:
-            chunk = audio_q.get()
+            chunk = audio_buf.read(batch)
             if chunk is None:
                 break
-            if recognizer.AcceptWaveform(chunk):
-                result = recognizer.Result()
-                # result is JSON string; extract text
-                import json
-                j = json.loads(result)
-                text = j.get("text", "")
-                if text:
-                    print("Heard (final):", text)
-                    # check for wakeword
-                    if WAKE_WORD in text:
-                        # remove wake word and treat rest as command if present
-                        command = text.replace(WAKE_WORD, "").strip()
-                        if not command:
-                            speak("Yes?")
-                            # wait for next phrase (we will gather next partials)
-                            # collect next recognized utterance (blocking-ish)
-                            # simpler: continue and let next Vosk result be processed
-                            continue
-                        handle_command(command)
-                else:
-                    # no final text
-                    pass
-            else:
-                # partial result - could inspect if desired:
-                # partial = recognizer.PartialResult()
-                # print("Partial:", partial)
-                pass
+            tracer.record("audio_wait", audio_buf.last_capture)
+            blocks = vad.process(chunk)
+            if not blocks:
+                event = pipeline.silence(len(chunk) // 2)
+                if event:
+                    handle_event(event)
+            for block in blocks:
+                t0 = time.perf_counter()
+                event = pipeline.accept(block)
+                vad.record_decode(time.perf_counter() - t0, len(block) // 2)
+                if event:
+                    handle_event(event)
+            if vad.total_samples >= next_report:
+                print(vad.report())
+                print("Audio buffer:", audio_buf.stats())
+                print(tracer.report())
+                next_report += VAD_REPORT_INTERVAL * SAMPLE_RATE
         except Exception as e:
             print("Recognition loop error:", e)
             break
 
+startup.lap("setup")
+
+def _load_failed():
+    print("Speech model not loaded:", loader.error)
+    speak(LOAD_ERROR_TEXT)
+    speech.wait_idle(5)
+
 def main():
-    # Start recognition thread
-    th = threading.Thread(target=recognition_loop, daemon=True)
-    th.start()
-    speak("J. A. R. V. I. S. is ready and listening. Say 'Jarvis' before commands.")
-    # open input audio stream
+    # the model starts loading right away, in parallel with everything below
+    loader.start()
+    # the audio device is only needed for live listening
     try:
-        with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize = 8000, dtype='int16',
-                               channels=1, callback=audio_callback):
+        with startup.phase("import_sounddevice"):
+            import sounddevice as sd
+    except Exception as e:
+        print("Missing sounddevice. Install with: pip install sounddevice")
+        raise
+    try:
+        # open input audio stream first: what is said while the model loads lands in the ring buffer
+        with startup.phase("audio_open"):
+            stream = sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=SAMPLE_RATE * CAPTURE_BLOCK_MS // 1000,
+                                       dtype='int16', channels=1, callback=audio_callback)
+        with stream:
+            startup.mark("listening")
+            # Start recognition thread (it waits for the wake-word stage)
+            th = threading.Thread(target=recognition_loop, daemon=True)
+            th.start()
+            speech.play(phrase_cache.load_sound(ACTIVATION_SOUND))
+            print("Loading Vosk model in the background...")
+            while not loader.wait_wake(0.1):
+                pass
+            if loader.pipeline is None:
+                _load_failed()
+                return
+            # Load the file index and keep it fresh in the background
+            with startup.phase("file_index_load"):
+                file_index.start()
+            content_index.start(INDEX_PATH, CONTENT_INDEX_INTERVAL)
+            speech.warm(CACHED_PHRASES)
+            speak(READY_TEXT)
             print("Listening (press Ctrl+C to stop)...")
+            while not loader.wait_ready(0.1):
+                pass
+            if loader.pipeline is None:
+                _load_failed()
+                return
+            print(startup.report())
+            if STARTUP_LOG:
+                startup.save(STARTUP_LOG)
             while True:
                 time.sleep(0.1)
     except KeyboardInterrupt:
@@ -259,7 +419,13 @@ def main():
         print("Audio input error:", e)
         speak("Audio input error. Check microphone and permissions.")
     finally:
-        audio_q.put(None)  # stop recognition loop
+        audio_buf.close()  # stop recognition loop
+        executor.shutdown()
+        print("Speech:", speech.stats())
+        speech.close()
+        print(vad.report())
+        print(f"Audio buffer ({CAPTURE_BLOCK_MS} ms blocks, {DECODE_BATCH_MS} ms batches):", audio_buf.stats())
+        print(tracer.report())
 
 if __name__ == "__main__":
     main()
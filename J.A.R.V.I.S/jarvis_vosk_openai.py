@@ -3,40 +3,121 @@ JARVIS: Vosk STT offline + fallback OpenAI GPT (dacă ai cheie API).
  - Wake word: "jarvis"
  - Offline comenzi de bază: open/search/read/time
  - Dacă nu înțelege comanda, iar OPENAI_API_KEY este setat, trimite la GPT pentru interpretare.
+   (sau la un server local: LLM_BACKEND / LLM_BASE_URL, vezi llm_backends.py și llm_stub_server.py)
+ - pornire în etape: microfonul primul, modelul Vosk în fundal (startup.py)
 """
 
-import os, sys, queue, threading, subprocess, platform, time, json
+import os, sys, threading, subprocess, platform, time
 from pathlib import Path
-import pyttsx3, PyPDF2
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+from startup import StartupTimer, RecognizerLoader, DEFAULT_STARTUP_LOG
+from vad import VoiceActivityGate
+from audio_buffer import AudioRingBuffer
+from file_index import FileIndex, DEFAULT_INDEX_PATH
+from content_index import ContentIndex, DEFAULT_CONTENT_INDEX_PATH
+from extractors import PDF_SUFFIXES, SUPPORTED_SUFFIXES, ExtractionPool
+from text_cache import TextCache, DEFAULT_TEXT_CACHE_PATH
+from doc_reader import DocumentReader, split_sentences, stream_sentences
+from tracing import tracer
+from intents import IntentRouter, clean_target
+from executor import CommandExecutor, HIGH, LOW, NORMAL, URGENT
+from speech import SpeechEngine
+from llm_cache import LLMCache, DEFAULT_LLM_CACHE_PATH
+from llm_backends import make_backend
+from conversation import Conversation, is_follow_up
+from speech_cache import PhraseCache, AudioPlayer, DEFAULT_SPEECH_CACHE_DIR
 
 # ===== CONFIG =====
 MODEL_PATH = "models/vosk-model-small-en-us-0.15"  # schimbă dacă ai alt model
+WAKE_MODEL_PATH = None  # model mic doar pentru "jarvis", încărcat primul; None = MODEL_PATH
 SAMPLE_RATE = 16000
 WAKE_WORD = "jarvis"
+COMMAND_TIMEOUT = 6.0
+VAD_MARGIN_DB = 9.0  # ajustează per microfon
+VAD_HANGOVER_MS = 800
+VAD_PREROLL_MS = 300
+CAPTURE_BLOCK_MS = 30  # mai mic = latență mai mică
+DECODE_BATCH_MS = 120
+RING_BUFFER_SECONDS = 10
+AUDIO_OVERFLOW_POLICY = "skip_ahead"  # drop_oldest | drop_while_busy | skip_ahead
+AUDIO_MAX_LAG_S = 1.0
 ROOT_SEARCH_PATHS = [str(Path.home())]
+INDEX_PATH = DEFAULT_INDEX_PATH
+INDEX_RESCAN_INTERVAL = 300
+ROOT_SCAN_BUDGETS = {}
+CONTENT_INDEX_PATH = DEFAULT_CONTENT_INDEX_PATH
+CONTENT_INDEX_INTERVAL = 900
+TEXT_CACHE_PATH = DEFAULT_TEXT_CACHE_PATH
+TEXT_CACHE_MAX_MB = 64
+READ_CHUNK_CHARS = 1500
+EXTRACT_WORKERS = 2
+EXTRACT_TIMEOUT = 20
+EXTRACT_MEMORY_MB = 1024
+COMMAND_WORKERS = 2
+HANDLER_TIMEOUT = 30  # secunde; și cererile OpenAI intră aici
+TRACING = True
+SPEECH_CACHE_DIR = DEFAULT_SPEECH_CACHE_DIR  # audio pre-randat pentru frazele fixe
+ACTIVATION_SOUND = str(Path(__file__).resolve().parent / "activation.mp3")  # .mp3 cere ffmpeg, None = fără sunet
+STARTUP_LOG = DEFAULT_STARTUP_LOG  # duratele etapelor de pornire (JSON lines); None = doar afișate
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # setează înainte: $env:OPENAI_API_KEY="cheia_ta"
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_CONNECT_TIMEOUT = 5.0
+OPENAI_READ_TIMEOUT = 20.0  # pauza maximă între bucățile răspunsului (stream)
+OPENAI_SYSTEM_PROMPT = "You are JARVIS, a helpful desktop assistant."
+LLM_BACKEND = "openai"  # openai (orice API compatibil) | llama (server llama.cpp) | mock (fără rețea)
+LLM_BASE_URL = None  # None = api.openai.com; ex. "http://127.0.0.1:8089/v1" pentru llm_stub_server.py
+LLM_MAX_CONCURRENCY = 2  # cereri simultane către backend
+LLM_RETRIES = 2  # reîncercări (cu backoff) la erori de conexiune, 429 și 5xx
+CONVERSATION_TOKENS = 1200  # bugetul istoricului trimis la LLM (replici recente + rezumat + notițe)
+CONVERSATION_IDLE_RESET = 600  # secunde de pauză după care conversația începe din nou
+LLM_CACHE_PATH = DEFAULT_LLM_CACHE_PATH  # răspunsuri salvate; întrebările repetate nu mai ajung la OpenAI
+LLM_CACHE_TTL = 7 * 24 * 3600  # secunde; None = până la evacuare
+LLM_CACHE_MAX_MB = 8
 # ==================
 
-# TTS init
-tts = pyttsx3.init()
-tts.setProperty("rate", 150)
-tts.setProperty("volume", 1.0)
+startup = StartupTimer("jarvis_vosk_openai")
+startup.lap("imports")
+tracer.enabled = TRACING
 
-def speak(text):
+# TTS: one thread owns pyttsx3, started on the first utterance (replay.py runs without audio devices)
+phrase_cache = PhraseCache(SPEECH_CACHE_DIR, rate=150, volume=1.0)
+speech = SpeechEngine(150, 1.0, on_start=tracer.speech_started, cache=phrase_cache, player=AudioPlayer())
+READY_TEXT = "JARVIS ready. Say 'Jarvis' before your command."
+LOADING_TEXT = "One moment, still loading."
+LOAD_ERROR_TEXT = "I couldn't load the speech model."
+CACHED_PHRASES = [READY_TEXT, LOADING_TEXT, "Yes?", "Okay.", "Couldn't find that file.", "Couldn't find file to read.",
+                  "No results found.", "Nothing is being read.", "Sorry, that took too long.",
+                  "I didn't understand and no AI fallback is configured."]
+
+executor = CommandExecutor(COMMAND_WORKERS, HANDLER_TIMEOUT,
+                           on_timeout=lambda job: speak("Sorry, that took too long."))
+
+def speak(text, priority=NORMAL, coalesce=True):
+    if executor.current_token().cancelled: return None
     print("JARVIS:", text)
-    tts.say(text)
-    tts.runAndWait()
-
-# Load Vosk model
-if not os.path.exists(MODEL_PATH):
-    print(f"Model not found at {MODEL_PATH}.")
-    sys.exit(1)
-print("Loading Vosk model...")
-model = Model(MODEL_PATH)
-recognizer = KaldiRecognizer(model, SAMPLE_RATE)
-audio_q = queue.Queue()
+    tracer.speech_requested()
+    return speech.say(text, priority, coalesce=coalesce)
+
+reading_job = None
+
+def speak_sentences(sentences):
+    # reading gets its own job without a timeout; "stop" or the next reading cancels it between sentences
+    global reading_job
+    def _say_all():
+        token = executor.current_token()
+        speech.say_each(sentences, LOW, cancelled=lambda: token.cancelled,
+                        on_sentence=lambda sentence: print("JARVIS:", sentence))
+    if reading_job is not None: reading_job.cancel()
+    reading_job = executor.submit(_say_all, name="reading", priority=LOW, timeout=0)
+
+# Vosk model: loaded on a background thread, wake-word stage first (see startup.py)
+for path in filter(None, (MODEL_PATH, WAKE_MODEL_PATH)):
+    if not os.path.exists(path):
+        print(f"Model not found at {path}.")
+        sys.exit(1)
+loader = RecognizerLoader(MODEL_PATH, SAMPLE_RATE, WAKE_WORD, COMMAND_TIMEOUT, startup, wake_model_path=WAKE_MODEL_PATH)
+pipeline = None  # set by the recognition loop once the wake-word stage is loaded
+vad = VoiceActivityGate(SAMPLE_RATE, margin_db=VAD_MARGIN_DB, hangover_ms=VAD_HANGOVER_MS, preroll_ms=VAD_PREROLL_MS)
+audio_buf = AudioRingBuffer(SAMPLE_RATE, RING_BUFFER_SECONDS, policy=AUDIO_OVERFLOW_POLICY, max_lag_s=AUDIO_MAX_LAG_S)
 
 # Helpers
 def open_with_default(path):
@@ -52,118 +133,243 @@ def open_with_default(path):
         else:
             subprocess.Popen(["xdg-open", path])
         speak(f"Opened {os.path.basename(path)}")
+        conversation.note(f"Opened {os.path.basename(path)}")
     except Exception as e:
         speak(f"Failed to open {os.path.basename(path)}: {e}")
 
-def search_files(query, max_results=5):
-    results = []
-    q = query.lower()
-    for root in ROOT_SEARCH_PATHS:
-        for dirpath, _, filenames in os.walk(root):
-            for f in filenames:
-                if q in f.lower():
-                    results.append(os.path.join(dirpath, f))
-                    if len(results) >= max_results:
-                        return results
-    return results
-
-def read_file(path, max_chars=1500):
+file_index = FileIndex(ROOT_SEARCH_PATHS, INDEX_PATH, rescan_interval=INDEX_RESCAN_INTERVAL,
+                       root_budgets=ROOT_SCAN_BUDGETS)
+
+@tracer.traced("search_files")
+def search_files(query, max_results=5, fuzzy=True):
+    return file_index.search(query, max_results, fuzzy)
+
+content_index = ContentIndex(CONTENT_INDEX_PATH)
+
+extraction_pool = ExtractionPool(EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB)
+text_cache = TextCache(TEXT_CACHE_PATH, max_bytes=TEXT_CACHE_MAX_MB * 1024 * 1024,
+                       extract=extraction_pool.stream)
+reader = DocumentReader(text_cache, chunk_chars=READ_CHUNK_CHARS)
+
+@tracer.traced("read_file")
+def read_file(path):
     ext = Path(path).suffix.lower()
+    if ext not in SUPPORTED_SUFFIXES:
+        speak("I can't read that type of file.")
+        return
     try:
-        if ext in [".txt", ".md", ".py", ".csv"]:
-            text = open(path, encoding="utf-8", errors="ignore").read(max_chars)
-            speak(text if text else "File is empty.")
-        elif ext == ".pdf":
-            reader = PyPDF2.PdfReader(open(path, "rb"))
-            if reader.pages:
-                text = reader.pages[0].extract_text() or ""
-                speak(text[:max_chars] if text else "No text found in PDF.")
-            else:
-                speak("PDF has no pages.")
+        text = text_cache.page(path, 0)
+        if text is None:
+            speak("PDF has no pages." if ext in PDF_SUFFIXES else "File is empty.")
+        elif text:
+            conversation.note(f"Read aloud {os.path.basename(path)}, starting: {text[:80].strip()}")
+            speak_sentences(reader.read(path))
         else:
-            speak("I only support text and PDF files.")
+            speak("No text found in that document.")
     except Exception as e:
         speak(f"Error reading file: {e}")
 
-def handle_command(cmd):
-    cmd = cmd.lower().strip()
-    if not cmd:
-        return
+# Command handlers (intents.py compiles the patterns once)
+router = IntentRouter()
 
-    if cmd.startswith("open "):
-        files = search_files(cmd.replace("open ", "", 1), 3)
-        if files: open_with_default(files[0])
-        else: speak("Couldn't find that file.")
-        return
+@router.intent("open", r"open (?P<target>.+)", slots={"target": clean_target})
+def open_intent(target):
+    files = search_files(target, 3)
+    if files: open_with_default(files[0])
+    else: speak("Couldn't find that file.")
 
-    if cmd.startswith("search for "):
-        files = search_files(cmd.replace("search for ", "", 1), 5)
-        if files: open_with_default(files[0])
-        else: speak("No results found.")
-        return
+@router.intent("search", r"(?:search|look) for (?P<target>.+)", r"find (?P<target>.+)", slots={"target": clean_target})
+def search_intent(target):
+    files = search_files(target, 5, fuzzy=False)
+    if not files:
+        files = [hit.path for hit in content_index.search(target, limit=5)] or search_files(target, 5)
+    names = ", ".join(os.path.basename(f) for f in files[:3])
+    conversation.note(f"Searched for '{target}': {names or 'nothing found'}")
+    if files: open_with_default(files[0])
+    else: speak("No results found.")
 
-    if cmd.startswith("read "):
-        files = search_files(cmd.replace("read ", "", 1), 3)
-        if files: read_file(files[0])
-        else: speak("Couldn't find file to read.")
-        return
+def _continue_reading(sentences):
+    if sentences is None: speak("Nothing is being read.")
+    else: speak_sentences(sentences)
+
+router.add("resume_reading", [r"continue(?: reading)?", r"keep reading"], lambda: _continue_reading(reader.resume()))
+router.add("next_page", r"next page", lambda: _continue_reading(reader.next_page()))
+router.add("skip", r"skip(?: ahead)?", lambda: _continue_reading(reader.skip()))
+
+@router.intent("read", r"read(?: file)? (?P<target>.+)", slots={"target": clean_target})
+def read_intent(target):
+    files = search_files(target, 3)
+    if files: read_file(files[0])
+    else: speak("Couldn't find file to read.")
+
+@router.intent("time", r"what time is it", r"what's the time", r"tell me the time", priority=-1)
+def time_intent():
+    speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
 
-    if "time" in cmd:
-        speak(time.strftime("It is %H:%M on %A, %B %d, %Y"))
+@router.intent("hello", r"(?:hello|hi|hey)(?: jarvis)?", priority=-1)
+def hello_intent():
+    speak("Hello. How can I help you?")
+
+@router.intent("shutdown", r"(?:jarvis )?(?:stop listening|shutdown|shut down|goodbye)", priority=-1)
+def shutdown_intent():
+    speak("Shutting down. Bye.")
+    speech.wait_idle(5)
+    os._exit(0)
+
+@router.intent("stop", r"stop|cancel|stop it|stop reading|stop talking|never mind|be quiet|enough", priority=1)
+def stop_intent():
+    speak("Okay.")
+
+router.load_plugins(sys.modules[__name__])
+
+llm_cache = LLMCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024)
+# follow-up questions get the recent turns and command results, within a fixed token budget
+conversation = Conversation(CONVERSATION_TOKENS, idle_reset=CONVERSATION_IDLE_RESET)
+# one backend per session: its connection pool keeps the connection alive between questions
+llm = make_backend(LLM_BACKEND, OPENAI_MODEL, base_url=LLM_BASE_URL, api_key=OPENAI_API_KEY,
+                   max_concurrency=LLM_MAX_CONCURRENCY, retries=LLM_RETRIES,
+                   connect_timeout=OPENAI_CONNECT_TIMEOUT, read_timeout=OPENAI_READ_TIMEOUT)
+
+def ask_openai(cmd):
+    # dacă avem un LLM pentru fallback
+    if llm is None:
+        speak("I didn't understand and no AI fallback is configured.")
+        return
+    token = executor.current_token()
+    t0 = time.monotonic()
+    model = f"{llm.name}:{llm.model}"
+    # follow-ups ("and tomorrow?") depend on the conversation, time-sensitive questions on the clock:
+    # both always go to the model
+    follow_up = conversation.has_history() and is_follow_up(cmd)
+    cacheable = not follow_up and llm_cache.cacheable(cmd)
+    answer = llm_cache.get(model, OPENAI_SYSTEM_PROMPT, cmd) if cacheable else None
+    if answer is not None:
+        tracer.record("llm_cache_hit", t0)
+        for sentence in split_sentences(answer): speak(sentence, coalesce=False)
+        conversation.add("user", cmd); conversation.add("assistant", answer)
         return
+    try:
+        fragments = llm.stream(conversation.messages(OPENAI_SYSTEM_PROMPT, cmd), cancelled=lambda: token.cancelled)
+        sentences = []
+        try:
+            # each sentence is spoken while the rest of the answer is still being generated
+            for sentence in stream_sentences(fragments):
+                if not sentences: tracer.record("openai_first_sentence", t0)
+                sentences.append(sentence)
+                speak(sentence, coalesce=False)
+        finally:
+            fragments.close()
+        tracer.record("openai_answer", t0)
+        if sentences: conversation.add("user", cmd); conversation.add("assistant", " ".join(sentences))
+        # a cancelled answer is incomplete, so it is not cached
+        if cacheable and not token.cancelled: llm_cache.put(model, OPENAI_SYSTEM_PROMPT, cmd, " ".join(sentences))
+    except Exception as e:
+        speak(f"OpenAI fallback error: {e}")
 
-    if cmd in ["hello", "hi"]:
-        speak("Hello. How can I help you?")
+@tracer.traced("handle_command")
+def handle_command(cmd):
+    cmd = cmd.lower().strip()
+    if not cmd:
         return
+    match = router.dispatch(cmd)
+    if match: match.run()
+    else: ask_openai(cmd)
 
-    if "shutdown" in cmd or "stop listening" in cmd:
-        speak("Shutting down. Bye.")
-        sys.exit(0)
+def _run_command(cmd, trace=0):
+    try:
+        handle_command(cmd)
+    finally:
+        tracer.end(trace)
 
-    # dacă avem OpenAI pentru fallback
-    if OPENAI_API_KEY:
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": "You are JARVIS, a helpful desktop assistant."},
-                          {"role": "user", "content": cmd}]
-            )
-            answer = resp.choices[0].message.content.strip()
-            speak(answer)
-        except Exception as e:
-            speak(f"OpenAI fallback error: {e}")
-    else:
-        speak("I didn't understand and no AI fallback is configured.")
+def submit_command(cmd, trace=0):
+    # the recognizer thread only queues; "stop" preempts whatever is running
+    match = router.dispatch(cmd)
+    urgent = match is not None and match.name == "stop"
+    if urgent: speech.interrupt()
+    return executor.submit(_run_command, cmd, trace, name=cmd, priority=URGENT if urgent else NORMAL,
+                           preempt=urgent)
 
 # Audio
 def audio_callback(indata, frames, time_info, status):
     if status: print("Audio:", status)
-    audio_q.put(bytes(indata))
+    with tracer.span("audio_capture"): audio_buf.write(indata)
+
+def handle_event(event):
+    kind, text = event
+    if kind == "wake":
+        speech.interrupt()  # barge-in
+    elif kind == "prompt":
+        speak("Yes?", HIGH)
+    elif kind == "loading":
+        # the command stage may have failed to load after the wake-word stage
+        speak(LOAD_ERROR_TEXT if loader.error else LOADING_TEXT, HIGH)
+    elif kind == "command":
+        trace = tracer.begin(audio_buf.last_capture)
+        tracer.record("speech_end_to_command", audio_buf.last_capture)
+        print("Heard:", text)
+        submit_command(text, trace)
 
 def recognition_loop():
+    global pipeline
+    # audio waits in the ring buffer until the wake-word stage is loaded
+    loader.start().wait_wake()
+    pipeline = loader.pipeline
+    if pipeline is None: return
+    batch = SAMPLE_RATE * DECODE_BATCH_MS // 1000
     while True:
-        chunk = audio_q.get()
+        chunk = audio_buf.read(batch)
         if chunk is None: break
-        if recognizer.AcceptWaveform(chunk):
-            text = json.loads(recognizer.Result()).get("text", "")
-            if text:
-                print("Heard:", text)
-                if WAKE_WORD in text:
-                    command = text.replace(WAKE_WORD, "").strip()
-                    if not command:
-                        speak("Yes?")
-                        continue
-                    handle_command(command)
+        tracer.record("audio_wait", audio_buf.last_capture)
+        blocks = vad.process(chunk)
+        events = [pipeline.silence(len(chunk) // 2)] if not blocks else []
+        for block in blocks:
+            t0 = time.perf_counter()
+            events.append(pipeline.accept(block))
+            vad.record_decode(time.perf_counter() - t0, len(block) // 2)
+        for event in events:
+            if event: handle_event(event)
+
+startup.lap("setup")
+
+def _load_failed():
+    print("Speech model not loaded:", loader.error)
+    speak(LOAD_ERROR_TEXT); speech.wait_idle(5)
 
 def main():
-    speak("JARVIS ready. Say 'Jarvis' before your command.")
-    threading.Thread(target=recognition_loop, daemon=True).start()
-    with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=8000, dtype='int16',
-                           channels=1, callback=audio_callback):
-        print("Listening... Press Ctrl+C to exit.")
-        while True: time.sleep(0.1)
+    loader.start()  # the model loads while the microphone is already recording
+    with startup.phase("import_sounddevice"): import sounddevice as sd
+    with startup.phase("audio_open"):
+        stream = sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=SAMPLE_RATE * CAPTURE_BLOCK_MS // 1000,
+                                   dtype='int16', channels=1, callback=audio_callback)
+    with stream:
+        startup.mark("listening")
+        try:
+            threading.Thread(target=recognition_loop, daemon=True).start()
+            speech.play(phrase_cache.load_sound(ACTIVATION_SOUND))
+            print("Loading Vosk model...")
+            while not loader.wait_wake(0.1): pass
+            if loader.pipeline is None: return _load_failed()
+            with startup.phase("file_index_load"): file_index.start()
+            content_index.start(INDEX_PATH, CONTENT_INDEX_INTERVAL)
+            speech.warm(CACHED_PHRASES)
+            speak(READY_TEXT)
+            print("Listening... Press Ctrl+C to exit.")
+            while not loader.wait_ready(0.1): pass
+            if loader.pipeline is None: return _load_failed()
+            print(startup.report())
+            if STARTUP_LOG: startup.save(STARTUP_LOG)
+            while True: time.sleep(0.1)
+        finally:
+            audio_buf.close()
+            executor.shutdown()
+            print("Speech:", speech.stats())
+            print("LLM cache:", llm_cache.stats())
+            print("Conversation:", conversation.stats())
+            if llm is not None: print("LLM backend:", llm.stats()); llm.close()
+            speech.close()
+            print(vad.report())
+            print("Audio buffer:", audio_buf.stats())
+            print(tracer.report())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,292 @@
+"""
+llm_backends.py
+Backend-uri interschimbabile pentru fallback-ul LLM.
+ - "openai": orice API compatibil OpenAI (/v1/chat/completions): OpenAI, llama.cpp,
+   Ollama, vLLM sau llm_stub_server.py
+ - "llama": endpoint-ul nativ /completion al serverului llama.cpp
+ - "mock": răspunsuri deterministe, fără rețea, cu latență modelată (teste, benchmark)
+ - conexiuni keep-alive refolosite (httpx), limită de cereri simultane,
+   reîncercări cu backoff exponențial și jitter (doar înainte de primul token)
+ - statistici: cereri, erori, reîncercări, latență până la primul token și totală (p50/p95/p99)
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from llm_cache import normalize_prompt
+from tracing import percentile
+
+BACKENDS = ("openai", "llama", "mock")
+OPENAI_URL = "https://api.openai.com/v1"
+LLAMA_URL = "http://127.0.0.1:8080"
+
+
+class LLMError(Exception):
+    pass
+
+
+class RetryableError(LLMError):
+    """Transient failure (connection refused, 429, 5xx) that is worth another try."""
+
+
+class Backend:
+    """Streams answers as text fragments; subclasses implement _open(messages)."""
+
+    name = "backend"
+
+    def __init__(self, model, max_concurrency=2, retries=2, backoff=0.5, max_backoff=8.0, queue_timeout=30.0):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_timeout = queue_timeout
+        self.counts = {"requests": 0, "errors": 0, "retries": 0, "cancelled": 0}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._ttft = deque(maxlen=2048)
+        self._total = deque(maxlen=2048)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.model!r})"
+
+    def _open(self, messages):
+        raise NotImplementedError
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stream(self, messages, cancelled=None):
+        """Yield the answer in fragments as they arrive.
+
+        At most max_concurrency requests run at once; the rest wait up to
+        queue_timeout. Transient failures are retried with full-jitter
+        backoff, but only until the first fragment: what was already
+        spoken can't be taken back.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("errors")
+            raise LLMError(f"{self.name}: too many requests in flight")
+        self._count("requests")
+        t0 = time.monotonic()
+        first = None
+        attempt = 0
+        try:
+            while True:
+                fragments = self._open(messages)
+                try:
+                    for fragment in fragments:
+                        if first is None:
+                            first = time.monotonic()
+                            with self._lock:
+                                self._ttft.append(first - t0)
+                        yield fragment
+                        if cancelled and cancelled():
+                            self._count("cancelled")
+                            return
+                    break
+                except RetryableError as e:
+                    if first is not None or attempt >= self.retries:
+                        raise LLMError(f"{self.name}: {e}") from e
+                    attempt += 1
+                    self._count("retries")
+                    time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                    if cancelled and cancelled():
+                        self._count("cancelled")
+                        return
+                finally:
+                    fragments.close()
+            with self._lock:
+                self._total.append(time.monotonic() - t0)
+        except LLMError:
+            self._count("errors")
+            raise
+        finally:
+            self._slots.release()
+
+    def complete(self, messages):
+        return "".join(self.stream(messages))
+
+    def stats(self):
+        with self._lock:
+            ttft, total = sorted(self._ttft), sorted(self._total)
+            counts = dict(self.counts)
+
+        def _ms(values):
+            return {f"p{p}": round(percentile(values, p) * 1000, 1) if values else None for p in (50, 95, 99)}
+        return dict(counts, backend=self.name, model=self.model, ttft_ms=_ms(ttft), total_ms=_ms(total))
+
+    def close(self):
+        pass
+
+
+class _HTTPBackend(Backend):
+    def __init__(self, base_url, model, api_key=None, connect_timeout=5.0, read_timeout=20.0, **kwargs):
+        super().__init__(model, **kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout  # longest pause between two chunks of the stream
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        # one pooled client per backend: connections (and TLS sessions) stay open between questions
+        with self._client_lock:
+            if self._client is None:
+                import httpx
+                headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+                self._client = httpx.Client(
+                    base_url=self.base_url, headers=headers,
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(max_connections=self.max_concurrency,
+                                        max_keepalive_connections=self.max_concurrency))
+            return self._client
+
+    def _events(self, path, payload):
+        """JSON payloads of a server-sent event stream."""
+        import httpx
+        try:
+            with self.client().stream("POST", path, json=payload) as resp:
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    raise RetryableError(f"HTTP {resp.status_code}")
+                if resp.status_code >= 400:
+                    resp.read()
+                    raise LLMError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+                for line in resp.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        return
+                    yield json.loads(data)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+            raise RetryableError(str(e) or type(e).__name__) from e
+        except httpx.HTTPError as e:
+            raise LLMError(str(e) or type(e).__name__) from e
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class OpenAICompatibleBackend(_HTTPBackend):
+    name = "openai"
+
+    def _open(self, messages):
+        for event in self._events("/chat/completions", {"model": self.model, "messages": messages, "stream": True}):
+            choices = event.get("choices") or [{}]
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
+def chat_prompt(messages):
+    """Plain-text chat transcript for completion-style servers."""
+    lines = [f"{m['role'].capitalize()}: {m['content']}" for m in messages]
+    return "\n".join(lines) + "\nAssistant:"
+
+
+class LlamaServerBackend(_HTTPBackend):
+    """llama.cpp's native /completion endpoint (the model is whatever the server loaded)."""
+
+    name = "llama"
+
+    def __init__(self, base_url, model="local", max_tokens=256, **kwargs):
+        super().__init__(base_url, model, **kwargs)
+        self.max_tokens = max_tokens
+
+    def _open(self, messages):
+        payload = {"prompt": chat_prompt(messages), "n_predict": self.max_tokens, "stream": True,
+                   "stop": ["\nUser:", "\nSystem:"]}
+        for event in self._events("/completion", payload):
+            if event.get("content"):
+                yield event["content"]
+            if event.get("stop"):
+                return
+
+
+_WORDS = ("the a your this that file folder window system answer local model question time document note "
+          "project search result open read list page start settings update network memory disk task "
+          "simple quick useful best first next other same new old small large usually often also can "
+          "will should might is are has have uses keeps shows finds opens saves runs").split()
+
+
+def mock_answer(prompt, sentences=3):
+    """Deterministic filler answer: the same prompt always gets the same text."""
+    rng = random.Random(hashlib.sha1(normalize_prompt(prompt).encode("utf-8")).digest())
+    out = []
+    for _ in range(sentences):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(6, 14))]
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+class MockBackend(Backend):
+    """Canned or generated answers with shaped latency; no network.
+
+    answers maps questions (normalized) to canned answers. Latency:
+    ttft_ms (+ up to ttft_jitter_ms) before the first fragment, then
+    tokens_per_s; with probability tail_p a request is tail_ms slower, and
+    with probability error_rate it fails with a retryable error.
+    """
+
+    name = "mock"
+
+    def __init__(self, model="mock", answers=None, ttft_ms=0, ttft_jitter_ms=0, tokens_per_s=0,
+                 tail_p=0.0, tail_ms=0, error_rate=0.0, seed=1, **kwargs):
+        super().__init__(model, **kwargs)
+        self.answers = {normalize_prompt(q): a for q, a in (answers or {}).items()}
+        self.ttft_ms = ttft_ms
+        self.ttft_jitter_ms = ttft_jitter_ms
+        self.tokens_per_s = tokens_per_s
+        self.tail_p = tail_p
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def answer(self, prompt):
+        return self.answers.get(normalize_prompt(prompt)) or mock_answer(prompt)
+
+    def _open(self, messages):
+        prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        return self.fragments(self.answer(prompt))
+
+    def fragments(self, text):
+        """Word-sized fragments of text, timed like a model generating it."""
+        with self._rng_lock:
+            fail = self._rng.random() < self.error_rate
+            delay = (self.ttft_ms + self._rng.uniform(0, self.ttft_jitter_ms)) / 1000
+            if self._rng.random() < self.tail_p:
+                delay += self.tail_ms / 1000
+        time.sleep(delay)
+        if fail:
+            raise RetryableError("injected failure")
+        for i, token in enumerate(re.findall(r"\S+\s*", text)):
+            if i and self.tokens_per_s:
+                time.sleep(1 / self.tokens_per_s)
+            yield token
+
+
+def make_backend(kind, model, base_url=None, api_key=None, **kwargs):
+    """Backend by name (see BACKENDS); None when the hosted OpenAI API has no key."""
+    if kind == "openai":
+        if base_url is None and not api_key:
+            return None
+        return OpenAICompatibleBackend(base_url or OPENAI_URL, model, api_key=api_key, **kwargs)
+    if kind == "llama":
+        return LlamaServerBackend(base_url or LLAMA_URL, model, api_key=api_key, **kwargs)
+    if kind == "mock":
+        for key in ("connect_timeout", "read_timeout"):
+            kwargs.pop(key, None)
+        return MockBackend(model, **kwargs)
+    raise ValueError(f"unknown LLM backend {kind!r} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,131 @@
+"""
+llm_cache.py
+Cache persistent pentru răspunsurile fallback-ului LLM (OpenAI).
+ - cheie: model + prompt de sistem + întrebarea normalizată
+   ("What's the capital of France?" și "whats the capital of france" dau același răspuns)
+ - TTL configurabil, limită de dimensiune cu evacuare LRU
+ - întrebările dependente de timp (azi, acum, vremea, știri...) ocolesc cache-ul
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_LLM_CACHE_PATH = str(Path.home() / ".jarvis" / "llm_cache.db")
+
+# answers to these change over time, so they are always asked again
+TIME_SENSITIVE = (r"\b(?:today|tonight|tomorrow|yesterday|now|currently|current|latest|recent|news|weather|"
+                  r"forecast|time|date|this (?:week|month|year)|price|stock|score)\b")
+
+_FILLER = {"jarvis", "please", "hey", "um", "uh"}
+_CONTRACTIONS = {"whats": "what is", "whos": "who is", "wheres": "where is", "hows": "how is", "whens": "when is",
+                 "thats": "that is", "its": "it is", "im": "i am", "dont": "do not", "cant": "cannot"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY, model TEXT, prompt TEXT, answer TEXT, nbytes INTEGER, created REAL, last_used REAL);
+CREATE INDEX IF NOT EXISTS answers_lru ON answers(last_used);
+"""
+
+
+def normalize_prompt(text):
+    """Lowercase, drop punctuation and filler words, expand contractions, collapse whitespace."""
+    words = re.sub(r"[^\w\s]", "", text.lower()).split()
+    return " ".join(_CONTRACTIONS.get(w, w) for w in words if w not in _FILLER)
+
+
+class LLMCache:
+    def __init__(self, db_path=DEFAULT_LLM_CACHE_PATH, ttl=7 * 24 * 3600, max_bytes=8 * 1024 * 1024,
+                 bypass=TIME_SENSITIVE):
+        self.db_path = db_path
+        self.ttl = ttl  # seconds; None keeps answers until evicted
+        self.max_bytes = max_bytes
+        self.bypass = re.compile(bypass) if bypass else None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM answers").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def _key(model, system, prompt):
+        raw = f"{model}\0{system}\0{normalize_prompt(prompt)}"
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def cacheable(self, prompt):
+        """False for time-sensitive questions, which must always go to the model."""
+        if self.bypass is not None and self.bypass.search(normalize_prompt(prompt)):
+            with self._lock:
+                self.bypassed += 1
+            return False
+        return True
+
+    def get(self, model, system, prompt):
+        key = self._key(model, system, prompt)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT answer, nbytes, created FROM answers WHERE key=?", (key,)).fetchone()
+            now = time.time()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                conn.execute("DELETE FROM answers WHERE key=?", (key,))
+                conn.commit()
+                self._total -= row[1]
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            conn.execute("UPDATE answers SET last_used=? WHERE key=?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def put(self, model, system, prompt, answer):
+        key = self._key(model, system, prompt)
+        nbytes = len(answer.encode("utf-8", "surrogatepass"))
+        if not answer or nbytes > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT nbytes FROM answers WHERE key=?", (key,)).fetchone()
+            now = time.time()
+            conn.execute("INSERT OR REPLACE INTO answers(key, model, prompt, answer, nbytes, created, last_used) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, model, normalize_prompt(prompt), answer, nbytes, now, now))
+            self._total += nbytes - (old[0] if old else 0)
+            while self._total > self.max_bytes:
+                row = conn.execute("SELECT key, nbytes FROM answers ORDER BY last_used LIMIT 1").fetchone()
+                if row is None:
+                    break
+                conn.execute("DELETE FROM answers WHERE key=?", (row[0],))
+                self._total -= row[1]
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM answers")
+            conn.commit()
+            self._total = 0
+
+    def stats(self):
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {"entries": entries, "bytes": self._total, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                    "expired": self.expired, "bypassed": self.bypassed}
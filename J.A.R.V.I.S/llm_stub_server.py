@@ -0,0 +1,165 @@
+"""
+llm_stub_server.py
+Server local care imită un LLM, pentru teste și benchmark fără rețea.
+ - POST /v1/chat/completions (compatibil OpenAI, cu sau fără stream),
+   POST /completion (format llama.cpp), GET /health
+ - răspunsuri din --answers (JSON întrebare -> răspuns) sau text determinist generat din întrebare
+ - latență modelată: timp până la primul token (+ jitter), tokeni/s, o coadă lentă
+   (--tail-p / --tail-ms) și erori 503 injectate (--error-rate)
+ - HTTP/1.1 keep-alive, stream-urile sunt trimise chunked (server-sent events)
+Exemplu: python llm_stub_server.py --port 8089 --ttft-ms 300 --ttft-jitter-ms 200 --tokens-per-s 40
+  apoi în jarvis_vosk_openai.py: LLM_BACKEND = "openai", LLM_BASE_URL = "http://127.0.0.1:8089/v1"
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_backends import MockBackend, RetryableError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    mock = None
+    verbose = False
+
+    def handle(self):
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            pass  # the client dropped an idle keep-alive connection
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            super().log_message(fmt, *args)
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _event(self, payload):
+        self._chunk(b"data: " + (payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")) + b"\n\n")
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/health", "/v1/models"):
+            self._json(200, {"status": "ok", "model": self.mock.model})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._json(400, {"error": {"message": "invalid JSON"}})
+            return
+        path = self.path.rstrip("/")
+        if path in ("/v1/chat/completions", "/chat/completions"):
+            messages = request.get("messages") or []
+            prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+            self._answer(prompt, request.get("stream"), request.get("model") or self.mock.model, chat=True)
+        elif path == "/completion":
+            # the last "User: ..." line of a chat_prompt() transcript, or the whole prompt
+            prompt = request.get("prompt", "")
+            user = [line[5:].strip() for line in prompt.splitlines() if line.startswith("User:")]
+            self._answer(user[-1] if user else prompt, request.get("stream"), self.mock.model, chat=False)
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def _answer(self, prompt, stream, model, chat):
+        fragments = self.mock.fragments(self.mock.answer(prompt))
+        try:
+            first = next(fragments, "")  # waits out the shaped time to first token
+        except RetryableError:
+            self._json(503, {"error": {"message": "overloaded (injected)"}})
+            return
+        created = int(time.time())
+        if not stream:
+            text = first + "".join(fragments)
+            if chat:
+                self._json(200, {"id": "stub", "object": "chat.completion", "created": created, "model": model,
+                                 "choices": [{"index": 0, "finish_reason": "stop",
+                                              "message": {"role": "assistant", "content": text}}]})
+            else:
+                self._json(200, {"content": text, "stop": True})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for fragment in _chain(first, fragments):
+                if chat:
+                    self._event({"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                                 "choices": [{"index": 0, "delta": {"content": fragment}, "finish_reason": None}]})
+                else:
+                    self._event({"content": fragment, "stop": False})
+            if chat:
+                self._event({"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                self._event(b"[DONE]")
+            else:
+                self._event({"content": "", "stop": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client hung up (e.g. "stop")
+
+
+def _chain(first, rest):
+    if first:
+        yield first
+    yield from rest
+
+
+def serve(host="127.0.0.1", port=8089, verbose=False, **mock_options):
+    """Start the stub server on a background thread; returns the server (call shutdown() to stop)."""
+    handler = type("Handler", (StubHandler,), {"mock": MockBackend(**mock_options), "verbose": verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="llm-stub").start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for an OpenAI-compatible / llama.cpp server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--model", default="stub")
+    parser.add_argument("--answers", help="JSON file mapping questions to canned answers")
+    parser.add_argument("--ttft-ms", type=float, default=300, help="time to first token")
+    parser.add_argument("--ttft-jitter-ms", type=float, default=100)
+    parser.add_argument("--tokens-per-s", type=float, default=40)
+    parser.add_argument("--tail-p", type=float, default=0.0, help="share of requests that are slow")
+    parser.add_argument("--tail-ms", type=float, default=2000, help="extra delay of a slow request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    answers = None
+    if args.answers:
+        with open(args.answers, encoding="utf-8") as fh:
+            answers = json.load(fh)
+    server = serve(args.host, args.port, args.verbose, model=args.model, answers=answers,
+                   ttft_ms=args.ttft_ms, ttft_jitter_ms=args.ttft_jitter_ms, tokens_per_s=args.tokens_per_s,
+                   tail_p=args.tail_p, tail_ms=args.tail_ms, error_rate=args.error_rate, seed=args.seed)
+    print(f"LLM stub listening on http://{args.host}:{args.port} (OpenAI base URL: http://{args.host}:{args.port}/v1)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+"""
+recognition_server.py
+Server de recunoaștere pentru mai multe microfoane / clienți simultan, cu un singur model Vosk încărcat.
+ - fiecare sesiune are recognizer-ul ei (KaldiRecognizer sau WakeWordPipeline), VAD-ul ei
+   și o coadă proprie de audio; modelul e comun
+ - sesiunile sunt decodate de un grup de thread-uri cât numărul de nuclee (Vosk eliberează GIL-ul),
+   pe rând (round-robin), câte o cuantă de audio, deci o sesiune vorbăreață nu le blochează pe celelalte
+ - control la admitere: sesiunile noi sunt refuzate peste --max-sessions sau când încărcarea
+   recentă a worker-ilor depășește --max-load; o coadă plină pierde audio-ul cel mai vechi
+ - API JSON lines pe TCP (implicit 127.0.0.1:8767); ca la jarvis_daemon.py, fiecare cerere
+   conține "token": secretul din ~/.jarvis/recognition.token (0600), de copiat pe clienți;
+   fără token serverul nu ascultă decât pe loopback
+   {"op": "open", "sample_rate": 16000, "wake_word": "jarvis"}   -> {"ok": true, "session": 3}
+   {"op": "audio", "pcm": "<base64 16-bit mono>"}                 -> {"ok": true, "events": [...]}
+   {"op": "close"}, {"op": "stats"}
+ - raport: sesiuni per nucleu, factor de timp real (RTF), încărcare, latență, audio pierdut
+Exemple: python recognition_server.py --host 0.0.0.0
+         python recognition_server.py --bench 1,2,4,8,16 --audio recordings/ --seconds 20
+"""
+
+import argparse
+import base64
+import hmac
+import ipaddress
+import json
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from jarvis_daemon import ensure_token
+from tracing import percentile
+from vad import VoiceActivityGate
+
+MODEL_PATH = "models/vosk-model-small-en-us-0.15"
+SAMPLE_RATE = 16000
+HOST = "127.0.0.1"
+PORT = 8767
+QUANTUM_MS = 200  # audio decoded per turn of a session before the next session gets a worker
+MAX_QUEUE_S = 2.0  # queued audio per session; older audio is dropped past this
+MAX_LOAD = 0.85  # recent worker utilization above which new sessions are refused
+LOAD_WINDOW_S = 5.0
+VAD_MARGIN_DB = 9.0
+VAD_HANGOVER_MS = 800
+VAD_PREROLL_MS = 300
+DEFAULT_TOKEN_PATH = str(Path.home() / ".jarvis" / "recognition.token")
+MAX_LINE_BYTES = 4 * 1024 * 1024  # one request line (audio chunks are base64)
+
+
+class AdmissionError(Exception):
+    pass
+
+
+class Transcriber:
+    """Plain transcription with the same interface as WakeWordPipeline: ("final", text) events."""
+
+    def __init__(self, model, sample_rate):
+        from vosk import KaldiRecognizer
+        self.rec = KaldiRecognizer(model, sample_rate)
+
+    def accept(self, chunk):
+        if self.rec.AcceptWaveform(chunk):
+            text = json.loads(self.rec.Result()).get("text", "")
+            if text:
+                return ("final", text)
+        return None
+
+    def silence(self, samples):
+        return None
+
+    def flush(self):
+        text = json.loads(self.rec.FinalResult()).get("text", "")
+        return ("final", text) if text else None
+
+
+class Session:
+    def __init__(self, sid, recognizer, sample_rate, vad, max_queue_s):
+        self.id = sid
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.vad = vad
+        self.max_queue = int(max_queue_s * sample_rate)  # samples
+        self.opened = time.monotonic()
+        self.queue = deque()  # (pcm bytes, enqueued at)
+        self.queued = 0  # samples
+        self.scheduled = False  # in the ready queue or being decoded
+        self.closing = False
+        self.events = []
+        self.audio_samples = 0
+        self.dropped_samples = 0
+        self.decode_seconds = 0.0
+
+    def take(self, samples):
+        """Up to `samples` of queued audio as one chunk, plus when its newest part was queued."""
+        parts, n, newest = [], 0, None
+        while self.queue and n < samples:
+            pcm, t = self.queue.popleft()
+            parts.append(pcm)
+            n += len(pcm) // 2
+            newest = t
+        self.queued -= n
+        return b"".join(parts), newest
+
+    def stats(self):
+        audio_s = self.audio_samples / self.sample_rate
+        return {"id": self.id, "audio_s": round(audio_s, 2), "decode_s": round(self.decode_seconds, 3),
+                "rtf": round(self.decode_seconds / audio_s, 4) if audio_s else None,
+                "queued_s": round(self.queued / self.sample_rate, 2),
+                "dropped_s": round(self.dropped_samples / self.sample_rate, 2)}
+
+
+class RecognitionServer:
+    """Many audio sessions on one shared Vosk model, decoded by a pool of worker threads.
+
+    Sessions with queued audio wait in a ready queue. A worker takes the
+    first one, decodes up to QUANTUM_MS of its audio and puts it back at
+    the end if more is waiting. A session is never on two workers at once,
+    so its recognizer sees the audio in order.
+    """
+
+    def __init__(self, model, sample_rate=SAMPLE_RATE, workers=None, max_sessions=None, max_load=MAX_LOAD,
+                 quantum_ms=QUANTUM_MS, max_queue_s=MAX_QUEUE_S, vad=True):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.workers = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions
+        self.max_load = max_load
+        self.quantum_ms = quantum_ms
+        self.max_queue_s = max_queue_s
+        self.use_vad = vad
+        self.sessions = {}
+        self.counts = {"opened": 0, "rejected": 0, "closed": 0, "errors": 0}
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._next_id = 1
+        self._opening = 0  # admitted sessions whose recognizer is still being built
+        self._closed = False
+        self._busy = deque()  # (end time, decode seconds) of recent turns, for load()
+        self._latencies = deque(maxlen=8192)  # queued -> decoded, seconds
+        self._audio_samples = 0
+        self._decode_seconds = 0.0
+        self._dropped_samples = 0
+        self._started = time.monotonic()
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, daemon=True, name=f"recognizer-{i}").start()
+
+    # ---------- sessions ----------
+    def open(self, sample_rate=None, wake_word=None, command_timeout=6.0):
+        """New session; AdmissionError when the server is full or overloaded."""
+        if sample_rate is not None and (not isinstance(sample_rate, int) or isinstance(sample_rate, bool)
+                                        or sample_rate <= 0):
+            raise ValueError(f"sample_rate must be a positive integer, not {sample_rate!r}")
+        with self._cond:
+            if self._closed:
+                raise AdmissionError("server is shutting down")
+            if self.max_sessions is not None and len(self.sessions) + self._opening >= self.max_sessions:
+                self.counts["rejected"] += 1
+                raise AdmissionError(f"server full ({len(self.sessions) + self._opening} sessions)")
+            load = self._load()
+            if load > self.max_load:
+                self.counts["rejected"] += 1
+                raise AdmissionError(f"server overloaded (load {load:.2f})")
+            sid = self._next_id
+            self._next_id += 1
+            self._opening += 1
+        try:
+            rate = sample_rate or self.sample_rate
+            if wake_word:
+                from wake_word import WakeWordPipeline
+                recognizer = WakeWordPipeline(self.model, rate, wake_word, command_timeout=command_timeout)
+            else:
+                recognizer = Transcriber(self.model, rate)
+            vad = VoiceActivityGate(rate, margin_db=VAD_MARGIN_DB, hangover_ms=VAD_HANGOVER_MS,
+                                    preroll_ms=VAD_PREROLL_MS) if self.use_vad else None
+            session = Session(sid, recognizer, rate, vad, self.max_queue_s)
+        except BaseException:
+            with self._cond:
+                self._opening -= 1
+            raise
+        with self._cond:
+            self._opening -= 1
+            self.sessions[sid] = session
+            self.counts["opened"] += 1
+        return session
+
+    def feed(self, session, pcm):
+        """Queue 16-bit mono PCM for a session; returns immediately."""
+        if len(pcm) % 2:
+            raise ValueError(f"PCM must be whole 16-bit samples, got {len(pcm)} bytes")
+        now = time.monotonic()
+        with self._cond:
+            if session.closing:
+                raise ValueError(f"session {session.id} is closed")
+            session.queue.append((pcm, now))
+            session.queued += len(pcm) // 2
+            session.audio_samples += len(pcm) // 2
+            self._audio_samples += len(pcm) // 2
+            # a session that can't keep up loses its oldest audio, not everyone else's time
+            while session.queued > session.max_queue and len(session.queue) > 1:
+                old, _ = session.queue.popleft()
+                session.queued -= len(old) // 2
+                session.dropped_samples += len(old) // 2
+                self._dropped_samples += len(old) // 2
+            if not session.scheduled:
+                session.scheduled = True
+                self._ready.append(session)
+                self._cond.notify()
+
+    def events(self, session):
+        """Events since the last call: ("wake"|"command"|"prompt"|"timeout"|"final"|"error", text)."""
+        with self._cond:
+            out, session.events = session.events, []
+        return out
+
+    def close(self, session, timeout=None):
+        """Decode what is still queued, finalize the recognizer and return the remaining events."""
+        with self._cond:
+            session.closing = True
+            if not self._cond.wait_for(lambda: not session.scheduled, timeout):
+                # out of time: drop the backlog, but let a worker finish the turn it is on
+                if session in self._ready:
+                    self._ready.remove(session)
+                    session.scheduled = False
+                session.queue.clear()
+                session.queued = 0
+                self._cond.wait_for(lambda: not session.scheduled)
+            self.sessions.pop(session.id, None)
+            self.counts["closed"] += 1
+        event = session.recognizer.flush()
+        with self._cond:
+            if event:
+                session.events.append(event)
+            out, session.events = session.events, []
+        return out
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ---------- workers ----------
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ready or self._closed)
+                if not self._ready:
+                    return
+                session = self._ready.popleft()
+                chunk, queued_at = session.take(session.sample_rate * self.quantum_ms // 1000)
+            t0 = time.monotonic()
+            failed = False
+            try:
+                events = self._decode(session, chunk)
+            except Exception as e:
+                # one bad session must not take a worker (and close()) down with it
+                print(f"Session {session.id} decode error:", e)
+                events, failed = [("error", f"{type(e).__name__}: {e}")], True
+            end = time.monotonic()
+            with self._cond:
+                if failed:
+                    self.counts["errors"] += 1
+                    session.queue.clear()
+                    session.queued = 0
+                session.events.extend(events)
+                session.decode_seconds += end - t0
+                self._decode_seconds += end - t0
+                self._busy.append((end, end - t0))
+                if queued_at is not None:
+                    self._latencies.append(end - queued_at)
+                if session.queue:
+                    self._ready.append(session)  # back of the line: round-robin between sessions
+                else:
+                    session.scheduled = False
+                self._cond.notify_all()
+
+    def _decode(self, session, chunk):
+        events = []
+        blocks = session.vad.process(chunk) if session.vad is not None else [chunk]
+        if not blocks:
+            events.append(session.recognizer.silence(len(chunk) // 2))
+        for block in blocks:
+            t0 = time.perf_counter()
+            events.append(session.recognizer.accept(block))
+            if session.vad is not None:
+                session.vad.record_decode(time.perf_counter() - t0, len(block) // 2)
+        return [e for e in events if e]
+
+    # ---------- load and stats ----------
+    def _load(self):
+        """Share of the workers' time spent decoding over the last LOAD_WINDOW_S seconds."""
+        now = time.monotonic()
+        while self._busy and self._busy[0][0] < now - LOAD_WINDOW_S:
+            self._busy.popleft()
+        window = min(LOAD_WINDOW_S, now - self._started) or LOAD_WINDOW_S
+        return sum(seconds for _, seconds in self._busy) / (window * self.workers)
+
+    def reset_stats(self):
+        with self._cond:
+            self._latencies.clear()
+            self._busy.clear()
+            self._audio_samples = 0
+            self._decode_seconds = 0.0
+            self._dropped_samples = 0
+            self._started = time.monotonic()
+            self.counts = {"opened": 0, "rejected": 0, "closed": 0, "errors": 0}
+
+    def stats(self, per_session=False):
+        with self._cond:
+            latencies = sorted(self._latencies)
+            audio_s = self._audio_samples / self.sample_rate
+            wall = time.monotonic() - self._started
+            cores = os.cpu_count() or 1
+            out = dict(self.counts, sessions=len(self.sessions), workers=self.workers, cores=cores,
+                       sessions_per_core=round(len(self.sessions) / cores, 2),
+                       audio_s=round(audio_s, 2), decode_s=round(self._decode_seconds, 3),
+                       # CPU seconds per second of audio, per session: 1 / rtf sessions fit on one core
+                       rtf=round(self._decode_seconds / audio_s, 4) if audio_s else None,
+                       load=round(self._load(), 3),
+                       dropped_s=round(self._dropped_samples / self.sample_rate, 2),
+                       queued_s=round(sum(s.queued for s in self.sessions.values()) / self.sample_rate, 2),
+                       wall_s=round(wall, 1))
+            out["latency_ms"] = {f"p{p}": round(percentile(latencies, p) * 1000, 1) if latencies else None
+                                 for p in (50, 95, 99)}
+            if per_session:
+                out["per_session"] = [s.stats() for s in self.sessions.values()]
+        if out["rtf"]:
+            out["capacity_sessions_per_core"] = round(1 / out["rtf"], 1)
+        return out
+
+
+# ---------- network API ----------
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # a host name: it may well resolve to a public interface
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server_ref = None
+    token = None
+
+    def _reply(self, reply):
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def _authorized(self, line):
+        """Whether to serve this line; anything that isn't a JSON request with the token ends the connection."""
+        if not line.lstrip().startswith(b"{") or len(line) > MAX_LINE_BYTES:
+            self._reply({"ok": False, "error": "bad request"})
+            return False
+        if self.token is None:
+            return True
+        try:
+            token = str(json.loads(line).get("token", ""))
+        except ValueError:
+            self._reply({"ok": False, "error": "bad request: not JSON"})
+            return False
+        if not hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            self._reply({"ok": False, "error": "missing or wrong token"})
+            return False
+        return True
+
+    def handle(self):
+        rs = self.server_ref
+        session = None
+        try:
+            while True:
+                line = self.rfile.readline(MAX_LINE_BYTES + 1)
+                if not line or not self._authorized(line):
+                    return
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op == "open":
+                        if session is not None:
+                            rs.close(session)
+                        session = rs.open(request.get("sample_rate"), request.get("wake_word"))
+                        reply = {"ok": True, "session": session.id}
+                    elif op == "audio":
+                        if session is None:
+                            raise ValueError("no session: send {\"op\": \"open\"} first")
+                        rs.feed(session, base64.b64decode(request.get("pcm") or ""))
+                        reply = {"ok": True, "events": rs.events(session)}
+                    elif op == "close":
+                        events = rs.close(session) if session is not None else []
+                        session = None
+                        reply = {"ok": True, "events": events}
+                    elif op == "stats":
+                        reply = dict(rs.stats(per_session=bool(request.get("sessions"))), ok=True)
+                    else:
+                        reply = {"ok": False, "error": f"unknown op {op!r}"}
+                except AdmissionError as e:
+                    reply = {"ok": False, "error": str(e), "retry": True}
+                except (ValueError, AttributeError) as e:
+                    reply = {"ok": False, "error": f"bad request: {e}"}
+                self._reply(reply)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if session is not None:
+                rs.close(session)
+
+
+def serve(recognition_server, host=HOST, port=PORT, token=None):
+    """Start the JSON-lines API on a background thread; returns the socket server.
+
+    With a token every request must carry it. Without one only a loopback
+    host is accepted: anyone who can reach the port could stream audio in.
+    """
+    if token is None and not is_loopback(host):
+        raise ValueError(f"refusing to listen on {host} without a token")
+    handler = type("Handler", (_Handler,), {"server_ref": recognition_server, "token": token})
+    server = socketserver.ThreadingTCPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="recognition-api").start()
+    return server
+
+
+# ---------- load test ----------
+def _speech_like(seconds, sample_rate, seed=1):
+    """Bursts of loud noise between pauses, so the VAD passes roughly half of it (no recordings needed)."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    out, n = [], int(seconds * sample_rate)
+    while sum(len(x) for x in out) < n:
+        out.append((rng.standard_normal(int(rng.uniform(0.8, 2.5) * sample_rate)) * 3000).astype(np.int16))
+        out.append((rng.standard_normal(int(rng.uniform(0.5, 1.5) * sample_rate)) * 30).astype(np.int16))
+    return np.concatenate(out)[:n]
+
+
+def _feed_session(rs, samples, seconds, block_ms, results, lock):
+    """One simulated microphone: paced like real time, starting at a random offset."""
+    try:
+        session = rs.open()
+    except AdmissionError:
+        return
+    block = rs.sample_rate * block_ms // 1000
+    offset = random.randrange(0, max(1, len(samples) - block))
+    start, fed = time.monotonic(), 0
+    while fed < seconds * rs.sample_rate:
+        i = (offset + fed) % max(1, len(samples) - block)
+        rs.feed(session, samples[i:i + block].tobytes())
+        fed += block
+        delay = start + fed / rs.sample_rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    events = rs.events(session) + rs.close(session, timeout=seconds)
+    with lock:
+        results.append(len(events))
+
+
+def bench(rs, levels, samples, seconds, block_ms=100):
+    """Run each number of concurrent sessions for `seconds` of real time; one report per level."""
+    reports = []
+    for n in levels:
+        rs.reset_stats()
+        results, lock = [], threading.Lock()
+        threads = [threading.Thread(target=_feed_session, args=(rs, samples, seconds, block_ms, results, lock))
+                   for _ in range(n)]
+        for th in threads:
+            th.start()
+            time.sleep(0.01)
+        peak = 0
+        while any(th.is_alive() for th in threads):
+            peak = max(peak, len(rs.sessions))
+            time.sleep(0.1)
+        s = rs.stats()
+        report = {"sessions": n, "admitted": s["opened"], "rejected": s["rejected"], "events": sum(results),
+                  "sessions_per_core": round(peak / s["cores"], 2), "rtf": s["rtf"], "load": s["load"],
+                  "latency_ms": s["latency_ms"], "dropped_s": s["dropped_s"], "audio_s": s["audio_s"],
+                  "capacity_sessions_per_core": s.get("capacity_sessions_per_core")}
+        # keeping up: nothing dropped and audio decoded within a second of arriving
+        p95 = s["latency_ms"]["p95"]
+        report["realtime"] = s["dropped_s"] == 0 and p95 is not None and p95 < 1000
+        reports.append(report)
+        print(f"  {n:>3} sessions: admitted {report['admitted']}, {report['sessions_per_core']}/core, "
+              f"RTF {report['rtf']}, load {report['load']}, latency p95 {p95} ms, "
+              f"dropped {report['dropped_s']}s{'' if report['realtime'] else '  (falling behind)'}")
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve many audio sessions from one Vosk model.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--host", default=HOST, help="0.0.0.0 to accept remote clients")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, help="decoding threads (default: one per core)")
+    parser.add_argument("--max-sessions", type=int)
+    parser.add_argument("--max-load", type=float, default=MAX_LOAD)
+    parser.add_argument("--quantum-ms", type=int, default=QUANTUM_MS)
+    parser.add_argument("--no-vad", action="store_true", help="decode silence too")
+    parser.add_argument("--bench", help="comma-separated session counts to load-test, e.g. 1,2,4,8")
+    parser.add_argument("--audio", help="recordings for --bench (.wav/.pcm file or directory); default: synthetic")
+    parser.add_argument("--seconds", type=float, default=20, help="duration of each --bench level")
+    parser.add_argument("--json", help="also write the --bench report to this file")
+    parser.add_argument("--token-file", default=DEFAULT_TOKEN_PATH, help="secret clients must send")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.model):
+        print(f"Model not found at {args.model}.")
+        return 1
+    from vosk import Model
+    t0 = time.monotonic()
+    model = Model(args.model)
+    print(f"Model loaded in {time.monotonic() - t0:.1f}s")
+    rs = RecognitionServer(model, workers=args.workers, max_sessions=args.max_sessions, max_load=args.max_load,
+                           quantum_ms=args.quantum_ms, vad=not args.no_vad)
+
+    if args.bench:
+        import numpy as np
+        if args.audio:
+            from replay import audio_files, load_audio
+            samples = np.concatenate([load_audio(p, rs.sample_rate) for p in audio_files(args.audio)])
+        else:
+            samples = _speech_like(60, rs.sample_rate)
+        levels = [int(n) for n in args.bench.split(",")]
+        print(f"Load test: {rs.workers} workers on {os.cpu_count()} cores, {args.seconds}s per level")
+        reports = bench(rs, levels, samples, args.seconds)
+        kept_up = [r for r in reports if r["realtime"]]
+        if kept_up:
+            best = max(kept_up, key=lambda r: r["sessions"])
+            print(f"Real time up to {best['sessions']} sessions ({best['sessions_per_core']} per core)")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump({"workers": rs.workers, "cores": os.cpu_count(), "levels": reports}, fh, indent=2)
+        rs.shutdown()
+        return 0
+
+    server = serve(rs, args.host, args.port, token=ensure_token(args.token_file))
+    print(f"Recognition server on {args.host}:{args.port} ({rs.workers} workers)")
+    print("Clients must send the token in", args.token_file)
+    try:
+        while True:
+            time.sleep(30)
+            s = rs.stats()
+            if s["sessions"]:
+                print(f"{s['sessions']} sessions ({s['sessions_per_core']}/core), RTF {s['rtf']}, "
+                      f"load {s['load']}, latency p95 {s['latency_ms']['p95']} ms, dropped {s['dropped_s']}s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        rs.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+replay.py
+Rulează pipeline-ul de recunoaștere fără microfon, pe fișiere WAV/PCM înregistrate.
+ - același drum ca live: audio_callback -> audio_buf -> VAD -> wake word -> handle_command
+ - mai rapid decât timpul real (implicit, fără pierderi) sau în ritm real (--realtime)
+ - speak / speak_sentences / open_with_default sunt înlocuite; nu e nevoie de placă de sunet
+ - raport: factor de timp real (RTF), latența per comandă, comenzile recunoscute
+   și sumarul pe etape din tracing.py (TTS-ul înlocuit "pornește" imediat)
+Exemplu: python replay.py recordings/ --script jarvis_vosk --json replay.json
+"""
+
+import argparse
+import bisect
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+from tracing import tracer
+
+AUDIO_SUFFIXES = {".wav", ".pcm", ".raw"}
+
+
+def audio_files(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if os.path.splitext(name)[1].lower() in AUDIO_SUFFIXES)
+    return [path]
+
+
+def load_audio(path, sample_rate):
+    """int16 mono samples at sample_rate; .pcm/.raw files must already be in that format."""
+    if os.path.splitext(path)[1].lower() != ".wav":
+        return np.fromfile(path, dtype=np.int16)
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        rate, channels = wf.getframerate(), wf.getnchannels()
+        x = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        x = x[::channels]  # first channel
+    if rate != sample_rate:
+        n = int(len(x) * sample_rate / rate)
+        x = np.interp(np.arange(n) * rate / sample_rate, np.arange(len(x)), x).astype(np.int16)
+    return x
+
+
+def _summary(values):
+    if not values:
+        return {}
+    return {"mean": round(float(np.mean(values)), 1),
+            "p95": round(float(np.percentile(values, 95)), 1),
+            "max": round(float(np.max(values)), 1)}
+
+
+class Replay:
+    """Drives one JARVIS entry-point module with recorded audio instead of a microphone.
+
+    Command latency is measured from the moment the newest audio the
+    recognizer had consumed was delivered to audio_callback until
+    handle_command is called, i.e. what a live user would wait for.
+    """
+
+    def __init__(self, module, realtime=False, gap_s=1.0):
+        self.m = module
+        self.realtime = realtime
+        self.sample_rate = module.SAMPLE_RATE
+        self.block = module.SAMPLE_RATE * module.CAPTURE_BLOCK_MS // 1000
+        self.batch = module.SAMPLE_RATE * module.DECODE_BATCH_MS // 1000
+        self.gap = np.zeros(int(gap_s * self.sample_rate), dtype=np.int16)
+        self.fed = 0
+        self._fed_at = []  # samples fed after each block
+        self._fed_time = []  # monotonic time each block was delivered
+        self._files = []  # (first sample, file name)
+        self.commands = []
+        self.actions = []
+        self._stub()
+
+    def _stub(self):
+        m = self.m
+        self._handle_command = m.handle_command
+        m.speak = self._speak
+        m.speak_sentences = self._speak_sentences
+        m.open_with_default = lambda path: self.actions.append(("open", path))
+        m.handle_command = self._on_command
+
+    def _speak(self, text, priority=None):
+        tracer.speech_requested()
+        tracer.speech_started()
+        self.actions.append(("speak", text))
+
+    def _speak_sentences(self, sentences):
+        tracer.speech_requested()
+        tracer.speech_started()
+        self.actions.extend(("speak", s) for s in sentences)
+
+    def _delivered_at(self, position):
+        i = bisect.bisect_left(self._fed_at, position)
+        return self._fed_time[min(i, len(self._fed_time) - 1)]
+
+    def _file_at(self, position):
+        i = bisect.bisect_right([start for start, _ in self._files], max(position - 1, 0)) - 1
+        return self._files[max(i, 0)][1]
+
+    def _on_command(self, text):
+        t0 = time.monotonic()
+        position = self.m.audio_buf.position
+        first_action = len(self.actions)
+        error = None
+        try:
+            self._handle_command(text)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.commands.append({
+            "file": self._file_at(position),
+            "audio_s": round(position / self.sample_rate, 2),
+            "text": text,
+            "latency_ms": round((t0 - self._delivered_at(position)) * 1000, 1),
+            "handle_ms": round((time.monotonic() - t0) * 1000, 1),
+            "actions": self.actions[first_action:],
+            "error": error,
+        })
+
+    def feed(self, samples):
+        buf = self.m.audio_buf
+        start = time.monotonic()
+        for i in range(0, len(samples), self.block):
+            chunk = samples[i:i + self.block]
+            if self.realtime:
+                delay = start + (i + len(chunk)) / self.sample_rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                # as fast as the recognizer can go, but never outrun it (nothing is dropped)
+                while buf.available() > 2 * self.batch or buf.is_busy():
+                    time.sleep(0.001)
+            self.m.audio_callback(chunk, len(chunk), None, None)
+            self.fed += len(chunk)
+            self._fed_at.append(self.fed)
+            self._fed_time.append(time.monotonic())
+
+    def run(self, paths):
+        m = self.m
+        th = threading.Thread(target=m.recognition_loop, daemon=True)
+        th.start()
+        t0 = time.monotonic()
+        for path in paths:
+            self._files.append((self.fed, os.path.basename(path)))
+            self.feed(load_audio(path, self.sample_rate))
+            self.feed(self.gap)  # trailing silence so the last utterance is endpointed
+        # let the recognizer drain every full batch; close() hands it the remainder
+        while m.audio_buf.available() >= self.batch or m.audio_buf.is_busy():
+            time.sleep(0.005)
+        if hasattr(m, "executor"):
+            m.executor.wait_idle()  # commands run off the recognition thread
+        m.audio_buf.close()
+        th.join()
+        event = m.pipeline.flush()
+        if event:
+            m.handle_event(event)
+            if hasattr(m, "executor"):
+                m.executor.wait_idle()
+        wall = time.monotonic() - t0
+        audio_s = self.fed / self.sample_rate
+        return {
+            "script": m.__name__,
+            "mode": "realtime" if self.realtime else "fast",
+            "files": len(paths),
+            "audio_s": round(audio_s, 2),
+            "wall_s": round(wall, 2),
+            "rtf": round(wall / audio_s, 3) if audio_s else None,
+            "decode_rtf": round(m.vad.decode_seconds / audio_s, 3) if audio_s else None,
+            "latency_ms": _summary([c["latency_ms"] for c in self.commands]),
+            "commands": self.commands,
+            "vad": m.vad.stats(),
+            "audio_buffer": m.audio_buf.stats(),
+            "stages": tracer.summary(),
+        }
+
+
+def print_report(report):
+    print(f"\nReplayed {report['files']} file(s), {report['audio_s']}s of audio in {report['wall_s']}s "
+          f"({report['mode']}): RTF {report['rtf']}, decode RTF {report['decode_rtf']}")
+    for c in report["commands"]:
+        print(f"  [{c['file']} @ {c['audio_s']}s] {c['text']!r}: latency {c['latency_ms']} ms, "
+              f"handled in {c['handle_ms']} ms" + (f", error {c['error']}" if c["error"] else ""))
+    if report["latency_ms"]:
+        print("Command latency (ms):", report["latency_ms"])
+    print("VAD:", report["vad"])
+    print("Audio buffer:", report["audio_buffer"])
+    print(tracer.report())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded audio through the JARVIS recognition pipeline.")
+    parser.add_argument("path", help="a .wav/.pcm file or a directory of them")
+    parser.add_argument("--script", default="jarvis_vosk", choices=["jarvis_vosk", "jarvis_vosk_openai"])
+    parser.add_argument("--realtime", action="store_true", help="pace the audio like a live microphone")
+    parser.add_argument("--gap", type=float, default=1.0, help="seconds of silence after each file")
+    parser.add_argument("--offline", action="store_true", help="disable the OpenAI fallback")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    paths = audio_files(args.path)
+    if not paths:
+        print("No audio files found in", args.path)
+        return 1
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module = importlib.import_module(args.script)
+    if args.offline and hasattr(module, "OPENAI_API_KEY"):
+        module.OPENAI_API_KEY = None
+    report = Replay(module, realtime=args.realtime, gap_s=args.gap).run(paths)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
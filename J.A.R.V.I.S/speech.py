@@ -0,0 +1,337 @@
+"""
+speech.py
+Un singur thread deține motorul pyttsx3; restul programului doar pune mesaje în coadă.
+ - coadă pe priorități; mesajele identice deja în coadă sunt comasate
+ - say() nu blochează: întoarce un SpeechHandle pe care apelantul îl poate
+   aștepta (wait) sau anula (cancel)
+ - barge-in: interrupt() oprește imediat propoziția curentă și golește coada
+   (folosește bucla externă pyttsx3 startLoop(False)/iterate(); dacă driverul
+   nu o suportă, întreruperea are loc între propoziții)
+ - cu un PhraseCache (speech_cache.py), frazele fixe sunt redate din audio
+   pre-randat, fără să aștepte motorul TTS
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+URGENT, HIGH, NORMAL, LOW, IDLE = 0, 1, 2, 3, 4
+
+
+class SpeechHandle:
+    def __init__(self, text, priority, seq, kind="say", audio=None):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.kind = kind  # say, play (a sound), render (into the phrase cache)
+        self.audio = audio
+        self.state = "queued"  # queued, speaking, done, cancelled
+        self._done = threading.Event()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def __repr__(self):
+        return f"SpeechHandle({self.text[:30]!r}, {self.state})"
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self.state == "cancelled"
+
+    def cancel(self):
+        """Drop the message if queued, or cut it off if it is being spoken."""
+        if not self._done.is_set():
+            self.state = "cancelled"
+
+    def wait(self, timeout=None):
+        """Block until spoken or cancelled; returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def _finish(self):
+        if self.state != "cancelled":
+            self.state = "done"
+        self._done.set()
+
+
+class SpeechEngine:
+    """Owns the TTS engine on one long-lived thread, started on the first say().
+
+    The pyttsx3 engine itself is only created when something has to be
+    synthesized, so cached phrases and sounds play without waiting for it.
+    """
+
+    def __init__(self, rate=150, volume=1.0, on_start=None, engine_factory=None, voice=None,
+                 cache=None, player=None):
+        self.rate = rate
+        self.volume = volume
+        self.voice = voice
+        self.on_start = on_start  # called when an utterance actually starts playing
+        self.engine_factory = engine_factory
+        self.cache = cache  # speech_cache.PhraseCache
+        self.player = player  # speech_cache.AudioPlayer, plays cached audio
+        self.spoken = 0
+        self.played_cached = 0
+        self.coalesced = 0
+        self.interrupted = 0
+        self._queue = []
+        self._current = None
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread = None
+        self._closed = False
+        self._engine = None
+        self._engine_failed = False
+        self._external = False
+        self._finished = threading.Event()
+
+    # ---------- API ----------
+    def say(self, text, priority=NORMAL, interrupt=False, coalesce=True):
+        """Queue text; returns its SpeechHandle right away.
+
+        interrupt=True is barge-in: the current utterance and the queue are
+        dropped first. With coalesce, an identical message already waiting
+        in the queue is reused instead of being said twice.
+        """
+        if interrupt:
+            self.interrupt()
+        return self._push(text, priority, "say", coalesce=coalesce)
+
+    def play(self, audio, priority=NORMAL, name="sound"):
+        """Queue int16 samples (e.g. PhraseCache.load_sound) in line with the speech."""
+        if audio is None or self.player is None:
+            return None
+        return self._push(name, priority, "play", audio=audio, coalesce=False)
+
+    def warm(self, phrases):
+        """Load cached renderings of phrases and render the missing ones when nothing else is queued."""
+        if self.cache is None:
+            return 0
+        missing = self.cache.load(phrases)
+        for text in missing:
+            self._push(text, IDLE, "render")
+        return len(missing)
+
+    def _push(self, text, priority, kind, audio=None, coalesce=True):
+        with self._cond:
+            if coalesce:
+                for queued in self._queue:
+                    if queued.text == text and queued.kind == kind and not queued.cancelled:
+                        queued.priority = min(queued.priority, priority)
+                        heapq.heapify(self._queue)
+                        self.coalesced += 1
+                        return queued
+            handle = SpeechHandle(text, priority, next(self._seq), kind, audio)
+            heapq.heappush(self._queue, handle)
+            self._ensure_thread()
+            self._cond.notify_all()
+        return handle
+
+    def say_each(self, sentences, priority=LOW, cancelled=None, on_sentence=None):
+        """Speak sentences one after another, pulling each only when the previous one is done.
+
+        Blocks the caller; stops when cancelled() turns true or a sentence is
+        interrupted. Returns how many sentences were spoken to the end.
+        """
+        spoken = 0
+        for sentence in sentences:
+            if cancelled and cancelled():
+                break
+            if on_sentence:
+                on_sentence(sentence)
+            handle = self.say(sentence, priority, coalesce=False)
+            while not handle.wait(0.1):
+                if cancelled and cancelled():
+                    handle.cancel()
+            if handle.cancelled:
+                break
+            spoken += 1
+        return spoken
+
+    def interrupt(self):
+        """Stop the current utterance and drop everything queued (pending renders are kept)."""
+        with self._cond:
+            dropped = [h for h in self._queue if h.kind != "render"]
+            self._queue = [h for h in self._queue if h.kind == "render"]
+            heapq.heapify(self._queue)
+            current = self._current
+        for handle in dropped:
+            handle.cancel()
+            handle._finish()
+        if current is not None and current.kind != "render" and not current.done:
+            current.cancel()
+            self.interrupted += 1
+
+    def _audible(self):
+        # rendering into the cache is silent, so it doesn't count as busy
+        current = self._current
+        return (current is not None and current.kind != "render") or any(h.kind != "render" for h in self._queue)
+
+    def is_busy(self):
+        with self._cond:
+            return self._audible()
+
+    def wait_idle(self, timeout=None):
+        """Block until everything queued has been spoken (e.g. before listening)."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._audible():
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(0.1 if left is None else min(left, 0.1))
+        return True
+
+    def stats(self):
+        stats = {"spoken": self.spoken, "cached": self.played_cached,
+                 "coalesced": self.coalesced, "interrupted": self.interrupted}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self):
+        self.interrupt()
+        with self._cond:
+            self._queue = []
+            self._closed = True
+            self._cond.notify_all()
+
+    # ---------- owner thread ----------
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="speech")
+            self._thread.start()
+
+    def _make_engine(self):
+        if self.engine_factory is not None:
+            return self.engine_factory()
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty("rate", self.rate)
+        engine.setProperty("volume", self.volume)
+        if self.voice:
+            engine.setProperty("voice", self.voice)
+        return engine
+
+    def _get_engine(self):
+        if self._engine is None and not self._engine_failed:
+            try:
+                engine = self._make_engine()
+            except Exception as e:
+                print("TTS init error:", e)
+                self._engine_failed = True
+                return None
+
+            def _on_start(name):
+                current = self._current
+                if self.on_start and current is not None and current.kind == "say":
+                    self.on_start()
+            engine.connect("started-utterance", _on_start)
+            engine.connect("finished-utterance", lambda name, completed: self._finished.set())
+            try:
+                engine.startLoop(False)
+                self._external = True
+            except Exception:
+                self._external = False  # driver without an external loop: runAndWait per utterance
+            self._engine = engine
+        return self._engine
+
+    def _next(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            handle = heapq.heappop(self._queue)
+            self._current = handle
+            return handle
+
+    def _done_with(self, handle):
+        handle._finish()
+        with self._cond:
+            self._current = None
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            handle = self._next()
+            if handle is None:
+                break
+            if not handle.cancelled:
+                handle.state = "speaking"
+                try:
+                    if handle.kind == "render":
+                        self._render(handle)
+                    else:
+                        audio = handle.audio
+                        if audio is None and self.cache is not None:
+                            audio = self.cache.get(handle.text)
+                        if audio is not None and self._play(handle, audio):
+                            self.played_cached += handle.kind == "say"
+                        elif handle.kind == "say":
+                            self._speak(handle)
+                except Exception as e:
+                    print("TTS error:", e)
+            self._done_with(handle)
+        if self._engine is not None and self._external:
+            try:
+                self._engine.endLoop()
+            except Exception:
+                pass
+        if self.player is not None:
+            self.player.close()
+
+    def _play(self, handle, audio):
+        if self.player is None:
+            return False
+        try:
+            self.player.play(audio, cancelled=lambda: handle.cancelled,
+                             on_start=self.on_start if handle.kind == "say" else None)
+        except Exception as e:
+            print("Audio output error, falling back to TTS:", e)
+            self.player = None
+            return False
+        self.spoken += 1
+        return True
+
+    def _pump(self, handle, timeout=None):
+        # drive the external loop until the engine reports the utterance finished
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self._finished.is_set():
+            if handle.cancelled:
+                self._engine.stop()  # barge-in: cut the sentence off
+                return False
+            if end is not None and time.monotonic() > end:
+                return False
+            self._engine.iterate()
+            time.sleep(0.01)
+        return True
+
+    def _speak(self, handle):
+        engine = self._get_engine()
+        if engine is None:
+            return
+        self._finished.clear()
+        engine.say(handle.text)
+        if self._external:
+            self._pump(handle)
+        else:
+            engine.runAndWait()
+        self.spoken += 1
+
+    def _render(self, handle):
+        engine = self._get_engine()
+        if engine is None:
+            return
+        path = self.cache.render_path(handle.text)
+        self._finished.clear()
+        engine.save_to_file(handle.text, path)
+        if self._external:
+            self._pump(handle, timeout=30)
+        else:
+            engine.runAndWait()
+        self.cache.add_rendered(handle.text, path)
@@ -0,0 +1,236 @@
+"""
+speech_cache.py
+Cache de audio pre-randat pentru frazele fixe ("Yes?", anunțul de pornire, textul de ajutor)
+și pentru sunetul de activare.
+ - PCM int16 mono în memorie + fișiere .wav pe disc, cheie: text + voce + rate + volum
+ - frazele lipsă sunt randate o singură dată de motorul TTS (save_to_file), în fundal
+ - activation.mp3 este decodat o singură dată (ffmpeg), apoi citit din cache;
+   fără ffmpeg pornirea are loc fără sunet (un .wav nu are nevoie de ffmpeg)
+ - redare printr-un stream de ieșire deschis permanent (latență mică), întreruptibilă
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_SPEECH_CACHE_DIR = str(Path.home() / ".jarvis" / "speech_cache")
+PLAYBACK_RATE = 22050
+
+
+def resample(samples, src_rate, dst_rate):
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n = int(len(samples) * dst_rate / src_rate)
+    x = np.linspace(0, len(samples) - 1, n)
+    return np.interp(x, np.arange(len(samples)), samples).astype(np.int16)
+
+
+def read_wav(path, rate=PLAYBACK_RATE):
+    """Mono int16 samples of a PCM WAV file at `rate` (wave.Error for other formats)."""
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise wave.Error("only 16-bit PCM is supported")
+        channels, src_rate = w.getnchannels(), w.getframerate()
+        samples = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return resample(samples, src_rate, rate)
+
+
+def write_wav(path, samples, rate=PLAYBACK_RATE):
+    tmp = path + ".tmp"
+    with wave.open(tmp, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    os.replace(tmp, path)
+
+
+def decode_ffmpeg(path, rate=PLAYBACK_RATE):
+    """Decode any audio file ffmpeg understands; None if ffmpeg is not installed."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    out = subprocess.run([ffmpeg, "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+                         capture_output=True, check=True).stdout
+    return np.frombuffer(out, dtype=np.int16)
+
+
+class PhraseCache:
+    """Rendered phrases by text; get() is a dict lookup, so it is cheap to try on every utterance."""
+
+    def __init__(self, directory=DEFAULT_SPEECH_CACHE_DIR, voice=None, rate=150, volume=1.0,
+                 sample_rate=PLAYBACK_RATE):
+        self.directory = directory
+        self.voice = voice or "default"
+        self.rate = rate
+        self.volume = volume
+        self.sample_rate = sample_rate
+        self.hits = 0
+        self.misses = 0
+        self._clips = {}
+        self._lock = threading.Lock()
+
+    def key(self, text):
+        raw = f"{self.voice}|{self.rate}|{self.volume}|{self.sample_rate}|{text}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".wav")
+
+    def get(self, text):
+        """Samples for text if it has been rendered (memory only; see load())."""
+        with self._lock:
+            clip = self._clips.get(text)
+            if clip is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return clip
+
+    def load(self, phrases):
+        """Load phrases already rendered on disk; returns the ones still missing."""
+        missing = []
+        for text in phrases:
+            path = self._path(self.key(text))
+            try:
+                clip = read_wav(path, self.sample_rate)
+            except (OSError, EOFError, wave.Error):
+                missing.append(text)
+                continue
+            with self._lock:
+                self._clips[text] = clip
+        return missing
+
+    def render_path(self, text):
+        """Where the TTS engine should write a fresh rendering of text."""
+        os.makedirs(self.directory, exist_ok=True)
+        return self._path(self.key(text)) + ".render"
+
+    def add_rendered(self, text, path):
+        """Store the engine's output file for text; False if it could not be decoded."""
+        try:
+            try:
+                clip = read_wav(path, self.sample_rate)
+            except wave.Error:
+                clip = decode_ffmpeg(path, self.sample_rate)  # e.g. AIFF from the macOS driver
+            if clip is None or len(clip) == 0:
+                return False
+            write_wav(self._path(self.key(text)), clip, self.sample_rate)
+        except (OSError, EOFError, wave.Error, subprocess.CalledProcessError) as e:
+            print(f"Could not cache speech for {text!r}:", e)
+            return False
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._clips[text] = clip
+        return True
+
+    def load_sound(self, path):
+        """Samples of a sound file (e.g. activation.mp3), decoded once and then kept as WAV.
+
+        Formats other than WAV need ffmpeg the first time; without it (or
+        with path None) this returns None and the sound is simply skipped.
+        """
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"sound|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{self.sample_rate}"
+        cached = self._path(hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20])
+        try:
+            return read_wav(cached, self.sample_rate)
+        except (OSError, EOFError, wave.Error):
+            pass
+        try:
+            if path.lower().endswith(".wav"):
+                samples = read_wav(path, self.sample_rate)
+            else:
+                samples = decode_ffmpeg(path, self.sample_rate)
+                if samples is None:
+                    print(f"ffmpeg not found: starting without {os.path.basename(path)} "
+                          f"(install ffmpeg or point ACTIVATION_SOUND to a .wav file).")
+                    return None
+            os.makedirs(self.directory, exist_ok=True)
+            write_wav(cached, samples, self.sample_rate)
+            return samples
+        except (OSError, EOFError, wave.Error, subprocess.CalledProcessError) as e:
+            print(f"Could not decode {os.path.basename(path)}:", e)
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {"phrases": len(self._clips), "hits": self.hits, "misses": self.misses,
+                    "bytes": sum(c.nbytes for c in self._clips.values())}
+
+
+class AudioPlayer:
+    """One output stream kept open, so a clip starts with the next audio callback."""
+
+    def __init__(self, sample_rate=PLAYBACK_RATE, latency="low"):
+        self.sample_rate = sample_rate
+        self.latency = latency
+        self._stream = None
+        self._clip = None
+        self._pos = 0
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def _ensure_stream(self):
+        if self._stream is None:
+            import sounddevice as sd
+            self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                           latency=self.latency, callback=self._callback)
+            self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self._lock:
+            clip = self._clip
+            if clip is None:
+                outdata.fill(0)
+                return
+            n = min(frames, len(clip) - self._pos)
+            outdata[:n, 0] = clip[self._pos:self._pos + n]
+            outdata[n:] = 0
+            self._pos += n
+            if self._pos >= len(clip):
+                self._clip = None
+                self._done.set()
+
+    def play(self, samples, cancelled=None, on_start=None):
+        """Play samples, blocking until done; False if cancelled() turned true first."""
+        self._ensure_stream()
+        with self._lock:
+            self._clip = samples
+            self._pos = 0
+            self._done.clear()
+        if on_start:
+            on_start()
+        while not self._done.wait(0.02):
+            if cancelled and cancelled():
+                self.stop()
+                return False
+        return True
+
+    def stop(self):
+        with self._lock:
+            self._clip = None
+            self._done.set()
+
+    def close(self):
+        self.stop()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
@@ -0,0 +1,150 @@
+"""
+startup.py
+Pornire în etape pentru variantele Vosk (jarvis_vosk.py, jarvis_vosk_openai.py).
+ - microfonul pornește primul; buffer-ul circular păstrează ce se spune cât se încarcă modelul
+ - modelul Vosk (și modulul vosk) se încarcă pe un thread de fundal: întâi etapa
+   cuvântului de trezire, apoi recognizer-ul complet pentru comenzi
+ - opțional, un model mic separat doar pentru "jarvis", cu modelul mare încărcat după el
+ - durata fiecărei etape e afișată la pornire și adăugată ca o linie JSON în ~/.jarvis/startup.jsonl
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_STARTUP_LOG = str(Path.home() / ".jarvis" / "startup.jsonl")
+
+# taken when the entry point imports this module, i.e. before its heavier imports
+PROCESS_START = time.monotonic()
+
+
+class StartupTimer:
+    """Start offset and duration of each startup phase, from any thread."""
+
+    def __init__(self, script, origin=PROCESS_START):
+        self.script = script
+        self.origin = origin
+        self.phases = []  # (name, start offset s, duration s, thread name)
+        self._last = origin
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end=None):
+        end = time.monotonic() if end is None else end
+        with self._lock:
+            self.phases.append((name, start - self.origin, end - start, threading.current_thread().name))
+
+    def mark(self, name):
+        """A milestone (e.g. "listening"): a phase of zero length."""
+        now = time.monotonic()
+        self.record(name, now, now)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, t0)
+
+    def lap(self, name):
+        """Record the time since the previous lap (or since the process started) as a phase."""
+        now = time.monotonic()
+        with self._lock:
+            start, self._last = self._last, now
+        self.record(name, start, now)
+
+    def elapsed(self):
+        return time.monotonic() - self.origin
+
+    def summary(self):
+        """{phase: duration ms}"""
+        with self._lock:
+            return {name: round(duration * 1000, 1) for name, _, duration, _ in self.phases}
+
+    def report(self):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        lines = [f"Startup of {self.script}:", f"  {'phase':<20}{'at ms':>9}{'took ms':>10}  thread"]
+        for name, start, duration, thread in phases:
+            lines.append(f"  {name:<20}{start * 1000:>9.0f}{duration * 1000:>10.0f}  {thread}")
+        return "\n".join(lines)
+
+    def save(self, path=DEFAULT_STARTUP_LOG):
+        """Append this startup as one JSON line, so cold-start time can be compared across runs."""
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "script": self.script,
+                 "ready_ms": round(self.elapsed() * 1000, 1), "phases": self.summary()}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print("Could not write the startup log:", e)
+
+
+class RecognizerLoader:
+    """Imports vosk, loads the model(s) and builds the WakeWordPipeline on a background thread.
+
+    wait_wake() turns true once the wake-word stage can decode; wait_ready()
+    once the command stage is attached as well, and model is the model it
+    uses. Both also return once loading has failed: then error is set and
+    pipeline is None, even if the wake-word stage had already loaded (a
+    pipeline without its command stage would only ever answer "loading").
+    """
+
+    def __init__(self, model_path, sample_rate, wake_word, command_timeout, timer, wake_model_path=None):
+        self.model_path = model_path
+        self.wake_model_path = wake_model_path or model_path
+        self.sample_rate = sample_rate
+        self.wake_word = wake_word
+        self.command_timeout = command_timeout
+        self.timer = timer
+        self.pipeline = None
+        self.model = None
+        self.error = None
+        self._wake_ready = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, daemon=True, name="model-loader")
+                self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            with self.timer.phase("import_vosk"):
+                from vosk import Model
+                from wake_word import WakeWordPipeline
+            separate = os.path.abspath(self.wake_model_path) != os.path.abspath(self.model_path)
+            with self.timer.phase("wake_model_load" if separate else "model_load"):
+                model = Model(self.wake_model_path)
+            with self.timer.phase("wake_stage"):
+                pipeline = WakeWordPipeline(model, self.sample_rate, self.wake_word,
+                                            command_timeout=self.command_timeout, command_stage=False)
+            self.pipeline = pipeline
+            self._wake_ready.set()
+            if separate:
+                with self.timer.phase("model_load"):
+                    model = Model(self.model_path)
+            with self.timer.phase("command_stage"):
+                pipeline.attach_command_stage(model)
+            self.model = model
+        except Exception as e:
+            self.error = e
+            self.pipeline = None
+            print("Could not load the Vosk model:", e)
+        finally:
+            self._wake_ready.set()
+            self._ready.set()
+
+    def wait_wake(self, timeout=None):
+        return self._wake_ready.wait(timeout)
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
@@ -0,0 +1,177 @@
+import importlib
+import json
+import os
+import re
+import sys
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def speech(text, ms=100, sample_rate=16000):
+    """PCM that FakeRecognizer hears as `text`: the words as ASCII, then a steady hum the VAD takes for voice."""
+    data = text.encode("ascii") + b"\0"
+    size = max(sample_rate * ms // 1000 * 2, len(data) + len(data) % 2)
+    return data + b"\x10" * (size - len(data))
+
+
+def silence(ms=100, sample_rate=16000):
+    return bytes(sample_rate * ms // 1000 * 2)
+
+
+class FakeRecognizer:
+    """KaldiRecognizer stand-in for audio made by speech(): silence after words ends an utterance."""
+
+    def __init__(self, model, sample_rate, grammar=None):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.grammar = set(json.loads(grammar)) if grammar else None
+        self.words = []
+
+    def AcceptWaveform(self, data):
+        fail = getattr(self.model, "fail", None)
+        if fail is not None and fail(data):
+            raise RuntimeError("decoder crashed")
+        words = [w.decode("ascii") for w in re.findall(rb"[a-z']+", bytes(data))]
+        if self.grammar is not None:
+            words = [w if w in self.grammar else "[unk]" for w in words]
+        self.words += words
+        return not words and any(w != "[unk]" for w in self.words)
+
+    def _text(self):
+        return " ".join(w for w in self.words if w != "[unk]")
+
+    def Result(self):
+        text, self.words = self._text(), []
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": self._text()})
+
+    def FinalResult(self):
+        return self.Result()
+
+    def Reset(self):
+        self.words = []
+
+
+class FakeEngine:
+    """pyttsx3 stand-in; each utterance takes `seconds`. external=False mimics drivers without startLoop()."""
+
+    def __init__(self, seconds=0.01, external=True):
+        self.seconds = seconds
+        self.external = external
+        self.said = []  # (text, completed)
+        self._callbacks = {}
+        self._text = None
+        self._until = None
+
+    def connect(self, name, callback):
+        self._callbacks[name] = callback
+
+    def setProperty(self, name, value):
+        pass
+
+    def startLoop(self, use_driver_loop=True):
+        if not self.external:
+            raise RuntimeError("no external loop")
+
+    def endLoop(self):
+        pass
+
+    def say(self, text):
+        self._text = text
+        self._until = None
+
+    def save_to_file(self, text, path):
+        self._text = None
+        open(path, "wb").close()
+
+    def iterate(self):
+        if self._until is None:
+            self._callbacks["started-utterance"]("utterance")
+            self._until = time.monotonic() + self.seconds
+        elif time.monotonic() >= self._until:
+            self._finish(True)
+
+    def stop(self):
+        self._finish(False)
+
+    def runAndWait(self):
+        self._callbacks["started-utterance"]("utterance")
+        time.sleep(self.seconds)
+        self._finish(True)
+
+    def _finish(self, completed):
+        if self._text is not None:
+            self.said.append((self._text, completed))
+        self._text = self._until = None
+        self._callbacks["finished-utterance"]("utterance", completed)
+
+
+@pytest.fixture
+def fake_vosk(monkeypatch):
+    """A `vosk` module good enough for the code that only needs recognizers."""
+    module = types.ModuleType("vosk")
+    module.__spec__ = importlib.machinery.ModuleSpec("vosk", None)
+    module.Model = lambda path: types.SimpleNamespace(path=path)
+    module.KaldiRecognizer = FakeRecognizer
+    monkeypatch.setitem(sys.modules, "vosk", module)
+    return module
+
+
+def _entry_point(name, tmp_path, monkeypatch):
+    """Import entry point `name` fresh: fake TTS, every cache and index under tmp_path."""
+    from content_index import ContentIndex
+    from doc_reader import DocumentReader
+    from file_index import FileIndex
+    from text_cache import TextCache
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models/vosk-model-small-en-us-0.15", exist_ok=True)
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    m = importlib.import_module(name)
+    home = tmp_path / "home"
+    home.mkdir(exist_ok=True)
+    m.ROOT_SEARCH_PATHS = [str(home)]
+    m.file_index = FileIndex([str(home)], str(tmp_path / "file_index.db"))
+    m.content_index = ContentIndex(str(tmp_path / "content_index.db"))
+    m.text_cache = TextCache(str(tmp_path / "text_cache.db"), extract=m.extraction_pool.stream)
+    m.reader = DocumentReader(m.text_cache, chunk_chars=m.READ_CHUNK_CHARS)
+    m.STARTUP_LOG = None
+    m.speech.cache = m.speech.player = None
+    m.speech.engine_factory = FakeEngine
+    m.opened = []
+    m.open_with_default = m.opened.append
+    return m
+
+
+def _close(m, monkeypatch):
+    m.audio_buf.close()
+    m.executor.shutdown()
+    m.speech.close()
+    m.extraction_pool.close()
+    monkeypatch.delitem(sys.modules, m.__name__, raising=False)
+
+
+@pytest.fixture
+def jarvis_vosk(fake_vosk, tmp_path, monkeypatch):
+    """A freshly imported jarvis_vosk: fake vosk and TTS, every cache and index under tmp_path."""
+    m = _entry_point("jarvis_vosk", tmp_path, monkeypatch)
+    yield m
+    _close(m, monkeypatch)
+
+
+@pytest.fixture
+def jarvis_vosk_openai(fake_vosk, tmp_path, monkeypatch):
+    """Like jarvis_vosk, with an empty LLM cache and no LLM until the test sets m.llm."""
+    from llm_cache import LLMCache
+
+    m = _entry_point("jarvis_vosk_openai", tmp_path, monkeypatch)
+    m.llm_cache = LLMCache(str(tmp_path / "llm_cache.db"))
+    m.llm = None
+    yield m
+    _close(m, monkeypatch)
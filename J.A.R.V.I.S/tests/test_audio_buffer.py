@@ -0,0 +1,100 @@
+import threading
+
+import numpy as np
+import pytest
+
+from audio_buffer import AudioRingBuffer
+
+RATE = 1000  # small rate, so capacities are a handful of samples
+
+
+def _samples(start, n):
+    return np.arange(start, start + n, dtype=np.int16)
+
+
+def _values(data):
+    return np.frombuffer(data, dtype=np.int16).tolist()
+
+
+def test_reads_wrap_around_the_ring():
+    ring = AudioRingBuffer(RATE, capacity_s=0.01)  # 10 samples
+    pos = 0
+    for block in (4, 4, 4, 7, 3):
+        ring.write(_samples(pos, block))
+        assert _values(ring.read(block)) == list(range(pos, pos + block))
+        pos += block
+    assert ring.position == pos
+    assert ring.dropped == 0
+    assert ring.max_depth == 7
+
+
+def test_write_accepts_raw_callback_buffers():
+    ring = AudioRingBuffer(RATE, capacity_s=0.01)
+    ring.write(_samples(0, 3).tobytes())
+    assert _values(ring.read(3)) == [0, 1, 2]
+
+
+def test_read_blocks_until_enough_audio_then_drains_after_close():
+    ring = AudioRingBuffer(RATE, capacity_s=1)
+    got = []
+    reader = threading.Thread(target=lambda: got.append(ring.read(5, timeout=5)))
+    reader.start()
+    ring.write(_samples(0, 2))
+    ring.write(_samples(2, 3))
+    reader.join(5)
+    assert _values(got[0]) == [0, 1, 2, 3, 4]
+    assert ring.read(5, timeout=0.01) == b""
+    ring.write(_samples(5, 2))
+    ring.close()
+    assert _values(ring.read(5)) == [5, 6]
+    assert ring.read(5) is None
+
+
+def test_latency_is_measured_per_batch():
+    ring = AudioRingBuffer(RATE, capacity_s=1)
+    for i in range(3):
+        ring.write(_samples(0, 10))
+        ring.read(10)
+    stats = ring.latency_stats()
+    assert stats["batches"] == 3
+    assert 0 <= stats["mean_ms"] <= stats["max_ms"] < 1000
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AudioRingBuffer(RATE, policy="drop_newest")
+
+
+def test_drop_oldest_counts_overruns():
+    ring = AudioRingBuffer(RATE, capacity_s=0.01)
+    ring.write(_samples(0, 8))
+    ring.write(_samples(8, 8))  # 6 unread samples overwritten
+    assert (ring.overruns, ring.dropped) == (1, 6)
+    assert _values(ring.read(10)) == list(range(6, 16))
+    ring.write(_samples(0, 25))  # bigger than the whole ring
+    assert ring.dropped == 6 + 15
+    assert _values(ring.read(10)) == list(range(15, 25))
+
+
+def test_drop_while_busy_discards_audio_captured_while_busy():
+    ring = AudioRingBuffer(RATE, capacity_s=1, policy="drop_while_busy")
+    ring.write(_samples(0, 3))
+    with ring.busy():
+        assert ring.is_busy()
+        ring.write(_samples(3, 5))
+    assert not ring.is_busy()
+    ring.write(_samples(8, 2))
+    assert _values(ring.read(5)) == [0, 1, 2, 8, 9]
+    assert ring.dropped == 5
+    ring = AudioRingBuffer(RATE, capacity_s=1)
+    with ring.busy():
+        ring.write(_samples(0, 3))  # other policies keep it
+    assert ring.available() == 3
+
+
+def test_skip_ahead_jumps_to_recent_audio():
+    ring = AudioRingBuffer(RATE, capacity_s=1, policy="skip_ahead", max_lag_s=0.01)
+    ring.write(_samples(0, 100))
+    assert _values(ring.read(5)) == list(range(90, 95))
+    assert ring.dropped == 90
+    assert ring.stats()["dropped_s"] == 0.09
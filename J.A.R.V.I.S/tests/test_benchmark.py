@@ -0,0 +1,44 @@
+import benchmark
+
+
+def test_timed_summary():
+    result = benchmark.timed(lambda: None, 5)
+    assert result["n"] == 5
+    assert "failed" not in result
+    assert result["p50_ms"] <= result["p95_ms"] <= result["max_ms"]
+
+
+def test_timed_keeps_failures_out_of_latency():
+    replies = iter(["Error reading file: No module named 'PyPDF2'", None, None])
+    result = benchmark.timed(lambda: None, 3, check=lambda: next(replies))
+    assert result["n"] == 2
+    assert result["failed"] == 1
+    assert result["error"].startswith("Error reading file")
+
+
+def test_timed_when_every_run_raises():
+    def boom():
+        raise ValueError("bad")
+    result = benchmark.timed(boom, 3)
+    assert result == {"n": 0, "failed": 3, "error": "ValueError: bad"}
+
+
+def test_error_replies():
+    for text in ["Error reading file: No module named 'PyPDF2'", "OpenAI fallback error: timeout",
+                 "I couldn't extract any text from that document.", "Sorry, that took too long. I stopped it.",
+                 "I couldn't find /home/me/notes.txt", "I can't read that type of file yet."]:
+        assert benchmark.ERROR_REPLY.search(text), text
+    for text in ["I couldn't find anything with that name.", "No results found.", "It is 10:30 AM",
+                 "I couldn't find or open budget", "I found 2 items. Opening first match."]:
+        assert not benchmark.ERROR_REPLY.search(text), text
+
+
+def test_stubs_report_error_replies_once():
+    module = type("M", (), {})()
+    stubs = benchmark._Stubs(module)
+    module.speak("I couldn't find anything with that name.")
+    assert stubs.error() is None
+    module.speak("Error reading file: broken")
+    module.speak_sentences(["Error in the document text is not a failure."])
+    assert stubs.error() == "Error reading file: broken"
+    assert stubs.error() is None
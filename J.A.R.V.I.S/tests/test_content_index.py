@@ -0,0 +1,52 @@
+import os
+
+from content_index import ContentIndex, files_from_index
+from file_index import FileIndex
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def test_build_is_incremental(tmp_path):
+    a = str(tmp_path / "a.txt")
+    b = str(tmp_path / "b.md")
+    _write(a, "quarterly budget review for the garden project")
+    _write(b, "notes about the kitchen")
+    index = ContentIndex(str(tmp_path / "content.db"))
+    assert index.build([a, b], workers=1) == (2, 0, 0)
+    assert index.build([a, b], workers=1) == (0, 0, 0)
+
+    _write(b, "notes about the garden shed")
+    os.utime(b, (1, 1))
+    assert index.build([a], workers=1) == (0, 1, 0)
+    assert index.build([a, b], workers=1) == (1, 0, 0)
+    assert [hit.path for hit in index.search("garden shed")] == [b]
+
+
+def test_search_ranks_offsets_and_snippets(tmp_path):
+    a = str(tmp_path / "a.txt")
+    b = str(tmp_path / "b.txt")
+    _write(a, "filler " * 300 + "the garden budget was approved " + "tail " * 300)
+    _write(b, "garden party")
+    index = ContentIndex(str(tmp_path / "content.db"))
+    index.build([a, b], workers=1)
+
+    hits = index.search("the garden budget")
+    assert [hit.path for hit in hits] == [a]  # every word must match before falling back to any word
+    assert hits[0].offset == len("filler " * 300) + len("the ")
+    assert "garden budget was approved" in hits[0].snippet
+    assert len(hits[0].snippet.split()) <= 26
+    assert {hit.path for hit in index.search("garden picnic")} == {a, b}
+    assert index.search("the of and") == []
+
+
+def test_files_come_from_the_filename_index(tmp_path):
+    root = tmp_path / "home"
+    _write(str(root / "doc.txt"), "x")
+    _write(str(root / "song.mp3"), "x")
+    db = str(tmp_path / "files.db")
+    FileIndex([str(root)], db_path=db).refresh()
+    assert files_from_index(db) == [str(root / "doc.txt")]
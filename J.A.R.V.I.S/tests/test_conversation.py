@@ -0,0 +1,74 @@
+import time
+
+from conversation import Conversation, estimate_tokens, is_follow_up
+
+
+def _talk(conv, turns, words=30):
+    for i in range(turns):
+        conv.add("user", f"Question number {i}. " + "more words here " * words)
+        conv.add("assistant", f"Answer number {i}. " + "some detail " * words)
+
+
+def test_history_stays_within_budget():
+    conv = Conversation(budget=300, summary_budget=80)
+    _talk(conv, 20)
+    stats = conv.stats()
+    assert stats["tokens"] <= 300 or stats["turns"] == 2
+    assert stats["summarized"] > 0
+    assert conv._summary_tokens <= 80
+
+
+def test_latest_exchange_is_kept_whole_and_history_starts_with_user():
+    conv = Conversation(budget=150, summary_budget=60)
+    _talk(conv, 10)
+    messages = conv.messages("You are JARVIS.", "and then?")
+    assert messages[0]["role"] == "system"
+    assert "Earlier in this conversation" in messages[0]["content"]
+    assert messages[1]["role"] == "user"
+    assert messages[-3]["content"].startswith("Question number 9.")
+    assert messages[-2]["content"].startswith("Answer number 9.")
+    assert messages[-1] == {"role": "user", "content": "and then?"}
+
+
+def test_notes_count_toward_the_budget_and_are_bounded():
+    conv = Conversation(budget=1000, notes=3)
+    for i in range(5):
+        conv.note(f"Opened file{i}.txt")
+    assert conv.stats()["notes"] == 3
+    assert conv.tokens() == sum(estimate_tokens(f"Opened file{i}.txt") for i in range(2, 5))
+    assert "- Opened file4.txt" in conv.messages("sys", "q")[0]["content"]
+
+
+def test_idle_reset_starts_over():
+    conv = Conversation(idle_reset=0.05)
+    _talk(conv, 1, words=1)
+    assert conv.has_history()
+    time.sleep(0.1)
+    assert conv.messages("sys", "hi") == [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+
+def test_follow_up_detection():
+    assert is_follow_up("and tomorrow?")
+    assert is_follow_up("open it")
+    assert not is_follow_up("what is the weather in paris")
+
+
+def test_follow_up_goes_to_the_model_with_the_earlier_turns(jarvis_vosk_openai):
+    m = jarvis_vosk_openai
+    seen = []
+
+    class Recording:
+        name, model = "fake", "test"
+
+        def stream(self, messages, cancelled=None):
+            seen.append(messages)
+            yield "Answer %d." % len(seen)
+    m.speak = lambda text, priority=None, coalesce=True: None
+    m.llm = Recording()
+    m.ask_openai("what is the capital of france")
+    m.ask_openai("and what about germany")
+    m.ask_openai("what is the capital of france")  # cached, even with history
+    assert len(seen) == 2
+    contents = [msg["content"] for msg in seen[1]]
+    assert "what is the capital of france" in contents and "Answer 1." in contents
+    assert contents[-1] == "and what about germany"
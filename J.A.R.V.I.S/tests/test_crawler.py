@@ -0,0 +1,42 @@
+import os
+
+from crawler import IgnoreRules, crawl, crawl_search
+
+
+def _tree(root, names):
+    for name in names:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+
+
+def test_crawl_empty_root_list_returns_at_once():
+    result = crawl([], lambda name: True)
+    assert result.paths == []
+    assert result.roots == {}
+
+
+def test_crawl_finds_matches_under_every_root(tmp_path):
+    roots = []
+    for i in range(20):
+        root = str(tmp_path / f"root{i}")
+        _tree(root, [f"a/b/match{i}.txt", "a/other.txt"])
+        roots.append(root)
+    for _ in range(20):  # the last root used to be lost now and then
+        result = crawl(roots, lambda name: name.startswith("match"))
+        assert sorted(os.path.basename(p) for p in result.paths) == sorted(f"match{i}.txt" for i in range(20))
+        assert all(st.dirs == 3 for st in result.roots.values())
+
+
+def test_crawl_survives_missing_root(tmp_path):
+    _tree(str(tmp_path / "real"), ["x/hit.txt"])
+    result = crawl([str(tmp_path / "missing"), str(tmp_path / "real")], lambda name: name == "hit.txt")
+    assert result.paths == [str(tmp_path / "real" / "x" / "hit.txt")]
+
+
+def test_crawl_stops_at_max_results_and_skips_ignored_dirs(tmp_path):
+    _tree(str(tmp_path), [f"d{i}/hit{i}.txt" for i in range(10)] + ["node_modules/hit.txt"])
+    assert len(crawl([str(tmp_path)], lambda name: name.startswith("hit"), max_results=3).paths) == 3
+    found = crawl_search([str(tmp_path)], "hit", None, ignore=IgnoreRules(["node_modules"])).paths
+    assert len(found) == 10
+    assert not any("node_modules" in p for p in found)
@@ -0,0 +1,69 @@
+from doc_reader import DocumentReader, split_page, split_sentences
+from text_cache import TextCache
+
+PAGES = [
+    "One. Two. Three. Four cut",
+    "across pages. Five. Six. Seven.",
+    "Eight. Nine. Ten.",
+]
+
+
+def _reader(tmp_path, pages=PAGES, **kwargs):
+    path = tmp_path / "doc.txt"
+    path.write_text("\n".join(pages))
+    extracted = []
+
+    def extract(p, start, count=None):
+        extracted.append(start)
+        yield from pages[start:start + count] if count else pages[start:]
+
+    cache = TextCache(str(tmp_path / "cache.db"), extract=extract)
+    return DocumentReader(cache, **kwargs), str(path), extracted
+
+
+def test_split_helpers():
+    assert split_sentences("Hi there.  How are\nyou?\n\nNew para") == ["Hi there.", "How are you?", "New para"]
+    assert split_page("One. Two cut") == (["One."], "Two cut")
+    assert split_page("One. Two.") == (["One.", "Two."], "")
+
+
+def test_reads_whole_document_joining_cut_sentences(tmp_path):
+    reader, path, _ = _reader(tmp_path)
+    assert list(reader.read(path)) == ["One.", "Two.", "Three.", "Four cut across pages.", "Five.", "Six.",
+                                       "Seven.", "Eight.", "Nine.", "Ten.", "End of document."]
+    assert reader.resume() is None
+
+
+def test_interrupted_sentence_is_read_again(tmp_path):
+    reader, path, _ = _reader(tmp_path)
+    sentences = reader.read(path)
+    assert [next(sentences), next(sentences)] == ["One.", "Two."]
+    sentences.close()  # "Two." was cut off by "stop"
+    assert next(reader.resume()) == "Two."
+
+
+def test_chunks_resume_where_they_stopped_without_re_extracting(tmp_path):
+    reader, path, extracted = _reader(tmp_path, chunk_chars=20)
+    assert list(reader.read(path)) == ["One.", "Two.", "Three.", "Four cut across pages."]
+    assert list(reader.resume()) == ["Five.", "Six.", "Seven.", "Eight."]
+    assert extracted == [0, 2]  # pages 0 and 1 came from one extractor, then from the cache
+
+
+def test_skip_crosses_page_boundaries(tmp_path):
+    reader, path, _ = _reader(tmp_path, skip_sentences=5)
+    sentences = reader.read(path)
+    next(sentences)
+    sentences.close()
+    # from "One." five sentences ahead is "Six.", on the second page
+    assert next(reader.skip()) == "Six."
+    reader.skip_sentences = 10
+    assert list(reader.skip()) == ["End of document."]
+
+
+def test_next_page(tmp_path):
+    reader, path, _ = _reader(tmp_path)
+    sentences = reader.read(path)
+    next(sentences), next(sentences)
+    sentences.close()
+    assert list(reader.next_page()) == ["Four cut across pages.", "Five.", "Six.", "Seven.", "Eight.", "Nine.",
+                                        "Ten.", "End of document."]
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from executor import HIGH, LOW, CommandExecutor
+
+
+def test_jobs_run_most_urgent_first():
+    ex = CommandExecutor(workers=1)
+    gate = threading.Event()
+    order = []
+    ex.submit(gate.wait, 5)
+    jobs = [ex.submit(order.append, name, priority=p) for name, p in [("low", LOW), ("high", HIGH)]]
+    gate.set()
+    assert all(job.wait(5) for job in jobs)
+    assert order == ["high", "low"]
+    ex.shutdown()
+
+
+def test_cancel_while_queued_finishes_the_job():
+    ex = CommandExecutor(workers=1)
+    gate = threading.Event()
+    blocker = ex.submit(gate.wait, 5)
+    queued = ex.submit(lambda: "ran")
+    queued.cancel()
+    gate.set()
+    assert queued.wait(5)
+    assert (queued.state, queued.result) == ("cancelled", None)
+    assert blocker.wait(5) and blocker.state == "done"
+    assert ex.wait_idle(5)
+    ex.shutdown()
+
+
+def test_cancel_running_job_through_its_token():
+    ex = CommandExecutor(workers=1)
+    started = threading.Event()
+
+    def handler():
+        token = ex.current_token()
+        started.set()
+        while not token.wait(0.01):
+            pass
+        token.check()
+
+    job = ex.submit(handler)
+    assert started.wait(5)
+    assert ex.cancel_all() == 1
+    assert job.wait(5) and job.state == "cancelled"
+    ex.shutdown()
+
+
+def test_preempt_cancels_queued_and_running_jobs():
+    ex = CommandExecutor(workers=1)
+    running = ex.submit(lambda: ex.current_token().wait(5) and ex.current_token().check())
+    queued = ex.submit(lambda: None)
+    time.sleep(0.05)
+    stop = ex.submit(lambda: "stopped", preempt=True)
+    assert stop.wait(5) and stop.result == "stopped"
+    assert (running.state, queued.state) == ("cancelled", "cancelled")
+    ex.shutdown()
+
+
+def test_stuck_job_times_out_and_its_worker_is_replaced():
+    timed_out = []
+    ex = CommandExecutor(workers=1, on_timeout=timed_out.append)
+    release = threading.Event()
+    stuck = ex.submit(release.wait, 5, timeout=0.2)  # ignores its token
+    after = ex.submit(lambda: "next")
+    assert after.wait(3) and after.result == "next"
+    assert timed_out == [stuck]
+    release.set()
+    assert stuck.wait(5) and stuck.state == "timed_out"
+    assert ex.stats()["timed_out"] == 1
+    ex.shutdown()
+
+
+def test_failed_job_keeps_its_error():
+    ex = CommandExecutor(workers=1)
+    job = ex.submit(lambda: 1 / 0)
+    assert job.wait(5) and job.state == "failed"
+    assert isinstance(job.error, ZeroDivisionError)
+    ex.shutdown()
+
+
+def test_running_command_keeps_the_microphone_open(jarvis_vosk):
+    jarvis_vosk.audio_buf.policy = "drop_while_busy"
+    gate = threading.Event()
+    jarvis_vosk.handle_command = lambda text: gate.wait(5)
+    job = jarvis_vosk.submit_command("read a long book")
+    while job.state == "queued":
+        time.sleep(0.001)
+    jarvis_vosk.audio_callback(b"\x10" * 3200, 1600, None, None)
+    assert jarvis_vosk.audio_buf.dropped == 0
+    assert jarvis_vosk.audio_buf.available() == 1600
+    gate.set()
+    assert job.wait(5)
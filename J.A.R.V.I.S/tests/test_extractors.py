@@ -0,0 +1,107 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+import extractors
+from extractors import PAGE_CHARS, ExtractionError, ExtractionPool, ExtractionTimeout, extract_pages, extract_text
+from text_cache import TextCache
+
+
+def _document(tmp_path, pages=3):
+    path = tmp_path / "notes.txt"
+    path.write_text(" ".join(["word"] * (PAGE_CHARS * pages // 5)))
+    return str(path)
+
+
+def test_text_pages_end_on_whitespace(tmp_path):
+    pages = list(extract_pages(_document(tmp_path)))
+    assert len(pages) == 3
+    assert all(p.split()[-1] == "word" for p in pages)
+    assert list(extract_pages(_document(tmp_path), start=2)) == pages[2:]
+    assert len(list(extract_pages(_document(tmp_path), count=1))) == 1
+
+
+def test_builtin_formats(tmp_path):
+    docx = tmp_path / "a.docx"
+    with zipfile.ZipFile(docx, "w") as z:
+        z.writestr("word/document.xml",
+                   '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                   "<w:body><w:p><w:r><w:t>Hello docx</w:t></w:r></w:p></w:body></w:document>")
+    html = tmp_path / "a.html"
+    html.write_text("<html><head><script>skip()</script></head><body><p>Hello html</p></body></html>")
+    data = tmp_path / "a.json"
+    data.write_text(json.dumps({"name": "Ada", "tags": ["x"]}))
+    assert "Hello docx" in extract_text(str(docx))
+    assert extract_text(str(html)).strip() == "Hello html"
+    assert extract_text(str(data)) == "name: Ada\ntags: x"
+    with pytest.raises(ValueError):
+        extract_text(str(tmp_path / "a.xyz"))
+
+
+def test_plugins_register_new_suffixes(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractors, "EXTRACTORS", dict(extractors.EXTRACTORS))
+    monkeypatch.setattr(extractors, "SUPPORTED_SUFFIXES", set(extractors.SUPPORTED_SUFFIXES))
+    (tmp_path / "shout.py").write_text(
+        "from extractors import register\n\n"
+        "@register('.shout')\n"
+        "def _pages(path, start):\n"
+        "    yield open(path).read().upper()\n")
+    (tmp_path / "broken.py").write_text("raise ImportError('nope')\n")
+    extractors.load_plugins(str(tmp_path))
+    doc = tmp_path / "a.shout"
+    doc.write_text("hi")
+    assert ".shout" in extractors.SUPPORTED_SUFFIXES
+    assert extract_text(str(doc)) == "HI"
+
+
+def test_pool_reports_errors_and_keeps_the_worker(tmp_path):
+    pool = ExtractionPool(max_workers=1, timeout=20)
+    try:
+        with pytest.raises(ExtractionError):
+            pool.extract_text(str(tmp_path / "missing.txt"))
+        assert "word" in pool.extract_text(_document(tmp_path), max_chars=100)
+        assert pool.killed == 0
+    finally:
+        pool.close()
+
+
+def test_text_cache_page_reuses_extraction_workers(tmp_path):
+    path = _document(tmp_path)
+    pool = ExtractionPool(max_workers=1, timeout=20)
+    try:
+        cache = TextCache(str(tmp_path / "cache.db"), extract=pool.stream)
+        pages = [cache.page(path, i) for i in range(4)]
+        assert all(pages[:3]) and pages[3] is None
+        assert pool.killed == 0
+        assert len(pool._idle) == 1
+    finally:
+        pool.close()
+
+
+def test_abandoned_stream_kills_its_worker(tmp_path):
+    path = _document(tmp_path)
+    pool = ExtractionPool(max_workers=1, timeout=20)
+    try:
+        stream = pool.stream(path)
+        next(stream)
+        stream.close()
+        assert pool.killed == 1
+        assert "word" in pool.extract_text(path, max_chars=100)
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs a named pipe to block the worker")
+def test_stuck_worker_times_out_and_is_killed(tmp_path):
+    stuck = tmp_path / "stuck.txt"
+    os.mkfifo(stuck)  # opening it for reading blocks until someone writes
+    pool = ExtractionPool(max_workers=1, timeout=0.5)
+    try:
+        with pytest.raises(ExtractionTimeout):
+            pool.extract_text(str(stuck))
+        assert pool.killed == 1
+        assert "word" in pool.extract_text(_document(tmp_path), max_chars=100)
+    finally:
+        pool.close()
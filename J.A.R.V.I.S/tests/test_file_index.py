@@ -0,0 +1,69 @@
+import os
+
+from file_index import FileIndex
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write("x")
+
+
+def test_refresh_builds_then_only_rescans_changed_dirs(tmp_path):
+    root = tmp_path / "home"
+    _touch(str(root / "docs" / "Resume.pdf"))
+    _touch(str(root / "music" / "song.mp3"))
+    index = FileIndex([str(root)], db_path=str(tmp_path / "index.db"))
+    assert index.refresh() == 3
+    assert index.ready
+    assert index.refresh() == 0
+
+    _touch(str(root / "docs" / "budget_2023.csv"))
+    assert index.refresh() == 1
+    assert index.search("budget") == [str(root / "docs" / "budget_2023.csv")]
+
+
+def test_removed_files_and_dirs_leave_the_index(tmp_path):
+    root = tmp_path / "home"
+    _touch(str(root / "old" / "notes.txt"))
+    index = FileIndex([str(root)], db_path=str(tmp_path / "index.db"))
+    index.refresh()
+    assert index.search("notes") == [str(root / "old" / "notes.txt")]
+
+    os.remove(root / "old" / "notes.txt")
+    os.rmdir(root / "old")
+    index.refresh()
+    assert index.search("notes", fuzzy=False) == []
+    assert index.search("notes") == []
+
+
+def test_search_is_case_insensitive_and_escapes_like_wildcards(tmp_path):
+    root = tmp_path / "home"
+    _touch(str(root / "Report_final.docx"))
+    _touch(str(root / "Reportxfinal.docx"))
+    index = FileIndex([str(root)], db_path=str(tmp_path / "index.db"))
+    index.refresh()
+    assert index.search("REPORT_FINAL", fuzzy=False) == [str(root / "Report_final.docx")]
+
+
+def test_search_falls_back_to_fuzzy_matches(tmp_path):
+    root = tmp_path / "home"
+    _touch(str(root / "Resume.pdf"))
+    index = FileIndex([str(root)], db_path=str(tmp_path / "index.db"))
+    index.refresh()
+    assert index.search("resume p d f") == [str(root / "Resume.pdf")]
+
+
+def test_load_survives_restart_and_cold_search_crawls(tmp_path):
+    root = tmp_path / "home"
+    _touch(str(root / "a" / "plan.txt"))
+    db = str(tmp_path / "index.db")
+    cold = FileIndex([str(root)], db_path=db)
+    assert not cold.load()
+    assert cold.search("plan") == [str(root / "a" / "plan.txt")]  # answered by walking
+    cold.refresh()
+
+    warm = FileIndex([str(root)], db_path=db)
+    assert warm.load()
+    assert warm.search("plan") == [str(root / "a" / "plan.txt")]
+    assert not FileIndex([str(tmp_path)], db_path=db).load()  # other roots: rebuild
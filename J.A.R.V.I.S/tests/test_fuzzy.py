@@ -0,0 +1,27 @@
+from fuzzy import TrigramIndex, normalize_name, normalize_query
+
+
+def test_normalize_spoken_queries():
+    assert normalize_name("Resume (1).PDF") == "resume1pdf"
+    assert normalize_query("resume dot p d f") == "resumepdf"
+    assert normalize_query("my budget text") == "budgettxt"
+
+
+def test_query_ranks_close_names_first():
+    index = TrigramIndex()
+    for path in ["/d/Resume.pdf", "/d/resume_old.docx", "/d/recipes.txt"]:
+        index.add(path)
+    results = [path for _, path in index.query("resume p d f")]
+    assert results[0] == "/d/Resume.pdf"
+    assert "/d/recipes.txt" not in results
+
+
+def test_removed_entries_are_not_returned_after_compaction():
+    index = TrigramIndex()
+    for i in range(2000):
+        index.add(f"/d/file{i}.txt")
+    for i in range(1500):
+        index.remove(f"/d/file{i}.txt")
+    assert len(index) == 500
+    assert not index.dead or len(index.dead) <= 1000
+    assert all(int(p[7:-4]) >= 1500 for _, p in index.query("file 17", limit=50))
@@ -0,0 +1,88 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+from intents import IntentRouter, clean_target
+
+ENTRY_POINTS = ["jarvis", "jarvis_vosk", "jarvis_vosk_openai"]
+
+
+@pytest.fixture(params=ENTRY_POINTS)
+def entry_point(request, fake_vosk, tmp_path, monkeypatch):
+    """Each entry point imported fresh, only to look at its router."""
+    if request.param == "jarvis":
+        pytest.importorskip("speech_recognition")
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models/vosk-model-small-en-us-0.15")
+    monkeypatch.delitem(sys.modules, request.param, raising=False)
+    m = importlib.import_module(request.param)
+    yield m
+    for name in ("audio_buf", "executor", "speech", "extraction_pool"):
+        resource = getattr(m, name, None)
+        if resource is not None:
+            (resource.shutdown if name == "executor" else resource.close)()
+    monkeypatch.delitem(sys.modules, request.param, raising=False)
+
+
+def test_slots_are_captured_and_cleaned():
+    router = IntentRouter()
+    router.add("open", r"open (?P<target>.+)", None, slots={"target": clean_target})
+    router.add("search", [r"(?:search|look) for (?P<target>.+)", r"find (?P<target>.+)"], None)
+    match = router.dispatch("Open the Budget file.")
+    assert (match.name, match.slots) == ("open", {"target": "budget"})
+    match = router.dispatch("look for annual report")
+    assert (match.name, match.slots) == ("search", {"target": "annual report"})
+    assert router.dispatch("find  my notes").slots == {"target": "my notes"}
+
+
+def test_first_match_wins_by_priority_then_specificity():
+    router = IntentRouter()
+    router.add("anything", r"(?P<text>.+)", None, priority=-1)
+    router.add("read", r"read (?P<target>.+)", None)
+    router.add("read_file", r"read file (?P<target>.+)", None)
+    router.add("stop", r"stop", None, priority=1)
+    router.add("stop_reading", r"stop(?: reading)?", None)
+    assert router.dispatch("read file notes").name == "read_file"
+    assert router.dispatch("read notes").name == "read"
+    assert router.dispatch("stop").name == "stop"
+    assert router.dispatch("stop reading").name == "stop_reading"
+    assert router.dispatch("hello there").name == "anything"
+
+
+def test_no_match_is_none():
+    router = IntentRouter()
+    router.add("open", r"open (?P<target>.+)", None)
+    assert router.dispatch("reopen notes") is None
+    assert router.dispatch("open") is None
+    assert router.dispatch("") is None
+
+
+@pytest.mark.parametrize("text, name, slots", [
+    ("open budget 2023", "open", {"target": "budget 2023"}),
+    ("open the time sheet", "open", {"target": "time sheet"}),
+    ("search for annual report", "search", {"target": "annual report"}),
+    ("read file project notes", "read", {"target": "project notes"}),
+    ("what time is it", "time", {}),
+    ("what's the time", "time", {}),
+    ("tell me the time", "time", {}),
+    ("shut down", "shutdown", {}),
+    ("jarvis goodbye", "shutdown", {}),
+])
+def test_entry_point_intents(entry_point, text, name, slots):
+    match = entry_point.router.dispatch(text)
+    assert (match.name, match.slots) == (name, slots)
+
+
+@pytest.mark.parametrize("text", ["what is the time complexity of quicksort", "how much time does a backup take",
+                                  "how do I shut down my laptop", "goodbye yellow brick road"])
+def test_questions_are_not_commands(entry_point, text):
+    assert entry_point.router.dispatch(text) is None
+
+
+def test_unknown_command_gets_help(jarvis_vosk):
+    said = []
+    jarvis_vosk.speak = said.append
+    jarvis_vosk.handle_command("what is the time complexity of quicksort")
+    assert said == [jarvis_vosk.HELP_TEXT]
@@ -0,0 +1,165 @@
+import os
+import socket
+import stat
+import types
+
+import pytest
+
+import jarvis_daemon
+from conftest import silence, speech
+from executor import CommandExecutor
+from jarvis_client import JarvisClient, read_token
+
+
+class _Stats:
+    def stats(self):
+        return {}
+
+    def summary(self):
+        return {}
+
+
+def _fake_module(model=None):
+    """The parts of jarvis_vosk the daemon uses; commands just speak back what they were given."""
+    m = types.SimpleNamespace(__name__="fake_jarvis", HANDLER_TIMEOUT=5, WAKE_WORD="jarvis", SAMPLE_RATE=16000,
+                              startup=_Stats(), speech=_Stats(), vad=_Stats(), audio_buf=_Stats(), spoken=[])
+    m.executor = CommandExecutor(workers=1)
+    m.loader = types.SimpleNamespace(model=model, wait_ready=lambda timeout=None: True)
+    m.speak = lambda text, *args, **kwargs: m.spoken.append(text)
+    m.speak_sentences = lambda sentences: m.spoken.extend(sentences)
+    m.submit_command = lambda text, trace=0: m.executor.submit(lambda: m.speak(f"you said {text}"), name=text)
+    return m
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """(daemon, client factory) over TCP on a free port, token in tmp_path."""
+    token_path = str(tmp_path / "daemon.token")
+    module = _fake_module(model=object())
+    d = jarvis_daemon.JarvisDaemon(module, mic=False, token=jarvis_daemon.ensure_token(token_path))
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = jarvis_daemon.serve(d, port=port, token_path=token_path)
+    yield d, lambda: JarvisClient(port=port, token_path=token_path, timeout=10)
+    server.shutdown()
+    server.server_close()
+    module.executor.shutdown()
+
+
+def _raw(client, data):
+    with socket.create_connection((client.host, client.port), timeout=10) as s:
+        s.sendall(data)
+        chunks = []
+        while True:
+            chunk = s.recv(4096)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def test_token_file_is_private_and_reused(tmp_path):
+    path = str(tmp_path / "sub" / "daemon.token")
+    token = jarvis_daemon.ensure_token(path)
+    assert read_token(path) == token
+    assert jarvis_daemon.ensure_token(path) == token
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_command_reply_lists_what_jarvis_said(daemon):
+    d, client = daemon
+    with client() as c:
+        reply = c.command("what time is it", speak=False)
+        assert reply == {"ok": True, "state": "done", "replies": ["you said what time is it"], "error": None}
+        assert c.command("   ")["ok"] is False
+        assert c.request({"op": "bogus"})["error"] == "unknown op 'bogus'"
+    assert d.m.spoken == []  # speak=False: printed, not spoken aloud
+
+
+def test_status_and_ping(daemon):
+    d, client = daemon
+    with client() as c:
+        assert c.request({"op": "ping"}) == {"ok": True, "ready": True}
+        status = c.status()
+    assert status["ok"] and status["script"] == "fake_jarvis"
+    assert status["daemon"]["connections"] == 1
+
+
+def test_audio_is_recognized_and_run(daemon, fake_vosk):
+    d, client = daemon
+    pcm = silence(200) + speech("jarvis bye", 300) + silence(500)
+    with client() as c:
+        reply = c.send_audio(pcm, 16000, speak=False, chunk_ms=250)
+    assert reply["ok"] and reply["text"] == "bye"
+    assert reply["replies"] == ["you said bye"]
+    assert d.counts["audio_commands"] == 1
+
+
+def test_requests_without_the_token_are_refused(daemon):
+    d, client = daemon
+    c = client()
+    reply = _raw(c, b'{"op": "command", "text": "open calculator"}\n{"op": "ping"}\n')
+    assert reply == b'{"ok": false, "error": "missing or wrong token"}\n'
+    reply = _raw(c, b'{"op": "ping", "token": "guess"}\n')
+    assert b"wrong token" in reply
+    assert d.m.spoken == [] and d.counts["commands"] == 0
+
+
+def test_http_request_from_a_browser_is_disconnected(daemon):
+    d, client = daemon
+    c = client()
+    body = b'{"op": "command", "text": "open calculator", "token": "x"}\n'
+    request = (b"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/plain\r\n"
+               b"Content-Length: %d\r\n\r\n" % len(body)) + body
+    assert _raw(c, request) == b'{"ok": false, "error": "bad request"}\n'
+    assert _raw(c, b"[1, 2]\n") == b'{"ok": false, "error": "bad request"}\n'
+    assert _raw(c, b"{not json\n") == b'{"ok": false, "error": "bad request: not JSON"}\n'
+    assert d.counts["refused"] == 3 and d.counts["commands"] == 0
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+def test_unix_socket_replaces_stale_file_but_not_a_live_daemon(tmp_path):
+    token_path = str(tmp_path / "daemon.token")
+    sock_path = str(tmp_path / "jarvis.sock")
+    open(sock_path, "w").close()  # left over by a daemon that crashed
+    module = _fake_module()
+    d = jarvis_daemon.JarvisDaemon(module, mic=False, token=jarvis_daemon.ensure_token(token_path))
+    server = jarvis_daemon.serve(d, sock_path, token_path=token_path)
+    try:
+        assert stat.S_IMODE(os.stat(sock_path).st_mode) == 0o600
+        with JarvisClient(sock_path, token_path=token_path, timeout=10) as c:
+            assert c.request({"op": "ping"})["ok"]
+        with pytest.raises(RuntimeError):
+            jarvis_daemon.serve(d, sock_path, token_path=token_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        module.executor.shutdown()
+
+
+@pytest.fixture
+def real_daemon(jarvis_vosk, tmp_path):
+    """JarvisDaemon around a real jarvis_vosk, with one document to read."""
+    (tmp_path / "home" / "project_notes.txt").write_text("First sentence. Second sentence.\n\nThird one.")
+    jarvis_vosk.file_index.refresh()
+    d = jarvis_daemon.JarvisDaemon(jarvis_vosk, mic=False, token=jarvis_daemon.ensure_token(str(tmp_path / "t")))
+    return d
+
+
+def test_quiet_read_returns_the_text_instead_of_reading_it_aloud(real_daemon):
+    reply = real_daemon.command("read project notes", speak=False)
+    assert reply["state"] == "done" and reply["error"] is None
+    assert reply["replies"] == ["First sentence.", "Second sentence.", "Third one.", "End of document."]
+    assert real_daemon.m.reading_job is None
+    assert real_daemon.m.speech.stats()["spoken"] == 0
+    assert real_daemon.command("continue", speak=False)["replies"] == ["I'm not reading anything right now."]
+
+
+def test_read_aloud_still_goes_to_the_speaker(real_daemon):
+    m = real_daemon.m
+    reply = real_daemon.command("read project notes")
+    assert reply["state"] == "done"
+    assert m.reading_job is not None and m.reading_job.wait(5)
+    assert m.speech.wait_idle(5)
+    assert m.speech.stats()["spoken"] == 4  # three sentences, then "End of document."
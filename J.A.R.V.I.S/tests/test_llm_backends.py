@@ -0,0 +1,151 @@
+import pytest
+
+from llm_backends import (Backend, LLMError, LlamaServerBackend, MockBackend, OpenAICompatibleBackend,
+                          RetryableError, chat_prompt, make_backend, mock_answer)
+
+MESSAGES = [{"role": "system", "content": "You are JARVIS."}, {"role": "user", "content": "capital of france"}]
+ANSWERS = {"capital of france": "Paris. It is in France."}
+
+
+class Flaky(Backend):
+    """Fails with RetryableError `failures` times, optionally after yielding some fragments."""
+
+    name = "flaky"
+
+    def __init__(self, failures, fragments_before_failure=0, **kwargs):
+        super().__init__("flaky", backoff=0, **kwargs)
+        self.failures = failures
+        self.fragments_before_failure = fragments_before_failure
+        self.opened = 0
+
+    def _open(self, messages):
+        self.opened += 1
+        if self.opened <= self.failures:
+            for i in range(self.fragments_before_failure):
+                yield f"part{i} "
+            raise RetryableError("HTTP 503")
+        yield "Paris. "
+        yield "It is in France."
+
+
+def test_make_backend_selection():
+    assert make_backend("openai", "gpt-4o-mini") is None  # hosted API without a key
+    backend = make_backend("openai", "gpt-4o-mini", api_key="sk-test")
+    assert isinstance(backend, OpenAICompatibleBackend) and backend.base_url == "https://api.openai.com/v1"
+    local = make_backend("openai", "stub", base_url="http://127.0.0.1:8089/v1/")
+    assert local.base_url == "http://127.0.0.1:8089/v1"
+    assert isinstance(make_backend("llama", "local"), LlamaServerBackend)
+    mock = make_backend("mock", "mock", connect_timeout=1, read_timeout=1, max_concurrency=3)
+    assert isinstance(mock, MockBackend) and mock.max_concurrency == 3
+    with pytest.raises(ValueError):
+        make_backend("gemini", "x")
+
+
+def test_transient_failures_are_retried_before_the_first_fragment():
+    backend = Flaky(failures=2, retries=2)
+    assert backend.complete(MESSAGES) == "Paris. It is in France."
+    assert backend.counts == {"requests": 1, "errors": 0, "retries": 2, "cancelled": 0}
+
+
+def test_retries_give_up():
+    backend = Flaky(failures=3, retries=2)
+    with pytest.raises(LLMError, match="flaky: HTTP 503"):
+        backend.complete(MESSAGES)
+    assert (backend.opened, backend.counts["errors"]) == (3, 1)
+
+
+def test_no_retry_once_something_was_yielded():
+    backend = Flaky(failures=1, fragments_before_failure=1, retries=5)
+    got = []
+    with pytest.raises(LLMError):
+        for fragment in backend.stream(MESSAGES):
+            got.append(fragment)
+    assert got == ["part0 "]
+    assert backend.opened == 1 and backend.counts["retries"] == 0
+
+
+def test_cancelled_stream_stops():
+    backend = Flaky(failures=0)
+    got = list(backend.stream(MESSAGES, cancelled=lambda: True))
+    assert got == ["Paris. "]
+    assert backend.counts["cancelled"] == 1
+
+
+def test_concurrency_limit():
+    backend = MockBackend(max_concurrency=1, queue_timeout=0.05)
+    held = backend.stream(MESSAGES)
+    next(held)
+    with pytest.raises(LLMError, match="too many requests"):
+        backend.complete(MESSAGES)
+    held.close()  # releases the slot
+    assert backend.complete(MESSAGES)
+    assert backend.counts["errors"] == 1
+
+
+def test_mock_answers():
+    assert mock_answer("What's the capital?") == mock_answer("whats the capital")
+    backend = MockBackend(answers=ANSWERS)
+    assert backend.complete(MESSAGES) == "Paris. It is in France."
+    stats = backend.stats()
+    assert stats["requests"] == 1 and stats["ttft_ms"]["p50"] is not None
+
+
+def test_chat_prompt():
+    assert chat_prompt(MESSAGES) == "System: You are JARVIS.\nUser: capital of france\nAssistant:"
+
+
+@pytest.fixture
+def stub_server():
+    pytest.importorskip("httpx")
+    from llm_stub_server import serve
+    servers = []
+
+    def _start(**options):
+        servers.append(serve(port=0, answers=ANSWERS, **options))
+        return f"http://127.0.0.1:{servers[-1].server_address[1]}"
+    yield _start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("kind, suffix", [("openai", "/v1"), ("llama", "")])
+def test_streams_from_the_stub_server(stub_server, kind, suffix):
+    backend = make_backend(kind, "stub", base_url=stub_server() + suffix)
+    try:
+        fragments = list(backend.stream(MESSAGES))
+        assert len(fragments) > 1
+        assert "".join(fragments) == "Paris. It is in France."
+        assert backend.complete(MESSAGES) == "Paris. It is in France."  # over the kept-alive connection
+    finally:
+        backend.close()
+
+
+def test_server_errors_are_retried_then_reported(stub_server):
+    backend = make_backend("openai", "stub", base_url=stub_server(error_rate=1.0) + "/v1", retries=2, backoff=0)
+    try:
+        with pytest.raises(LLMError, match="HTTP 503"):
+            backend.complete(MESSAGES)
+        assert backend.counts["retries"] == 2
+    finally:
+        backend.close()
+
+
+def test_client_errors_are_not_retried(stub_server):
+    backend = make_backend("openai", "stub", base_url=stub_server() + "/v2", retries=2, backoff=0)
+    try:
+        with pytest.raises(LLMError, match="HTTP 404"):
+            backend.complete(MESSAGES)
+        assert backend.counts["retries"] == 0
+    finally:
+        backend.close()
+
+
+def test_connection_refused_is_retried():
+    backend = make_backend("llama", "local", base_url="http://127.0.0.1:9", retries=1, backoff=0)
+    try:
+        with pytest.raises(LLMError):
+            backend.complete(MESSAGES)
+        assert backend.counts["retries"] == 1
+    finally:
+        backend.close()
@@ -0,0 +1,91 @@
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, normalize_prompt
+
+MODEL, SYSTEM = "openai:gpt-4o-mini", "You are JARVIS."
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("Jarvis, what's the capital of France?") == "what is the capital of france"
+    assert normalize_prompt("  whats   the capital of france ") == "what is the capital of france"
+
+
+def test_same_question_worded_differently_hits(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    assert cache.get(MODEL, SYSTEM, "What's the capital of France?") is None
+    cache.put(MODEL, SYSTEM, "What's the capital of France?", "Paris.")
+    assert cache.get(MODEL, SYSTEM, "whats the capital of france") == "Paris."
+    assert cache.get("llama:local", SYSTEM, "whats the capital of france") is None
+    assert cache.get(MODEL, "Be brief.", "whats the capital of france") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 3)
+
+
+def test_answers_survive_a_restart(tmp_path):
+    LLMCache(str(tmp_path / "llm.db")).put(MODEL, SYSTEM, "tell me a joke", "No.")
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    assert cache.get(MODEL, SYSTEM, "tell me a joke") == "No."
+    assert cache.stats()["bytes"] == 3
+
+
+def test_expired_answers_are_dropped(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.db"), ttl=60)
+    cache.put(MODEL, SYSTEM, "tell me a joke", "No.")
+    clock[0] += 59
+    assert cache.get(MODEL, SYSTEM, "tell me a joke") == "No."
+    clock[0] += 2
+    assert cache.get(MODEL, SYSTEM, "tell me a joke") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_no_ttl_keeps_answers(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.db"), ttl=None)
+    cache.put(MODEL, SYSTEM, "tell me a joke", "No.")
+    clock[0] += 10 ** 9
+    assert cache.get(MODEL, SYSTEM, "tell me a joke") == "No."
+
+
+def test_least_recently_used_is_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.db"), max_bytes=20)
+    for i, q in enumerate(["one", "two", "three"]):
+        clock[0] += 1
+        cache.put(MODEL, SYSTEM, q, f"answer {i}.")  # 10 bytes each
+    assert cache.get(MODEL, SYSTEM, "one") is None
+    clock[0] += 1
+    assert cache.get(MODEL, SYSTEM, "two") == "answer 1."
+    clock[0] += 1
+    cache.put(MODEL, SYSTEM, "four", "answer 3.")
+    assert cache.get(MODEL, SYSTEM, "three") is None
+    assert cache.get(MODEL, SYSTEM, "two") == "answer 1."
+    assert cache.stats()["bytes"] <= 20
+
+
+def test_replacing_an_answer_keeps_the_size_right(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    cache.put(MODEL, SYSTEM, "q", "short.")
+    cache.put(MODEL, SYSTEM, "q", "a bit longer.")
+    assert cache.stats()["bytes"] == len("a bit longer.")
+
+
+def test_empty_or_huge_answers_are_not_stored(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"), max_bytes=10)
+    cache.put(MODEL, SYSTEM, "q", "")
+    cache.put(MODEL, SYSTEM, "r", "x" * 11)
+    assert cache.stats()["entries"] == 0
+
+
+def test_time_sensitive_questions_bypass_the_cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    assert not cache.cacheable("What's the weather like today?")
+    assert not cache.cacheable("latest news please")
+    assert cache.cacheable("what is the capital of france")
+    assert cache.stats()["bypassed"] == 2
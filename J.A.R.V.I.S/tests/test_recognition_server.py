@@ -0,0 +1,147 @@
+import base64
+import json
+import socket
+import threading
+
+import pytest
+
+import recognition_server
+from conftest import silence, speech
+from recognition_server import AdmissionError, RecognitionServer
+
+CHUNK = silence(200)  # 200 ms at 16 kHz: one worker turn
+
+
+@pytest.fixture
+def server(fake_vosk):
+    rs = RecognitionServer(model=object(), workers=2, max_sessions=2, vad=False)
+    yield rs
+    rs.shutdown()
+
+
+def test_sessions_are_transcribed_independently(server):
+    a, b = server.open(), server.open()
+    server.feed(a, speech("hello", 200))
+    server.feed(b, speech("bye", 200))
+    server.feed(a, CHUNK)
+    server.feed(a, speech("again", 200))
+    assert server.close(a, timeout=5) == [("final", "hello"), ("final", "again")]
+    assert server.close(b, timeout=5) == [("final", "bye")]
+    stats = server.stats()
+    assert (stats["opened"], stats["closed"], stats["sessions"]) == (2, 2, 0)
+
+
+def test_admission_control(server):
+    server.open(), server.open()
+    with pytest.raises(AdmissionError):
+        server.open()
+    assert server.stats()["rejected"] == 1
+
+
+def test_bad_audio_is_rejected(server):
+    for rate in (0, -8000, "16000", True, 16000.0):
+        with pytest.raises(ValueError):
+            server.open(sample_rate=rate)
+    session = server.open()
+    with pytest.raises(ValueError):
+        server.feed(session, b"\x00\x00\x00")
+
+
+def test_full_queue_drops_oldest_audio(fake_vosk):
+    gate = threading.Event()
+    model = type("Model", (), {"fail": staticmethod(lambda data: not gate.wait(5))})()
+    rs = RecognitionServer(model=model, workers=1, max_queue_s=0.5, vad=False)
+    session = rs.open()
+    for _ in range(10):  # 2 s of audio while the only worker is stuck on the first chunk
+        rs.feed(session, CHUNK)
+    assert session.queued <= session.max_queue
+    gate.set()
+    rs.close(session, timeout=5)
+    assert rs.stats()["dropped_s"] >= 1.2
+    rs.shutdown()
+
+
+def test_shut_down_server_refuses_sessions(fake_vosk):
+    rs = RecognitionServer(model=object(), workers=1, vad=False)
+    rs.shutdown()
+    with pytest.raises(AdmissionError):
+        rs.open()
+
+
+def test_decode_error_is_reported_and_workers_survive(fake_vosk):
+    model = type("Model", (), {"fail": staticmethod(lambda data: data[:1] == b"\xff")})()
+    rs = RecognitionServer(model=model, workers=1, vad=False)
+    bad, good = rs.open(), rs.open()
+    rs.feed(bad, b"\xff\x00" * 3200)
+    rs.feed(bad, CHUNK)
+    assert rs.close(bad, timeout=5) == [("error", "RuntimeError: decoder crashed")]
+    rs.feed(good, speech("hello", 200))
+    assert rs.close(good, timeout=5) == [("final", "hello")]
+    assert rs.stats()["errors"] == 1
+    rs.shutdown()
+
+
+def _raw(address, data):
+    with socket.create_connection(address, timeout=10) as s:
+        s.sendall(data)
+        chunks = []
+        while True:
+            chunk = s.recv(4096)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def test_json_lines_protocol(server):
+    api = recognition_server.serve(server, port=0, token="secret")
+    try:
+        with socket.create_connection(api.server_address, timeout=10) as s:
+            f = s.makefile("rwb")
+
+            def call(request):
+                f.write(json.dumps(dict(request, token="secret")).encode("utf-8") + b"\n")
+                f.flush()
+                return json.loads(f.readline())
+
+            assert call({"op": "audio", "pcm": ""})["ok"] is False
+            assert call({"op": "open", "sample_rate": 0})["error"].startswith("bad request")
+            assert call({"op": "open"})["session"] == 1
+            pcm = base64.b64encode(speech("hello", 200)).decode("ascii")
+            assert call({"op": "audio", "pcm": pcm})["ok"]
+            assert call({"op": "close"}) == {"ok": True, "events": [["final", "hello"]]}
+            assert call({"op": "stats"})["closed"] == 1
+            assert call({"op": "nope"})["error"] == "unknown op 'nope'"
+    finally:
+        api.shutdown()
+        api.server_close()
+
+
+def test_requests_without_the_token_are_refused(server):
+    api = recognition_server.serve(server, port=0, token="secret")
+    try:
+        address = api.server_address
+        assert _raw(address, b'{"op": "open"}\n{"op": "stats"}\n') == \
+            b'{"ok": false, "error": "missing or wrong token"}\n'
+        assert b"wrong token" in _raw(address, b'{"op": "open", "token": "guess"}\n')
+        assert _raw(address, b"POST / HTTP/1.1\r\nHost: x\r\n\r\n") == b'{"ok": false, "error": "bad request"}\n'
+        assert server.stats()["opened"] == 0
+    finally:
+        api.shutdown()
+        api.server_close()
+
+
+def test_only_loopback_without_a_token(server):
+    assert recognition_server.is_loopback("127.0.0.1") and recognition_server.is_loopback("::1")
+    assert recognition_server.is_loopback("localhost")
+    assert not recognition_server.is_loopback("0.0.0.0")
+    assert not recognition_server.is_loopback("jarvis.lan")
+    with pytest.raises(ValueError, match="without a token"):
+        recognition_server.serve(server, host="0.0.0.0", port=0)
+    api = recognition_server.serve(server, port=0)
+    try:
+        with socket.create_connection(api.server_address, timeout=10) as s:
+            s.sendall(b'{"op": "stats"}\n')
+            assert json.loads(s.makefile("rb").readline())["ok"]
+    finally:
+        api.shutdown()
+        api.server_close()
@@ -0,0 +1,39 @@
+import wave
+
+import numpy as np
+
+from conftest import silence, speech
+from replay import Replay, audio_files, load_audio
+
+
+def _recording(path, *chunks, rate=16000):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"".join(chunks))
+    return str(path)
+
+
+def test_audio_files_and_resampling(tmp_path):
+    _recording(tmp_path / "b.wav", silence(100))
+    np.zeros(160, dtype=np.int16).tofile(tmp_path / "a.pcm")
+    (tmp_path / "notes.txt").write_text("x")
+    assert [p[-5:] for p in audio_files(str(tmp_path))] == ["a.pcm", "b.wav"]
+    assert len(load_audio(str(tmp_path / "a.pcm"), 16000)) == 160
+    slow = _recording(tmp_path / "slow.wav", silence(1000, sample_rate=8000), rate=8000)
+    assert len(load_audio(slow, 16000)) == 16000
+
+
+def test_replay_runs_recorded_commands_headless(jarvis_vosk, tmp_path):
+    chunk = jarvis_vosk.DECODE_BATCH_MS
+    wav = _recording(tmp_path / "time.wav", silence(480), speech("jarvis what time is it", chunk),
+                     silence(1200), speech("jarvis hello", chunk), silence(480))
+    report = Replay(jarvis_vosk, gap_s=1.0).run([wav])
+    assert [c["text"] for c in report["commands"]] == ["what time is it", "hello"]
+    first = report["commands"][0]
+    assert first["file"] == "time.wav" and first["error"] is None
+    assert first["actions"][0][0] == "speak" and first["actions"][0][1].startswith("It is")
+    assert report["audio_s"] == 3.4  # with the trailing gap
+    assert report["vad"]["skipped_s"] > 0
+    assert report["latency_ms"]["max"] >= 0
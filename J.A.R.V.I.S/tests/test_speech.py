@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from conftest import FakeEngine
+from speech import LOW, NORMAL, URGENT, SpeechEngine
+
+
+class ThreadEngine(FakeEngine):
+    """Remembers which thread every call came from."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def say(self, text):
+        self.threads.add(threading.current_thread().name)
+        super().say(text)
+
+
+@pytest.fixture
+def make_speech():
+    made = []
+
+    def _make(seconds=0.01, external=True, **kwargs):
+        engines = []
+
+        def factory():
+            engines.append(ThreadEngine(seconds, external))
+            return engines[-1]
+        speech = SpeechEngine(engine_factory=factory, **kwargs)
+        speech.engines = engines
+        made.append(speech)
+        return speech
+    yield _make
+    for speech in made:
+        speech.close()
+
+
+def test_one_owner_thread_speaks_everything(make_speech):
+    started = []
+    speech = make_speech(on_start=lambda: started.append(1))
+    callers = [threading.Thread(target=lambda i=i: speech.say(f"message {i}").wait(5)) for i in range(5)]
+    for th in callers:
+        th.start()
+    for th in callers:
+        th.join()
+    engine, = speech.engines
+    assert engine.threads == {"speech"}
+    assert sorted(text for text, _ in engine.said) == [f"message {i}" for i in range(5)]
+    assert all(completed for _, completed in engine.said)
+    assert speech.stats()["spoken"] == len(started) == 5
+
+
+def test_say_does_not_block(make_speech):
+    speech = make_speech(seconds=0.5)
+    handle = speech.say("a long sentence")
+    assert not handle.done
+    assert handle.wait(5) and handle.state == "done"
+
+
+def test_queue_is_ordered_by_priority(make_speech):
+    speech = make_speech(seconds=0.1)
+    first = speech.say("first")
+    while first.state == "queued":
+        pass
+    low, normal, urgent = speech.say("low", LOW), speech.say("normal", NORMAL), speech.say("urgent", URGENT)
+    assert low.wait(5)
+    assert [text for text, _ in speech.engines[0].said] == ["first", "urgent", "normal", "low"]
+
+
+def test_identical_queued_messages_are_coalesced(make_speech):
+    speech = make_speech(seconds=0.1)
+    speech.say("busy")
+    a = speech.say("Yes?", LOW)
+    b = speech.say("Yes?", URGENT)
+    assert a is b and a.priority == URGENT
+    c = speech.say("Yes?", coalesce=False)
+    assert c is not a
+    assert c.wait(5)
+    assert [text for text, _ in speech.engines[0].said].count("Yes?") == 2
+    assert speech.stats()["coalesced"] == 1
+
+
+def test_interrupt_cuts_off_the_sentence_and_drops_the_queue(make_speech):
+    speech = make_speech(seconds=5)
+    current = speech.say("a very long answer")
+    while current.state != "speaking":
+        pass
+    queued = speech.say("and more")
+    speech.interrupt()
+    assert current.wait(2) and current.cancelled
+    assert queued.done and queued.cancelled
+    assert speech.wait_idle(2)
+    assert speech.engines[0].said == [("a very long answer", False)]
+    assert speech.stats()["interrupted"] == 1
+
+
+def test_barge_in_say(make_speech):
+    speech = make_speech(seconds=5)
+    current = speech.say("talking")
+    while current.state != "speaking":
+        pass
+    answer = speech.say("Yes?", URGENT, interrupt=True)
+    assert current.wait(2) and current.cancelled
+    answer.cancel()
+
+
+def test_say_each_stops_when_cancelled(make_speech):
+    speech = make_speech()
+    heard = []
+    spoken = speech.say_each(["one.", "two.", "three."], cancelled=lambda: len(heard) >= 2,
+                             on_sentence=heard.append)
+    assert spoken == 2
+    assert [text for text, _ in speech.engines[0].said] == ["one.", "two."]
+
+
+def test_say_each_stops_on_interrupt(make_speech):
+    speech = make_speech(seconds=5)
+    result = []
+    th = threading.Thread(target=lambda: result.append(speech.say_each(["one.", "two."])))
+    th.start()
+    while not speech.engines or speech.engines[0]._until is None:
+        pass
+    speech.interrupt()
+    th.join(5)
+    assert result == [0]
+
+
+def test_driver_without_external_loop(make_speech):
+    speech = make_speech(external=False)
+    assert speech.say("hello").wait(5)
+    assert speech.wait_idle(5)
+    assert speech.engines[0].said == [("hello", True)]
+    assert not speech._external
+
+
+def test_engine_that_fails_to_start_is_not_retried(make_speech):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("no audio device")
+    speech = SpeechEngine(engine_factory=broken)
+    try:
+        assert speech.say("one").wait(5)
+        assert speech.say("two").wait(5)
+        assert calls == [1]
+    finally:
+        speech.close()
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+
+import speech_cache
+from conftest import FakeEngine
+from speech import SpeechEngine
+from speech_cache import PhraseCache, read_wav, write_wav
+
+
+class FakePlayer:
+    def __init__(self):
+        self.played = []
+
+    def play(self, samples, cancelled=None, on_start=None):
+        if on_start:
+            on_start()
+        self.played.append(len(samples))
+        return True
+
+    def close(self):
+        pass
+
+
+def tone(n=2205):
+    return (np.sin(np.arange(n) / 5) * 8000).astype(np.int16)
+
+
+def test_wav_round_trip_resamples(tmp_path):
+    path = str(tmp_path / "a.wav")
+    write_wav(path, tone(), rate=11025)
+    assert len(read_wav(path, rate=22050)) == 4410
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_rendered_phrase_is_cached_on_disk(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    assert cache.load(["Yes?"]) == ["Yes?"]
+    assert cache.get("Yes?") is None
+    path = cache.render_path("Yes?")
+    write_wav(path, tone())
+    assert cache.add_rendered("Yes?", path)
+    assert not os.path.exists(path)
+    assert len(cache.get("Yes?")) == 2205
+    fresh = PhraseCache(str(tmp_path))
+    assert fresh.load(["Yes?", "Okay."]) == ["Okay."]
+    assert fresh.stats()["phrases"] == 1
+
+
+def test_cache_key_depends_on_the_voice(tmp_path):
+    assert PhraseCache(str(tmp_path), rate=150).key("Yes?") != PhraseCache(str(tmp_path), rate=160).key("Yes?")
+
+
+def test_empty_rendering_is_not_cached(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    path = cache.render_path("Yes?")
+    open(path, "wb").close()
+    assert not cache.add_rendered("Yes?", path)
+    assert cache.get("Yes?") is None
+
+
+def test_sound_without_ffmpeg_is_skipped(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(speech_cache.shutil, "which", lambda name: None)
+    mp3 = tmp_path / "activation.mp3"
+    mp3.write_bytes(b"ID3 not really audio")
+    cache = PhraseCache(str(tmp_path / "cache"))
+    assert cache.load_sound(str(mp3)) is None
+    assert "ffmpeg not found" in capsys.readouterr().out
+    assert cache.load_sound(str(tmp_path / "missing.mp3")) is None
+    assert cache.load_sound(None) is None
+
+
+def test_wav_sound_needs_no_ffmpeg_and_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(speech_cache.shutil, "which", lambda name: None)
+    wav = str(tmp_path / "activation.wav")
+    write_wav(wav, tone())
+    cache = PhraseCache(str(tmp_path / "cache"))
+    assert len(cache.load_sound(wav)) == 2205
+    assert len(os.listdir(tmp_path / "cache")) == 1
+    assert len(cache.load_sound(wav)) == 2205
+
+
+@pytest.mark.skipif(speech_cache.shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_mp3_is_decoded_by_ffmpeg_once(tmp_path):
+    from pathlib import Path
+    mp3 = str(Path(speech_cache.__file__).resolve().parent / "activation.mp3")
+    cache = PhraseCache(str(tmp_path))
+    first = cache.load_sound(mp3)
+    assert first is not None and len(first) > 0
+    assert np.array_equal(cache.load_sound(mp3), first)
+
+
+def test_speech_plays_cached_phrases_without_the_engine(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    path = cache.render_path("Yes?")
+    write_wav(path, tone())
+    cache.add_rendered("Yes?", path)
+    engines = []
+    player = FakePlayer()
+    speech = SpeechEngine(cache=cache, player=player,
+                          engine_factory=lambda: engines.append(FakeEngine()) or engines[-1])
+    try:
+        assert speech.say("Yes?").wait(5)
+        assert speech.play(None) is None
+        assert speech.play(tone(100)).wait(5)
+        assert player.played == [2205, 100]
+        assert engines == []
+        assert speech.stats()["cached"] == 1
+    finally:
+        speech.close()
+
+
+def test_missing_phrases_are_rendered_in_the_background(tmp_path):
+    cache = PhraseCache(str(tmp_path))
+    speech = SpeechEngine(cache=cache, player=FakePlayer(), engine_factory=FakeEngine)
+    try:
+        assert speech.warm(["Yes?"]) == 1
+        assert speech.wait_idle(1)  # rendering is silent, so nothing counts as busy
+    finally:
+        speech.close()
@@ -0,0 +1,91 @@
+import json
+import types
+
+import pytest
+
+from startup import RecognizerLoader, StartupTimer
+
+
+def test_timer_phases_and_log(tmp_path):
+    timer = StartupTimer("test")
+    timer.lap("imports")
+    with timer.phase("model_load"):
+        pass
+    timer.mark("listening")
+    assert list(timer.summary()) == ["imports", "model_load", "listening"]
+    assert "model_load" in timer.report()
+    log = tmp_path / "logs" / "startup.jsonl"
+    timer.save(str(log))
+    timer.save(str(log))
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(entries) == 2 and entries[0]["script"] == "test"
+    assert set(entries[0]["phases"]) == {"imports", "model_load", "listening"}
+
+
+@pytest.fixture
+def models(fake_vosk):
+    """fake_vosk whose Model fails for the paths listed in `broken`."""
+    loaded, broken = [], set()
+
+    def model(path):
+        if path in broken:
+            raise RuntimeError(f"cannot read {path}")
+        loaded.append(path)
+        return types.SimpleNamespace(path=path)
+    fake_vosk.Model = model
+    return types.SimpleNamespace(loaded=loaded, broken=broken)
+
+
+def _loader(wake_model_path=None):
+    timer = StartupTimer("test")
+    return RecognizerLoader("big", 16000, "jarvis", 6.0, timer, wake_model_path=wake_model_path).start()
+
+
+def test_loads_wake_stage_then_command_stage(models):
+    loader = _loader()
+    assert loader.wait_ready(5) and loader.wait_wake(0)
+    assert loader.error is None
+    assert loader.pipeline is not None and loader.model.path == "big"
+    assert models.loaded == ["big"]
+    assert {"import_vosk", "model_load", "wake_stage", "command_stage"} <= set(loader.timer.summary())
+
+
+def test_small_wake_model_loads_first(models):
+    loader = _loader(wake_model_path="small")
+    assert loader.wait_ready(5)
+    assert models.loaded == ["small", "big"]
+    assert loader.model.path == "big"
+    assert "wake_model_load" in loader.timer.summary()
+
+
+def test_failure_before_the_wake_stage(models):
+    models.broken.add("big")
+    loader = _loader()
+    assert loader.wait_wake(5) and loader.wait_ready(5)
+    assert loader.pipeline is None
+    assert "cannot read big" in str(loader.error)
+
+
+def test_command_stage_failure_drops_the_wake_only_pipeline(models):
+    models.broken.add("big")
+    loader = _loader(wake_model_path="small")
+    assert loader.wait_ready(5)
+    assert models.loaded == ["small"]
+    assert loader.pipeline is None and loader.model is None
+    assert "cannot read big" in str(loader.error)
+
+
+def test_start_is_idempotent(models):
+    loader = _loader()
+    assert loader.start() is loader
+    assert loader.wait_ready(5)
+    assert models.loaded == ["big"]
+
+
+def test_wake_after_a_failed_load_reports_the_error(jarvis_vosk):
+    said = []
+    jarvis_vosk.speak = lambda text, priority=None: said.append(text)
+    jarvis_vosk.handle_event(("loading", ""))
+    jarvis_vosk.loader.error = RuntimeError("cannot read model")
+    jarvis_vosk.handle_event(("loading", ""))
+    assert said == [jarvis_vosk.LOADING_TEXT, jarvis_vosk.LOAD_ERROR_TEXT]
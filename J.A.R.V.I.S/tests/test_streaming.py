@@ -0,0 +1,110 @@
+import threading
+
+from doc_reader import stream_sentences
+
+
+class FakeLLM:
+    """Backend stand-in that streams `answer` in small fragments and logs what happens."""
+
+    name, model = "fake", "test"
+
+    def __init__(self, answer, events, gate=None):
+        self.answer = answer
+        self.events = events
+        self.gate = gate
+        self.calls = 0
+        self.closed = 0
+
+    def stream(self, messages, cancelled=None):
+        self.calls += 1
+        try:
+            for i in range(0, len(self.answer), 4):
+                if self.gate is not None and i >= 12:
+                    self.gate.wait(5)
+                if cancelled and cancelled():
+                    return
+                self.events.append(("fragment", i))
+                yield self.answer[i:i + 4]
+        finally:
+            self.closed += 1
+
+
+def test_sentences_come_out_as_soon_as_they_are_complete():
+    pulled = []
+
+    def fragments():
+        for f in ["Hel", "lo there", ". How a", "re you?  I'm", " fine.\n\nBye"]:
+            pulled.append(f)
+            yield f
+    out = []
+    for sentence in stream_sentences(fragments()):
+        out.append((sentence, len(pulled)))
+    assert out == [("Hello there.", 3), ("How are you?", 4), ("I'm fine.", 5), ("Bye", 5)]
+
+
+def test_fragments_without_an_end():
+    assert list(stream_sentences(["no ", "  punctuation", ""])) == ["no punctuation"]
+    assert list(stream_sentences([])) == []
+    assert list(stream_sentences(["Wait... what?! ", "Ok."])) == ["Wait...", "what?!", "Ok."]
+
+
+def test_answer_is_spoken_while_it_is_still_streaming(jarvis_vosk_openai):
+    m = jarvis_vosk_openai
+    events = []
+    gate = threading.Event()
+    m.speak = lambda text, priority=None, coalesce=True: events.append(("speak", text))
+    m.llm = FakeLLM("Paris. It is in France.", events, gate)
+    th = threading.Thread(target=m.ask_openai, args=("what is the capital of france",))
+    th.start()
+    while ("speak", "Paris.") not in events:
+        assert th.is_alive()
+    gate.set()
+    th.join(5)
+    assert [e for e in events if e[0] == "speak"] == [("speak", "Paris."), ("speak", "It is in France.")]
+    assert m.llm.closed == 1
+    assert m.conversation.has_history()
+
+
+def test_repeated_question_is_answered_from_the_cache(jarvis_vosk_openai):
+    m = jarvis_vosk_openai
+    said = []
+    m.speak = lambda text, priority=None, coalesce=True: said.append(text)
+    m.llm = FakeLLM("Paris. It is in France.", [])
+    m.ask_openai("what is the capital of france")
+    m.ask_openai("what is the capital of france")
+    assert m.llm.calls == 1
+    assert said == ["Paris.", "It is in France."] * 2
+
+
+def test_cancelled_answer_is_not_cached(jarvis_vosk_openai):
+    m = jarvis_vosk_openai
+    said = []
+
+    def speak(text, priority=None, coalesce=True):
+        if not m.executor.current_token().cancelled:  # like the real speak()
+            said.append(text)
+    m.speak = speak
+    gate = threading.Event()
+    m.llm = FakeLLM("Paris. It is in France.", [], gate)
+    job = m.executor.submit(m.ask_openai, "what is the capital of france")
+    while said != ["Paris."]:
+        pass
+    job.cancel()
+    gate.set()
+    assert job.wait(5)
+    assert said == ["Paris."]
+    assert m.llm_cache.get("fake:test", m.OPENAI_SYSTEM_PROMPT, "what is the capital of france") is None
+
+
+def test_backend_error_is_spoken(jarvis_vosk_openai):
+    m = jarvis_vosk_openai
+    said = []
+    m.speak = lambda text, priority=None, coalesce=True: said.append(text)
+
+    class Broken(FakeLLM):
+        def stream(self, messages, cancelled=None):
+            raise RuntimeError("connection refused")
+            yield
+    m.llm = Broken("", [])
+    m.ask_openai("tell me a joke")
+    assert said == ["OpenAI fallback error: connection refused"]
@@ -0,0 +1,31 @@
+from text_cache import TextCache
+
+
+def test_page_is_cached_and_invalidated_on_change(tmp_path):
+    calls = []
+
+    def extract(path, start, count):
+        calls.append(start)
+        return iter([open(path).read()] if start == 0 else [])
+
+    path = tmp_path / "a.txt"
+    path.write_text("first")
+    cache = TextCache(str(tmp_path / "cache.db"), extract=extract)
+    assert cache.page(str(path)) == "first"
+    assert cache.page(str(path)) == "first"
+    assert (cache.hits, calls) == (1, [0])
+    assert cache.page(str(path), 1) is None
+
+    path.write_text("second version")
+    assert cache.page(str(path)) == "second version"
+
+
+def test_lru_eviction_keeps_within_budget(tmp_path):
+    cache = TextCache(str(tmp_path / "cache.db"), max_bytes=100)
+    for i in range(5):
+        path = tmp_path / f"{i}.txt"
+        path.write_text("x")
+        cache.put(str(path), "y" * 40)
+    assert cache._total <= 100
+    assert cache.get(str(tmp_path / "4.txt")) == "y" * 40
+    assert cache.get(str(tmp_path / "0.txt")) is None
@@ -0,0 +1,60 @@
+import time
+
+from tracing import Tracer, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (50, 95, 100)
+    assert percentile([], 50) is None
+
+
+def test_trace_ends_at_first_spoken_word():
+    tracer = Tracer()
+    t0 = time.monotonic()
+    trace = tracer.begin(t0 - 0.05)
+    with tracer.span("handle_command"):
+        tracer.speech_requested()
+    tracer.end(trace)  # the answer is still queued: kept for speech_started()
+    tracer.speech_started()
+    stages = [name for name, _, _ in tracer.trace(trace)]
+    assert stages == ["end_to_end", "handle_command", "tts_start"]
+    assert tracer.summary()["end_to_end"]["p50"] >= 50
+    assert tracer.current == 0
+    tracer.speech_started()  # later speech belongs to no utterance
+    assert tracer.summary()["end_to_end"]["count"] == 1
+
+
+def test_commands_that_never_speak_do_not_leak():
+    tracer = Tracer()
+    for _ in range(100):
+        trace = tracer.begin()
+        tracer.end(trace)
+    assert tracer._origin == {} and tracer._speak_requested == {}
+    assert tracer.current == 0
+    for _ in range(100):  # cancelled before running, or speech that never started
+        tracer.begin()
+        tracer.speech_requested()
+    assert len(tracer._origin) == 1 and len(tracer._speak_requested) == 1
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    assert tracer.begin() == 0
+    with tracer.span("x"):
+        pass
+    tracer.speech_requested()
+    tracer.speech_started()
+    tracer.end(0)
+    assert list(tracer.spans) == [] and tracer.report().startswith("stage")
+
+
+def test_traced_decorator_and_capacity():
+    tracer = Tracer(capacity=3)
+
+    @tracer.traced("work")
+    def work(x):
+        return x * 2
+
+    assert [work(i) for i in range(5)] == [0, 2, 4, 6, 8]
+    assert tracer.summary()["work"]["count"] == 3
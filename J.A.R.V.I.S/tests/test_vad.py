@@ -0,0 +1,61 @@
+import numpy as np
+
+from vad import VoiceActivityGate
+
+RATE = 16000
+
+
+def _noise(ms, level, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(RATE * ms // 1000) * level * 32767).clip(-32768, 32767).astype(np.int16).tobytes()
+
+
+def _tone(ms, level=0.3, hz=220):
+    t = np.arange(RATE * ms // 1000) / RATE
+    return (np.sin(2 * np.pi * hz * t) * level * 32767).astype(np.int16).tobytes()
+
+
+def test_silence_is_skipped_and_speech_gets_its_preroll():
+    gate = VoiceActivityGate(RATE, hangover_ms=200, preroll_ms=300)
+    quiet = [_noise(100, 0.001, seed=i) for i in range(10)]
+    for chunk in quiet:
+        assert gate.process(chunk) == []
+    assert not gate.in_speech
+    out = gate.process(_tone(100))
+    assert gate.in_speech
+    assert out[-1] == _tone(100)
+    assert out[:-1] == quiet[-3:]  # 300 ms of pre-roll, so the first word isn't cut
+    assert gate.skipped_samples == 7 * RATE // 10
+
+
+def test_hangover_keeps_the_end_of_speech():
+    gate = VoiceActivityGate(RATE, hangover_ms=200, preroll_ms=0)
+    for i in range(5):
+        gate.process(_noise(100, 0.001, seed=i))
+    gate.process(_tone(100))
+    tail = [gate.process(_noise(100, 0.001, seed=10 + i)) for i in range(4)]
+    assert [len(t) for t in tail] == [1, 1, 0, 0]
+    assert not gate.in_speech
+
+
+def test_quiet_fricatives_count_as_speech():
+    gate = VoiceActivityGate(RATE)
+    for i in range(5):
+        gate.process(_noise(100, 0.001, seed=i))
+    # broadband "s"-like noise a little under the voiced threshold, with a high zero-crossing rate
+    assert gate.process(_noise(100, 0.002 * 2.4, seed=99))
+
+
+def test_noise_floor_adapts_and_stats():
+    gate = VoiceActivityGate(RATE)
+    quiet_db = None
+    for i in range(100):  # the room gets 20 dB louder, slowly
+        assert gate.process(_noise(100, 0.001 * 10 ** (i / 100), seed=i)) == []
+        quiet_db = quiet_db if quiet_db is not None else gate.noise_db
+    assert gate.stats()["noise_db"] > quiet_db + 12
+    gate.record_decode(0.5, RATE)
+    stats = gate.stats()
+    assert stats["audio_s"] == 10.0
+    assert stats["decode_cost"] == 0.5
+    assert stats["cpu_saved_s"] == round(stats["skipped_s"] * 0.5, 2)
+    assert "VAD: skipped" in gate.report()
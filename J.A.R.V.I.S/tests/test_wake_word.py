@@ -0,0 +1,62 @@
+import importlib
+
+import pytest
+
+from conftest import silence, speech
+
+
+@pytest.fixture
+def pipeline_cls(fake_vosk):
+    import wake_word
+    return importlib.reload(wake_word).WakeWordPipeline
+
+
+def _feed(pipeline, *chunks):
+    return [e for e in (pipeline.accept(c) for c in chunks) if e]
+
+
+def test_wake_word_then_command(pipeline_cls):
+    p = pipeline_cls(object(), 16000)
+    assert _feed(p, speech("hello there"), *[silence()] * 6) == []  # older than the pre-roll
+    assert _feed(p, speech("jarvis")) == [("wake", "jarvis")]
+    assert _feed(p, speech("open notes"), silence()) == [("command", "open notes")]
+    assert not p.active
+
+
+def test_command_in_the_same_chunk_as_the_wake_word_is_kept(pipeline_cls):
+    p = pipeline_cls(object(), 16000)
+    assert _feed(p, speech("jarvis what time is it"), silence()) == [("wake", "jarvis"),
+                                                                   ("command", "what time is it")]
+
+
+def test_wake_word_alone_prompts_then_times_out(pipeline_cls):
+    p = pipeline_cls(object(), 16000, command_timeout=0.5)
+    assert _feed(p, speech("jarvis"), silence()) == [("wake", "jarvis"), ("prompt", "")]
+    assert _feed(p, *[silence()] * 6) == [("timeout", "")]
+    assert not p.active
+
+
+def test_skipped_audio_counts_toward_the_timeout(pipeline_cls):
+    p = pipeline_cls(object(), 16000, command_timeout=0.5)
+    _feed(p, speech("jarvis"))
+    assert p.silence(4000) is None
+    assert p.silence(8000) == ("timeout", "")
+    assert p.silence(8000) is None  # no longer listening for a command
+
+
+def test_command_stage_attached_later(pipeline_cls):
+    p = pipeline_cls(object(), 16000, command_stage=False)
+    assert _feed(p, speech("jarvis open notes")) == [("loading", "jarvis")]
+    p.attach_command_stage(object())
+    assert _feed(p, speech("jarvis open notes"), silence()) == [("wake", "jarvis"), ("command", "open notes")]
+
+
+def test_preroll_is_sized_in_milliseconds(pipeline_cls):
+    for chunk_ms in (20, 100, 300):
+        p = pipeline_cls(object(), 16000, preroll_ms=500)
+        _feed(p, *[speech("hello", ms=chunk_ms)] * 40)
+        kept_ms = p._preroll_samples / 16
+        assert 500 <= kept_ms < 500 + chunk_ms
+    p = pipeline_cls(object(), 16000, preroll_ms=0)
+    _feed(p, *[silence()] * 3)
+    assert len(p._preroll) == 1
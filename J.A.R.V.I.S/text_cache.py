@@ -0,0 +1,106 @@
+"""
+text_cache.py
+Cache pe disc pentru textul extras din documente de read_file (orice format din extractors.py).
+ - cheie: cale absolută + dimensiune + mtime + pagină
+ - limită de dimensiune configurabilă, evacuare LRU
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from extractors import extract_pages
+
+DEFAULT_TEXT_CACHE_PATH = str(Path.home() / ".jarvis" / "text_cache.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, path TEXT, page INTEGER, text TEXT, nbytes INTEGER, last_used REAL);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used);
+CREATE INDEX IF NOT EXISTS entries_path ON entries(path, page);
+"""
+
+
+class TextCache:
+    def __init__(self, db_path=DEFAULT_TEXT_CACHE_PATH, max_bytes=64 * 1024 * 1024, extract=extract_pages):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.extract = extract  # extract(path, start, count) -> iterator of page texts
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def _key(path, page):
+        """(abs path, key) for the current size/mtime of path; key is None if it is missing."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return path, None
+        raw = f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0{page}"
+        return path, hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, path, page=0):
+        path, key = self._key(path, page)
+        if key is None:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT text FROM entries WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            conn.execute("UPDATE entries SET last_used=? WHERE key=?", (time.time(), key))
+            conn.commit()
+            return row[0]
+
+    def put(self, path, text, page=0):
+        path, key = self._key(path, page)
+        if key is None:
+            return
+        nbytes = len(text.encode("utf-8", "surrogatepass"))
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            # entries for older versions of the same page can never be hit again
+            stale = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries WHERE path=? AND page=?",
+                                 (path, page)).fetchone()[0]
+            conn.execute("DELETE FROM entries WHERE path=? AND page=?", (path, page))
+            conn.execute("INSERT INTO entries(key, path, page, text, nbytes, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, path, page, text, nbytes, time.time()))
+            self._total += nbytes - stale
+            while self._total > self.max_bytes:
+                row = conn.execute("SELECT key, nbytes FROM entries ORDER BY last_used LIMIT 1").fetchone()
+                if row is None:
+                    break
+                conn.execute("DELETE FROM entries WHERE key=?", (row[0],))
+                self._total -= row[1]
+            conn.commit()
+
+    def page(self, path, page=0):
+        """Text of one page, from the cache or freshly extracted. None past the last page."""
+        text = self.get(path, page)
+        if text is None:
+            # read the stream to its end, so an extraction worker goes back to its pool
+            items = list(self.extract(path, page, 1))
+            text = items[0] if items else None
+            if text is not None:
+                self.put(path, text, page)
+        return text
@@ -0,0 +1,173 @@
+"""
+tracing.py
+Măsurarea latenței pe etape, de la sfârșitul vorbirii până la primul cuvânt rostit.
+ - span-uri cu timestamp monotonic, ținute într-un buffer circular în memorie
+ - fiecare comandă primește un id de trace; etapele (captură, așteptare în
+   buffer, Vosk, parsare JSON, wake word, handle_command, search_files,
+   read_file, pornirea TTS) sunt legate de el
+ - sumar cu p50/p95/p99 per etapă
+"""
+
+import functools
+import math
+import threading
+import time
+from collections import deque
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "trace", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.trace = self.tracer.current
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.spans.append((self.trace, self.name, self.start, time.monotonic()))
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Records (trace id, stage, start, end) tuples; the oldest are dropped past `capacity`.
+
+    Trace 0 means "no utterance in progress". begin() starts a new trace at
+    the moment the user stopped speaking; the first speech_started() after it
+    closes the trace with an "end_to_end" span. end() forgets a trace whose
+    command finished without asking to say anything.
+    """
+
+    def __init__(self, capacity=8192, enabled=True):
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)  # deque.append is thread-safe
+        self.current = 0
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._origin = {}  # trace id -> monotonic start, until the first word is spoken
+        self._speak_requested = {}
+
+    # ---------- recording ----------
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def traced(self, name):
+        """Decorator: record every call of the function as a span."""
+        def _wrap(fn):
+            @functools.wraps(fn)
+            def _call(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return _call
+        return _wrap
+
+    def record(self, name, start, end=None, trace=None):
+        if self.enabled:
+            self.spans.append((self.current if trace is None else trace, name, start,
+                               time.monotonic() if end is None else end))
+
+    def begin(self, origin=None):
+        """Start an utterance trace; origin is when the speech ended (defaults to now)."""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            # only the current trace can reach speech_started(), so older ones that never spoke are dead
+            self._origin.clear()
+            self._speak_requested.clear()
+            trace = self._next_id
+            self._next_id += 1
+            self._origin[trace] = time.monotonic() if origin is None else origin
+            self.current = trace
+        return trace
+
+    def end(self, trace):
+        """Called when the command of `trace` finished, whatever the outcome.
+
+        A trace still waiting for its first spoken word is kept for
+        speech_started(); any other is dropped.
+        """
+        with self._lock:
+            if trace in self._speak_requested:
+                return
+            self._origin.pop(trace, None)
+            if self.current == trace:
+                self.current = 0
+
+    def speech_requested(self):
+        """Called when JARVIS queues something to say."""
+        trace = self.current
+        if self.enabled and trace in self._origin:
+            self._speak_requested.setdefault(trace, time.monotonic())
+
+    def speech_started(self):
+        """Called when the TTS engine actually starts talking."""
+        trace = self.current
+        with self._lock:
+            origin = self._origin.pop(trace, None)
+            requested = self._speak_requested.pop(trace, None)
+            if origin is not None and self.current == trace:
+                self.current = 0  # later background spans belong to no utterance
+        if origin is None:
+            return
+        now = time.monotonic()
+        if requested is not None:
+            self.record("tts_start", requested, now, trace)
+        self.record("end_to_end", origin, now, trace)
+
+    # ---------- views ----------
+    def summary(self):
+        """{stage: {count, p50, p95, p99, max}} in milliseconds."""
+        durations = {}
+        for _, name, start, end in list(self.spans):
+            durations.setdefault(name, []).append((end - start) * 1000)
+        out = {}
+        for name, values in durations.items():
+            values.sort()
+            out[name] = {"count": len(values),
+                         "p50": round(percentile(values, 50), 2),
+                         "p95": round(percentile(values, 95), 2),
+                         "p99": round(percentile(values, 99), 2),
+                         "max": round(values[-1], 2)}
+        return out
+
+    def trace(self, trace_id=None):
+        """Spans of one utterance (default: the latest) as (stage, offset ms, duration ms)."""
+        trace_id = self.current if trace_id is None else trace_id
+        spans = sorted((s for s in list(self.spans) if s[0] == trace_id), key=lambda s: s[2])
+        if not spans:
+            return []
+        t0 = spans[0][2]
+        return [(name, round((start - t0) * 1000, 2), round((end - start) * 1000, 2))
+                for _, name, start, end in spans]
+
+    def report(self):
+        rows = sorted(self.summary().items(), key=lambda kv: -kv[1]["p95"])
+        lines = [f"{'stage':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, s in rows:
+            lines.append(f"{name:<22}{s['count']:>7}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}{s['max']:>10}")
+        return "\n".join(lines)
+
+
+# shared by every module of one JARVIS process
+tracer = Tracer()
@@ -0,0 +1,138 @@
+"""
+wake_word.py
+Recunoaștere Vosk în două etape.
+ - etapa 1: un KaldiRecognizer cu gramatică minimă ("jarvis", "[unk]") rulează
+   continuu și e ieftin; cuvântul de trezire e detectat deja din rezultatele parțiale
+ - etapa 2: recognizer-ul cu vocabular complet primește audio doar după trezire,
+   până la finalul comenzii (sau până expiră fereastra de comandă)
+ - la pornire etapa 2 poate fi atașată mai târziu, după ce etapa 1 ascultă deja
+"""
+
+import json
+from collections import deque
+
+from vosk import KaldiRecognizer
+
+from tracing import tracer
+
+
+class WakeWordPipeline:
+    """Feeds audio to the wake-word stage or the command stage.
+
+    accept(chunk) returns None or one event tuple:
+      ("wake", heard)     wake word detected, command stage is now listening
+      ("command", text)   the command spoken after the wake word
+      ("prompt", "")      the wake word was said on its own; ask for the command
+      ("timeout", "")     no command arrived within command_timeout seconds
+      ("loading", heard)  wake word detected, but the command stage is not attached yet
+
+    With command_stage=False only the wake-word recognizer is built; the
+    full one is added later with attach_command_stage() (see startup.py).
+    """
+
+    def __init__(self, model, sample_rate, wake_word="jarvis", command_timeout=6.0, preroll_ms=500,
+                 command_stage=True):
+        self.sample_rate = sample_rate
+        self.wake_word = wake_word
+        self.command_timeout = command_timeout
+        self.wake = KaldiRecognizer(model, sample_rate, json.dumps([wake_word, "[unk]"]))
+        self.full = None
+        self.active = False
+        # recent audio replayed into the command stage, whatever the capture/batch size
+        self.preroll = int(sample_rate * preroll_ms / 1000)  # samples
+        self._preroll = deque()
+        self._preroll_samples = 0
+        self._active_samples = 0
+        if command_stage:
+            self.attach_command_stage(model)
+
+    def attach_command_stage(self, model):
+        """Build the full-vocabulary recognizer (model may be bigger than the wake-word one)."""
+        self.full = KaldiRecognizer(model, self.sample_rate)
+
+    def _keep_preroll(self, chunk):
+        self._preroll.append(chunk)
+        self._preroll_samples += len(chunk) // 2
+        while len(self._preroll) > 1 and self._preroll_samples - len(self._preroll[0]) // 2 >= self.preroll:
+            self._preroll_samples -= len(self._preroll.popleft()) // 2
+
+    def _clear_preroll(self):
+        self._preroll.clear()
+        self._preroll_samples = 0
+
+    def _heard_wake_word(self, text):
+        return self.wake_word in text.split()
+
+    def _activate(self):
+        self.active = True
+        self._active_samples = 0
+        self.wake.Reset()
+        self.full.Reset()
+        # the command often starts in the same chunk as the wake word
+        for chunk in self._preroll:
+            self.full.AcceptWaveform(chunk)
+        self._clear_preroll()
+
+    def _deactivate(self):
+        self.active = False
+        self.full.Reset()
+
+    def accept(self, chunk):
+        if not self.active:
+            self._keep_preroll(chunk)
+            with tracer.span("vosk_wake_accept"):
+                final = self.wake.AcceptWaveform(chunk)
+            with tracer.span("json_parse"):
+                if final:
+                    heard = json.loads(self.wake.Result()).get("text", "")
+                else:
+                    heard = json.loads(self.wake.PartialResult()).get("partial", "")
+            with tracer.span("wake_match"):
+                matched = self._heard_wake_word(heard)
+            if matched and self.full is None:
+                self.wake.Reset()
+                self._clear_preroll()
+                return ("loading", heard)
+            if matched:
+                self._activate()
+                return ("wake", heard)
+            return None
+
+        self._active_samples += len(chunk) // 2  # int16 mono
+        with tracer.span("vosk_accept"):
+            final = self.full.AcceptWaveform(chunk)
+        if final:
+            with tracer.span("json_parse"):
+                text = json.loads(self.full.Result()).get("text", "")
+            command = " ".join(w for w in text.split() if w != self.wake_word)
+            if command:
+                self._deactivate()
+                return ("command", command)
+            if text:
+                # only the wake word: keep listening for the actual command
+                self._active_samples = 0
+                return ("prompt", "")
+        if self._active_samples > self.command_timeout * self.sample_rate:
+            partial = json.loads(self.full.PartialResult()).get("partial", "")
+            if not partial:
+                self._deactivate()
+                return ("timeout", "")
+        return None
+
+    def silence(self, samples):
+        """Account for audio that was skipped (e.g. by the VAD) instead of decoded."""
+        if not self.active:
+            return None
+        self._active_samples += samples
+        if self._active_samples > self.command_timeout * self.sample_rate:
+            return self.flush() or ("timeout", "")
+        return None
+
+    def flush(self):
+        """Finalize the command stage (e.g. when the audio stream ends)."""
+        if not self.active:
+            return None
+        text = json.loads(self.full.FinalResult()).get("text", "")
+        command = " ".join(w for w in text.split() if w != self.wake_word)
+        self._deactivate()
+        return ("command", command) if command else None